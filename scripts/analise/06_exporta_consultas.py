@@ -1,13 +1,46 @@
 # scripts/analise/06_exporta_consultas.py
 """
 Este script executa queries analíticas no banco MySQL e exporta resultados para CSV.
+
+As consultas são independentes: rodam em paralelo, cada uma com uma conexão de um pool
+(mysql.connector.pooling), e cada tarefa grava seu CSV assim que a consulta termina,
+enquanto as outras ainda executam.
+
+Os resultados ficam em cache (data/cache/consultas/), com chave no SQL, nos parâmetros e
+na versão das tabelas gravada pelo importador: se nada mudou desde a última execução, a
+consulta e a escrita do CSV são puladas. --force ignora o cache.
+
+Com --backend duckdb, as mesmas consultas rodam num motor embutido que lê
+data/final/*.csv (scripts/comum/motor_embutido.py), sem precisar do servidor MySQL.
+
+Com --agregados, as consultas de LAG (q3), resumo por série (q4, q6) e alertas (q7)
+leem as tabelas de resumo mantidas pelo importador (scripts/comum/agregados_mysql.py)
+em vez de varrer `estados`; os CSVs saem iguais.
+
+Com --varredura, roda consultas do registro (scripts/comum/registro_consultas.py) para
+todas as combinações de anos × indicadores × regiões, uma consulta agrupada por template.
+
+Uso:
+    python scripts/analise/06_exporta_consultas.py [--backend mysql|duckdb] [--pool-size N] [--timeout SEGUNDOS] [--force] [--cache-max-mb MB] [--agregados]
+    python scripts/analise/06_exporta_consultas.py --varredura top_n_estados evolucao [--anos 2016 2019] [--indicadores ...] [--regioes ...] [--top-n N]
 """
 
-import os
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import pandas as pd
-import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.cache_consultas import CACHE_MAX_MB, CacheResultados
+from comum.caminhos import EXPORTS_DIR
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita, escrita_atomica
+from comum.instrumentacao import adiciona_opcoes, inicia, registra_arquivo, registra_tempo
+from comum.motor_embutido import BACKENDS_EMBUTIDOS, MotorEmbutido
+from comum.registro_consultas import TEMPLATES, monta_varredura
+from comum.versao_tabelas import le_versoes_tabelas
 
 DB_CONFIG = {
     "host": "localhost",
@@ -16,7 +49,7 @@ DB_CONFIG = {
     "database": "infraestrutura_nordeste"  
 }
 
-OUTPUT_DIR = Path("data/exports")
+OUTPUT_DIR = EXPORTS_DIR
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Parâmetros de análise 
@@ -25,207 +58,396 @@ TOP_N = 5
 INDICADOR_DOMICILIOS = "Domicílios inadequados"
 INDICADOR_ABAST = "Abastecimento de água"
 
-def connect():
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        if conn.is_connected():
-            print("[INFO] Conectado ao MySQL.")
-            return conn
-    except Error as e:
-        print(f"[ERROR] Falha na conexão: {e}")
-        raise
+# Execução paralela
+POOL_SIZE = 4           # conexões no pool = consultas simultâneas
+QUERY_TIMEOUT = 300     # segundos por consulta (0 = sem limite)
 
 def run_and_save(df_query, filename):
     out_path = OUTPUT_DIR / filename
-    df_query.to_csv(out_path, index=False, encoding="utf-8")
+    with escrita_atomica(out_path) as tmp:
+        df_query.to_csv(tmp, index=False, encoding="utf-8")
+    registra_arquivo("escrita", out_path, linhas=len(df_query))
     print(f"[OK] Salvo: {out_path}")
+    return out_path
 
-def main():
-    conn = connect()
+def cria_pool(pool_size):
     try:
+        pool = pooling.MySQLConnectionPool(pool_name="exporta_consultas", pool_size=pool_size, **DB_CONFIG)
+        print(f"[INFO] Pool de {pool_size} conexões com o MySQL criado.")
+        return pool
+    except Error as e:
+        print(f"[ERROR] Falha na conexão: {e}")
+        raise
 
-        # 0) Verificação de anos disponíveis (rápida)
-        q0 = """
-        SELECT 'estados' AS tabela, MIN(ano) AS ano_min, MAX(ano) AS ano_max FROM estados
-        UNION ALL
-        SELECT 'metropolis', MIN(ano), MAX(ano) FROM metropolis
-        UNION ALL
-        SELECT 'nordeste', MIN(ano), MAX(ano) FROM nordeste;
-        """
-        df0 = pd.read_sql_query(q0, conn)
-        run_and_save(df0, "00_anos_disponiveis_por_tabela.csv")
+def aplica_timeout(conn, timeout):
+    """Limita o tempo de cada SELECT na sessão (MySQL: MAX_EXECUTION_TIME em ms; MariaDB: max_statement_time em s)"""
+    if not timeout:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (int(timeout * 1000),))
+    except Error:
+        cursor.execute("SET SESSION max_statement_time = %s", (float(timeout),))
+    finally:
+        cursor.close()
 
-        # 1) Top N por ano e indicador — Estados (ex.: Domicílios inadequados)
-        q1 = """
-        SELECT
-          ano,
-          inadequacao,
-          regiao AS estado,
-          contagem,
-          valor_percentual
-        FROM estados
-        WHERE ano = %s
-          AND inadequacao = %s
-        ORDER BY valor_percentual DESC
-        LIMIT %s;
-        """
-        df1 = pd.read_sql_query(q1, conn, params=(ANALYSIS_YEAR, INDICADOR_DOMICILIOS, int(TOP_N)))
-        run_and_save(df1, f"01_top{TOP_N}_estados_{ANALYSIS_YEAR}_domicilios_inadequados.csv")
+class BackendMySQL:
+    """Pool de conexões MySQL com a mesma interface do MotorEmbutido (le / versoes / fecha)"""
 
-        # 1b) Top N por ano e indicador — Metropolis (ex.: Abastecimento de água)
-        q1b = """
-        SELECT
-          ano,
-          inadequacao,
-          regiao AS metropole,
-          contagem,
-          valor_percentual
-        FROM metropolis
-        WHERE ano = %s
-          AND inadequacao = %s
-        ORDER BY valor_percentual DESC
-        LIMIT %s;
-        """
-        df1b = pd.read_sql_query(q1b, conn, params=(ANALYSIS_YEAR, INDICADOR_ABAST, int(TOP_N)))
-        run_and_save(df1b, f"02_top{TOP_N}_metropolis_{ANALYSIS_YEAR}_abastecimento.csv")
-
-        # 2) Evolução temporal por localidade e indicador (ex.: Pernambuco, Abastecimento)
-        q2 = """
-        SELECT ano, valor_percentual
-        FROM estados
-        WHERE regiao = %s
-          AND inadequacao = %s
-        ORDER BY ano;
-        """
-        df2 = pd.read_sql_query(q2, conn, params=("Pernambuco", INDICADOR_ABAST))
-        run_and_save(df2, "03_evolucao_pernambuco_abastecimento.csv")
+    def __init__(self, pool_size, timeout):
+        self.pool = cria_pool(pool_size)
+        self.timeout = timeout
+
+    def le(self, query, params=None):
+        conn = self.pool.get_connection()
+        try:
+            aplica_timeout(conn, self.timeout)
+            return pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()  # devolve a conexão ao pool
 
-        # 3) Variação ano-a-ano (LAG) por estado e indicador
-        # Observação: funções de janela requerem MySQL 8+
+    def versoes(self):
+        conn = self.pool.get_connection()
+        try:
+            return le_versoes_tabelas(conn)
+        finally:
+            conn.close()
+
+    def fecha(self):
+        pass
+
+def abre_backend(backend, pool_size=POOL_SIZE, timeout=QUERY_TIMEOUT, agregados=False):
+    if backend == "mysql":
+        return BackendMySQL(pool_size, timeout)
+    return MotorEmbutido(backend, agregados=agregados)
+
+def executa_consulta(backend, filename, query, params, divisor=None, cache=None, versoes=None):
+    """Roda uma consulta no backend (no MySQL, com uma conexão do pool) e já grava o(s) CSV(s).
+
+    Sem divisor, grava `filename`; com divisor (varreduras), grava um CSV por combinação.
+    Com cache, devolve sem consultar nem gravar se o resultado guardado ainda vale.
+    Retorna (duração em s, True se veio do cache).
+    """
+    inicio = time.perf_counter()
+    chave = None
+    if cache is not None:
+        chave = cache.chave(filename, query, params, versoes)
+        if cache.restaura(chave):
+            duracao = time.perf_counter() - inicio
+            registra_tempo("consulta", duracao, arquivo=filename, origem="cache")
+            return duracao, True
+
+    df_query = backend.le(query, params)
+    if divisor is None:
+        caminhos = [run_and_save(df_query, filename)]
+    else:
+        partes = divisor(df_query)
+        caminhos = [run_and_save(parte, arquivo) for arquivo, parte in partes.items()]
+        print(f"[OK] Varredura {filename}: {len(partes)} arquivos")
+
+    if cache is not None:
+        cache.guarda(chave, caminhos)
+    duracao = time.perf_counter() - inicio
+    registra_tempo("consulta", duracao, arquivo=filename, origem="backend")
+    return duracao, False
+
+def monta_consultas(agregados=False):
+    """Lista de (arquivo de saída, SQL, parâmetros, divisor) exportadas por este script.
+
+    Com agregados, q3, q4, q6 e q7 leem as tabelas de resumo (comum.agregados_mysql).
+    """
+    consultas = []
+
+    # 0) Verificação de anos disponíveis (rápida)
+    q0 = """
+    SELECT 'estados' AS tabela, MIN(ano) AS ano_min, MAX(ano) AS ano_max FROM estados
+    UNION ALL
+    SELECT 'metropolis', MIN(ano), MAX(ano) FROM metropolis
+    UNION ALL
+    SELECT 'nordeste', MIN(ano), MAX(ano) FROM nordeste;
+    """
+    consultas.append(("00_anos_disponiveis_por_tabela.csv", q0, None, None))
+
+    # 1) Top N por ano e indicador — Estados (ex.: Domicílios inadequados)
+    q1 = """
+    SELECT
+      ano,
+      inadequacao,
+      regiao AS estado,
+      contagem,
+      valor_percentual
+    FROM estados
+    WHERE ano = %s
+      AND inadequacao = %s
+    ORDER BY valor_percentual DESC, regiao
+    LIMIT %s;
+    """
+    consultas.append((f"01_top{TOP_N}_estados_{ANALYSIS_YEAR}_domicilios_inadequados.csv", q1, (ANALYSIS_YEAR, INDICADOR_DOMICILIOS, int(TOP_N)), None))
+
+    # 1b) Top N por ano e indicador — Metropolis (ex.: Abastecimento de água)
+    q1b = """
+    SELECT
+      ano,
+      inadequacao,
+      regiao AS metropole,
+      contagem,
+      valor_percentual
+    FROM metropolis
+    WHERE ano = %s
+      AND inadequacao = %s
+    ORDER BY valor_percentual DESC, regiao
+    LIMIT %s;
+    """
+    consultas.append((f"02_top{TOP_N}_metropolis_{ANALYSIS_YEAR}_abastecimento.csv", q1b, (ANALYSIS_YEAR, INDICADOR_ABAST, int(TOP_N)), None))
+
+    # 2) Evolução temporal por localidade e indicador (ex.: Pernambuco, Abastecimento)
+    q2 = """
+    SELECT ano, valor_percentual
+    FROM estados
+    WHERE regiao = %s
+      AND inadequacao = %s
+    ORDER BY ano;
+    """
+    consultas.append(("03_evolucao_pernambuco_abastecimento.csv", q2, ("Pernambuco", INDICADOR_ABAST), None))
+
+    # 3) Variação ano-a-ano (LAG) por estado e indicador
+    # Observação: funções de janela requerem MySQL 8+
+    q3 = """
+    SELECT
+      regiao AS estado,
+      inadequacao,
+      ano,
+      valor_percentual,
+      LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano) AS valor_ano_anterior,
+      (valor_percentual - LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano)) AS diff_pct_points
+    FROM estados
+    WHERE inadequacao = %s
+    ORDER BY regiao, ano;
+    """
+    if agregados:
         q3 = """
         SELECT
           regiao AS estado,
           inadequacao,
           ano,
           valor_percentual,
-          LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano) AS valor_ano_anterior,
-          (valor_percentual - LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano)) AS diff_pct_points
-        FROM estados
+          valor_ano_anterior,
+          diff_pct_points
+        FROM variacao_anual_estados
         WHERE inadequacao = %s
         ORDER BY regiao, ano;
         """
-        df3 = pd.read_sql_query(q3, conn, params=(INDICADOR_DOMICILIOS,))
-        run_and_save(df3, f"04_lag_variacao_por_estado_{INDICADOR_DOMICILIOS.replace(' ','_')}.csv")
+    consultas.append((f"04_lag_variacao_por_estado_{INDICADOR_DOMICILIOS.replace(' ','_')}.csv", q3, (INDICADOR_DOMICILIOS,), None))
 
-        # 4) Resumo estatístico (média, desvio) por estado/indicador
+    # 4) Resumo estatístico (média, desvio) por estado/indicador
+    q4 = """
+    SELECT
+      regiao AS estado,
+      inadequacao,
+      ROUND(AVG(valor_percentual),2) AS media_pct,
+      ROUND(STDDEV_SAMP(valor_percentual),2) AS stddev_pct,
+      MIN(valor_percentual) AS min_pct,
+      MAX(valor_percentual) AS max_pct
+    FROM estados
+    GROUP BY regiao, inadequacao
+    ORDER BY inadequacao, media_pct DESC, estado;
+    """
+    if agregados:
         q4 = """
         SELECT
           regiao AS estado,
           inadequacao,
-          ROUND(AVG(valor_percentual),2) AS media_pct,
-          ROUND(STDDEV_SAMP(valor_percentual),2) AS stddev_pct,
-          MIN(valor_percentual) AS min_pct,
-          MAX(valor_percentual) AS max_pct
-        FROM estados
-        GROUP BY regiao, inadequacao
-        ORDER BY inadequacao, media_pct DESC;
+          ROUND(media,2) AS media_pct,
+          ROUND(sd,2) AS stddev_pct,
+          min_pct,
+          max_pct
+        FROM resumo_serie_estados
+        ORDER BY inadequacao, media_pct DESC, estado;
         """
-        df4 = pd.read_sql_query(q4, conn)
-        run_and_save(df4, "05_resumo_estatistico_estado_indicador.csv")
+    consultas.append(("05_resumo_estatistico_estado_indicador.csv", q4, None, None))
 
-        # 5) Maior variação entre 2016 e 2019 (por estado e indicador)
-        q5 = """
-        SELECT
-          a.inadequacao,
-          a.regiao AS estado,
-          a.valor_percentual AS pct_2016,
-          b.valor_percentual AS pct_2019,
-          ROUND(b.valor_percentual - a.valor_percentual,2) AS diff_2019_2016
-        FROM
-          (SELECT regiao, inadequacao, valor_percentual FROM estados WHERE ano = 2016) a
-        JOIN
-          (SELECT regiao, inadequacao, valor_percentual FROM estados WHERE ano = 2019) b
-          ON a.regiao = b.regiao AND a.inadequacao = b.inadequacao
-        ORDER BY diff_2019_2016 DESC
-        LIMIT 50;
-        """
-        df5 = pd.read_sql_query(q5, conn)
-        run_and_save(df5, "06_diff_2019_2016_top50.csv")
+    # 5) Maior variação entre 2016 e 2019 (por estado e indicador)
+    q5 = """
+    SELECT
+      a.inadequacao,
+      a.regiao AS estado,
+      a.valor_percentual AS pct_2016,
+      b.valor_percentual AS pct_2019,
+      ROUND(b.valor_percentual - a.valor_percentual,2) AS diff_2019_2016
+    FROM
+      (SELECT regiao, inadequacao, valor_percentual FROM estados WHERE ano = 2016) a
+    JOIN
+      (SELECT regiao, inadequacao, valor_percentual FROM estados WHERE ano = 2019) b
+      ON a.regiao = b.regiao AND a.inadequacao = b.inadequacao
+    ORDER BY diff_2019_2016 DESC, a.regiao, a.inadequacao
+    LIMIT 50;
+    """
+    consultas.append(("06_diff_2019_2016_top50.csv", q5, None, None))
 
-        # 6) Pivot-like: média percentual por estado x indicador (export para heatmap)
+    # 6) Pivot-like: média percentual por estado x indicador (export para heatmap)
+    q6 = """
+    SELECT
+      regiao AS estado,
+      inadequacao AS indicador,
+      ROUND(AVG(valor_percentual),2) AS media_pct
+    FROM estados
+    GROUP BY regiao, inadequacao
+    ORDER BY indicador, media_pct DESC, estado;
+    """
+    if agregados:
         q6 = """
         SELECT
           regiao AS estado,
           inadequacao AS indicador,
-          ROUND(AVG(valor_percentual),2) AS media_pct
-        FROM estados
-        GROUP BY regiao, inadequacao
-        ORDER BY indicador, media_pct DESC;
+          ROUND(media,2) AS media_pct
+        FROM resumo_serie_estados
+        ORDER BY indicador, media_pct DESC, estado;
         """
-        df6 = pd.read_sql_query(q6, conn)
-        run_and_save(df6, "07_media_estado_indicador_for_heatmap.csv")
+    consultas.append(("07_media_estado_indicador_for_heatmap.csv", q6, None, None))
 
-        # 7) Alertas: valores recentes > media + 2*sd
+    # 7) Alertas: valores recentes > media + 2*sd
+    q7 = """
+    WITH stats AS (
+      SELECT
+        regiao,
+        inadequacao,
+        AVG(valor_percentual) AS media,
+        STDDEV_SAMP(valor_percentual) AS sd
+      FROM estados
+      GROUP BY regiao, inadequacao
+    ),
+    latest AS (
+      SELECT s.regiao, s.inadequacao, s.valor_percentual
+      FROM estados s
+      JOIN (
+        SELECT regiao, inadequacao, MAX(ano) AS max_ano FROM estados GROUP BY regiao, inadequacao
+      ) lm ON s.regiao = lm.regiao AND s.inadequacao = lm.inadequacao AND s.ano = lm.max_ano
+    )
+    SELECT
+      l.regiao,
+      l.inadequacao,
+      l.valor_percentual AS atual,
+      ROUND(st.media,2) AS media_historica,
+      ROUND(st.sd,2) AS sd_historica,
+      ROUND((l.valor_percentual - st.media),2) AS diff_from_mean
+    FROM latest l
+    JOIN stats st ON l.regiao = st.regiao AND l.inadequacao = st.inadequacao
+    WHERE l.valor_percentual > st.media + 2 * st.sd
+    ORDER BY diff_from_mean DESC, l.regiao, l.inadequacao;
+    """
+    if agregados:
         q7 = """
-        WITH stats AS (
-          SELECT
-            regiao,
-            inadequacao,
-            AVG(valor_percentual) AS media,
-            STDDEV_SAMP(valor_percentual) AS sd
-          FROM estados
-          GROUP BY regiao, inadequacao
-        ),
-        latest AS (
-          SELECT s.regiao, s.inadequacao, s.valor_percentual
-          FROM estados s
-          JOIN (
-            SELECT regiao, inadequacao, MAX(ano) AS max_ano FROM estados GROUP BY regiao, inadequacao
-          ) lm ON s.regiao = lm.regiao AND s.inadequacao = lm.inadequacao AND s.ano = lm.max_ano
-        )
         SELECT
-          l.regiao,
-          l.inadequacao,
-          l.valor_percentual AS atual,
-          ROUND(st.media,2) AS media_historica,
-          ROUND(st.sd,2) AS sd_historica,
-          ROUND((l.valor_percentual - st.media),2) AS diff_from_mean
-        FROM latest l
-        JOIN stats st ON l.regiao = st.regiao AND l.inadequacao = st.inadequacao
-        WHERE l.valor_percentual > st.media + 2 * st.sd
-        ORDER BY diff_from_mean DESC;
+          regiao,
+          inadequacao,
+          valor_ultimo_ano AS atual,
+          ROUND(media,2) AS media_historica,
+          ROUND(sd,2) AS sd_historica,
+          ROUND((valor_ultimo_ano - media),2) AS diff_from_mean
+        FROM resumo_serie_estados
+        WHERE valor_ultimo_ano > media + 2 * sd
+        ORDER BY diff_from_mean DESC, regiao, inadequacao;
         """
-        df7 = pd.read_sql_query(q7, conn)
-        run_and_save(df7, "08_alertas_outliers.csv")
+    consultas.append(("08_alertas_outliers.csv", q7, None, None))
 
-        # 8) Comparativo Estados x Metropolis (mesmo indicador/ano) — exemplo Abastecimento de água / 2019
-        q8 = f"""
-        SELECT
-          e.ano,
-          e.inadequacao,
-          e.regiao AS estado,
-          e.valor_percentual AS pct_estado,
-          m.regiao AS metropole,
-          m.valor_percentual AS pct_metropole,
-          ROUND(m.valor_percentual - e.valor_percentual,2) AS diff_metropole_minus_estado
-        FROM estados e
-        LEFT JOIN metropolis m
-          ON e.inadequacao = m.inadequacao AND e.ano = m.ano
-        WHERE e.ano = %s
-          AND e.inadequacao = %s
-        ORDER BY diff_metropole_minus_estado DESC
-        LIMIT 100;
-        """
-        df8 = pd.read_sql_query(q8, conn, params=(ANALYSIS_YEAR, INDICADOR_ABAST))
-        run_and_save(df8, f"09_comparativo_estado_metropole_{ANALYSIS_YEAR}_abastecimento.csv")
+    # 8) Comparativo Estados x Metropolis (mesmo indicador/ano) — exemplo Abastecimento de água / 2019
+    q8 = f"""
+    SELECT
+      e.ano,
+      e.inadequacao,
+      e.regiao AS estado,
+      e.valor_percentual AS pct_estado,
+      m.regiao AS metropole,
+      m.valor_percentual AS pct_metropole,
+      ROUND(m.valor_percentual - e.valor_percentual,2) AS diff_metropole_minus_estado
+    FROM estados e
+    LEFT JOIN metropolis m
+      ON e.inadequacao = m.inadequacao AND e.ano = m.ano
+    WHERE e.ano = %s
+      AND e.inadequacao = %s
+    ORDER BY diff_metropole_minus_estado DESC, e.regiao, m.regiao
+    LIMIT 100;
+    """
+    consultas.append((f"09_comparativo_estado_metropole_{ANALYSIS_YEAR}_abastecimento.csv", q8, (ANALYSIS_YEAR, INDICADOR_ABAST), None))
 
-        print("[ALL] Todas as consultas executadas e exportadas.")
-    except Exception as e:
-        print(f"[ERROR] Durante execução das queries: {e}")
-    finally:
-        if conn:
-            conn.close()
-            print("[INFO] Conexão fechada.")
+    return consultas
+
+def executa_consultas(consultas, backend="mysql", pool_size=POOL_SIZE, timeout=QUERY_TIMEOUT,
+                      usar_cache=True, cache_max_mb=CACHE_MAX_MB, agregados=False):
+    """Executa as consultas em paralelo; uma falha não interrompe as demais"""
+    motor = abre_backend(backend, pool_size, timeout, agregados)
+    inicio = time.perf_counter()
+    falhas = 0
+
+    cache, versoes = None, None
+    if usar_cache:
+        cache = CacheResultados(OUTPUT_DIR, max_mb=cache_max_mb)
+        versoes = motor.versoes()
+
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        futuros = {
+            executor.submit(executa_consulta, motor, filename, query, params, divisor, cache, versoes): filename
+            for filename, query, params, divisor in consultas
+        }
+        for futuro in as_completed(futuros):
+            filename = futuros[futuro]
+            try:
+                duracao, do_cache = futuro.result()
+                if do_cache:
+                    print(f"[CACHE] {filename}: tabelas sem alteração, consulta pulada")
+                else:
+                    print(f"[INFO] {filename}: {duracao:.2f}s")
+            except Exception as e:
+                falhas += 1
+                print(f"[ERROR] Durante execução da query {filename}: {e}")
+    motor.fecha()
+
+    total = time.perf_counter() - inicio
+    if falhas:
+        print(f"[ERROR] {falhas} de {len(consultas)} consultas falharam ({total:.2f}s).")
+    else:
+        print(f"[ALL] Todas as consultas executadas e exportadas ({total:.2f}s).")
+    return falhas
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Executa as consultas analíticas e exporta CSVs.")
+    parser.add_argument("--backend", choices=("mysql",) + BACKENDS_EMBUTIDOS, default="mysql",
+                        help="Onde rodar as consultas: servidor MySQL ou motor embutido sobre data/final (padrão: mysql)")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE,
+                        help=f"Conexões no pool / consultas simultâneas (padrão: {POOL_SIZE})")
+    parser.add_argument("--timeout", type=float, default=QUERY_TIMEOUT,
+                        help=f"Tempo máximo por consulta em segundos, 0 = sem limite (padrão: {QUERY_TIMEOUT})")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignora o cache e refaz todas as consultas")
+    parser.add_argument("--cache-max-mb", type=float, default=CACHE_MAX_MB,
+                        help=f"Tamanho máximo do cache de resultados em MB (padrão: {CACHE_MAX_MB})")
+    parser.add_argument("--agregados", action="store_true",
+                        help="q3, q4, q6 e q7 leem as tabelas de resumo mantidas pelo importador")
+    parser.add_argument("--varredura", nargs="+", choices=list(TEMPLATES) + ["todas"],
+                        help="Roda as consultas do registro em vez das exportações padrão")
+    parser.add_argument("--anos", nargs="+", type=int, help="Anos da varredura (padrão: todos)")
+    parser.add_argument("--indicadores", nargs="+", help="Indicadores da varredura (padrão: todos)")
+    parser.add_argument("--regioes", nargs="+", help="Regiões da varredura (padrão: todas)")
+    parser.add_argument("--top-n", type=int, default=TOP_N, help=f"N das consultas top-N (padrão: {TOP_N})")
+    adiciona_opcoes(parser)
+    adiciona_opcoes_escrita(parser)
+    return parser.parse_args()
+
+def monta_varreduras(args):
+    nomes = list(TEMPLATES) if "todas" in args.varredura else args.varredura
+    return [
+        monta_varredura(nome, anos=args.anos, indicadores=args.indicadores,
+                        regioes=args.regioes, top_n=args.top_n)
+        for nome in nomes
+    ]
+
+def main():
+    args = parse_args()
+    inicia("06_exporta_consultas", args.perfil)
+    configura_escrita(args.geracoes, args.trava)
+    consultas = monta_varreduras(args) if args.varredura else monta_consultas(args.agregados)
+    executa_consultas(consultas, backend=args.backend, pool_size=args.pool_size, timeout=args.timeout,
+                      usar_cache=not args.force, cache_max_mb=args.cache_max_mb, agregados=args.agregados)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
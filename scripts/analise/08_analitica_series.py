@@ -0,0 +1,68 @@
+# scripts/analise/08_analitica_series.py
+"""
+Calcula, para todas as séries (regiao, inadequacao) do consolidado de uma vez, variação
+anual, diferenças entre todos os pares de anos, z-score móvel, outliers pelo MAD e
+tendência linear, e grava tudo numa tabela só para o Power BI
+(data/exports/analitica_series.csv).
+
+Lê data/exports/infraestrutura_final.csv (ou o snapshot binário .snap, os dois gerados
+por 07) e não precisa do MySQL. As métricas estão em scripts/comum/analitica_series.py.
+
+Uso:
+    python scripts/analise/08_analitica_series.py [--janela N] [--limiar-z Z] [--limiar-mad Z]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.analitica_series import JANELA, LIMIAR_MAD, LIMIAR_Z, calcula_analitica
+from comum.caminhos import EXPORTS_DIR
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita, escrita_atomica
+from comum.indice_consolidado import CONSOLIDADO, IndiceConsolidado
+from comum.instrumentacao import adiciona_opcoes, cronometro, inicia, registra_arquivo
+
+OUTPUT_PATH = EXPORTS_DIR / "analitica_series.csv"
+
+
+def gera_analitica(indice=None, janela=JANELA, limiar_z=LIMIAR_Z, limiar_mad=LIMIAR_MAD, saida=OUTPUT_PATH):
+    if indice is None:
+        if not CONSOLIDADO.exists():
+            print(f"[ERROR] {CONSOLIDADO} não encontrado — rode 07_consolida_final_to_csv.py antes")
+            return None
+        indice = IndiceConsolidado.carrega()
+
+    with cronometro("analitica"):
+        df = calcula_analitica(indice, janela, limiar_z, limiar_mad)
+
+    with escrita_atomica(saida) as tmp:
+        df.to_csv(tmp, index=False, encoding="utf-8")
+    registra_arquivo("escrita", saida, linhas=len(df))
+    print(f"[INFO] {len(indice.inicio) - 1} séries, {len(indice.anos)} anos; "
+          f"{int(df['alerta_z_movel'].sum())} alertas de z-score móvel, {int(df['outlier_mad'].sum())} outliers (MAD)")
+    print(f"[OK] Analítica salva em {saida} ({len(df)} linhas)")
+    return df
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Analítica de todas as séries do consolidado para o BI.")
+    parser.add_argument("--janela", type=int, default=JANELA,
+                        help=f"anos anteriores no z-score móvel, no mínimo 2 (padrão: {JANELA})")
+    parser.add_argument("--limiar-z", type=float, default=LIMIAR_Z,
+                        help=f"z-score móvel acima do qual o ano é alerta (padrão: {LIMIAR_Z})")
+    parser.add_argument("--limiar-mad", type=float, default=LIMIAR_MAD,
+                        help=f"|z| robusto acima do qual o ano é outlier (padrão: {LIMIAR_MAD})")
+    adiciona_opcoes(parser)
+    adiciona_opcoes_escrita(parser)
+    args = parser.parse_args()
+    if args.janela < 2:
+        parser.error("--janela precisa ser pelo menos 2")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    inicia("08_analitica_series", args.perfil)
+    configura_escrita(args.geracoes, args.trava)
+    gera_analitica(janela=args.janela, limiar_z=args.limiar_z, limiar_mad=args.limiar_mad)
@@ -0,0 +1,111 @@
+"""Compara os backends de 06_exporta_consultas.py (MySQL x DuckDB embutido).
+
+Para cada backend mede o tempo de abertura (conexão/pool ou carga dos CSVs) e o tempo
+das consultas padrão, em algumas repetições, e confere se os resultados são iguais aos
+do primeiro backend (mesmas linhas, independente da ordem de empates).
+Se o MySQL não estiver acessível, só o DuckDB é medido. Sem servidor, a paridade é
+conferida em tests/test_exporta_consultas.py: o DuckDB grava, byte a byte, os CSVs que
+o MySQL gravou em data/exports.
+
+Uso (na raiz do projeto):
+    python scripts/benchmark/benchmark_backends.py [--repeticoes N] [--backends mysql duckdb]
+"""
+
+import argparse
+import importlib.util
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.caminhos import BENCHMARK_DIR
+
+SCRIPT_CONSULTAS = Path(__file__).resolve().parents[1] / "analise" / "06_exporta_consultas.py"
+OUTPUT_PATH = BENCHMARK_DIR / "benchmark_backends.json"
+
+
+def carrega_script_consultas():
+    spec = importlib.util.spec_from_file_location("exporta_consultas", SCRIPT_CONSULTAS)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def mede_backend(exporta, backend, repeticoes):
+    inicio = time.perf_counter()
+    motor = exporta.abre_backend(backend)
+    abertura = time.perf_counter() - inicio
+
+    consultas = exporta.monta_consultas()
+    tempos, resultados = [], {}
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for filename, query, params, _divisor in consultas:
+            resultados[filename] = motor.le(query, params)
+        tempos.append(time.perf_counter() - inicio)
+    motor.fecha()
+    return abertura, tempos, resultados
+
+
+def normaliza(df):
+    """Ordena linhas e colunas para comparar resultados sem depender da ordem de empates"""
+    df = df.copy()
+    for c in df.columns:
+        if pd.api.types.is_float_dtype(df[c]):
+            df[c] = df[c].astype("float64").round(6)
+    df = df.astype(str)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def compara(referencia, resultados):
+    diferentes = []
+    for filename, df_ref in referencia.items():
+        df = resultados.get(filename)
+        if df is None or list(df.columns) != list(df_ref.columns) or not normaliza(df).equals(normaliza(df_ref)):
+            diferentes.append(filename)
+    return diferentes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de consulta.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", default=["mysql", "duckdb"])
+    args = parser.parse_args()
+
+    exporta = carrega_script_consultas()
+    relatorio, referencia = {}, None
+    for backend in args.backends:
+        try:
+            abertura, tempos, resultados = mede_backend(exporta, backend, args.repeticoes)
+        except Exception as e:
+            print(f"[WARN] Backend {backend} indisponível: {e} — pulando")
+            continue
+
+        relatorio[backend] = {
+            "abertura_s": round(abertura, 4),
+            "consultas_mediana_s": round(statistics.median(tempos), 4),
+            "consultas_min_s": round(min(tempos), 4),
+            "repeticoes": args.repeticoes,
+        }
+        if referencia is None:
+            referencia = resultados
+        else:
+            diferentes = compara(referencia, resultados)
+            relatorio[backend]["resultados_diferentes"] = diferentes
+            if diferentes:
+                print(f"[WARN] {backend}: resultados diferentes em {diferentes}")
+            else:
+                print(f"[OK] {backend}: resultados iguais aos de {args.backends[0]}")
+        print(f"[INFO] {backend}: abertura {abertura:.3f}s, consultas {statistics.median(tempos):.3f}s (mediana)")
+
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    OUTPUT_PATH.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"[OK] Relatório salvo em {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Mede o índice em memória (comum/indice_consolidado.py) contra as consultas SQL de 06.
+
+Carrega data/exports/infraestrutura_final.csv no índice e roda, no backend escolhido
+(DuckDB embutido por padrão, ou MySQL), as consultas de 06_exporta_consultas.py que o
+índice responde: top-N de estados e de RMs (q1/q1b), série (q2), LAG (q3), diferença
+2019-2016 (q5) e alertas (q7). Que os resultados são iguais aos do SQL (menos a
+contagem: o consolidado tem o número inteiro, "575.009" -> 575009, e o MySQL lê o
+último ponto como decimal, 575) é conferido em tests/test_indice_consolidado.py, com
+as funções de `casos`.
+
+Grava em JSON o tempo médio de cada consulta no índice (µs) e no SQL (ms).
+
+Uso (na raiz do projeto, depois de 04 e 07):
+    python scripts/benchmark/benchmark_indice.py [--backend duckdb|mysql] [--repeticoes N]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmark_backends import carrega_script_consultas
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.caminhos import BENCHMARK_DIR
+from comum.indice_consolidado import IndiceConsolidado
+
+OUTPUT_PATH = BENCHMARK_DIR / "benchmark_indice.json"
+
+
+def casos(exporta, indice):
+    """(arquivo de 06, função que responde pelo índice -> DataFrame com as colunas do SQL, menos contagem)"""
+    ano, top_n = exporta.ANALYSIS_YEAR, exporta.TOP_N
+    domicilios, abast = exporta.INDICADOR_DOMICILIOS, exporta.INDICADOR_ABAST
+
+    def top(tabela, indicador, rotulo):
+        linhas = indice.top_n(ano, indicador, top_n, tabela)
+        return pd.DataFrame(
+            [(ano, indicador, r, v) for r, _c, v in linhas],
+            columns=["ano", "inadequacao", rotulo, "valor_percentual"],
+        )
+
+    def lag():
+        linhas = indice.variacao_indicador(domicilios, "estados")
+        return pd.DataFrame(
+            [(r, domicilios, a, v, ant, d) for r, a, v, ant, d in linhas],
+            columns=["estado", "inadequacao", "ano", "valor_percentual", "valor_ano_anterior", "diff_pct_points"],
+        )
+
+    return [
+        (f"01_top{top_n}_estados_{ano}_domicilios_inadequados.csv", lambda: top("estados", domicilios, "estado")),
+        (f"02_top{top_n}_metropolis_{ano}_abastecimento.csv", lambda: top("metropolis", abast, "metropole")),
+        ("03_evolucao_pernambuco_abastecimento.csv",
+         lambda: pd.DataFrame(indice.serie("Pernambuco", abast), columns=["ano", "valor_percentual"])),
+        (f"04_lag_variacao_por_estado_{domicilios.replace(' ', '_')}.csv", lag),
+        ("06_diff_2019_2016_top50.csv",
+         lambda: pd.DataFrame(indice.diff_anos(2016, 2019, "estados", 50),
+                              columns=["inadequacao", "estado", "pct_2016", "pct_2019", "diff_2019_2016"])),
+        ("08_alertas_outliers.csv",
+         lambda: pd.DataFrame(indice.alertas("estados"),
+                              columns=["regiao", "inadequacao", "atual", "media_historica", "sd_historica", "diff_from_mean"])),
+    ]
+
+
+def mede(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o índice em memória contra o SQL de 06.")
+    parser.add_argument("--backend", default="duckdb", help="backend do SQL de referência (padrão: duckdb)")
+    parser.add_argument("--repeticoes", type=int, default=1000, help="repetições de cada consulta no índice")
+    parser.add_argument("--saida", type=Path, default=OUTPUT_PATH, help=f"arquivo JSON (padrão: {OUTPUT_PATH})")
+    args = parser.parse_args()
+
+    exporta = carrega_script_consultas()
+    inicio = time.perf_counter()
+    indice = IndiceConsolidado.carrega()
+    carga = time.perf_counter() - inicio
+    print(f"[INFO] Índice carregado: {len(indice)} linhas em {carga * 1000:.1f} ms")
+
+    sql = {filename: (query, params) for filename, query, params, _divisor in exporta.monta_consultas()}
+    motor = exporta.abre_backend(args.backend)
+    relatorio = {"backend": args.backend, "carga_ms": round(carga * 1000, 3), "consultas": {}}
+    for filename, funcao in casos(exporta, indice):
+        query, params = sql[filename]
+        tempo_sql, df_sql = mede(lambda: motor.le(query, params), 1)
+        tempo_indice, _df_indice = mede(funcao, args.repeticoes)
+        relatorio["consultas"][filename] = {
+            "linhas": len(df_sql),
+            "indice_us": round(tempo_indice * 1e6, 2),
+            "sql_ms": round(tempo_sql * 1000, 3),
+        }
+        print(f"    {filename:<52} {tempo_indice * 1e6:>9.1f} µs {tempo_sql * 1000:>9.2f} ms")
+    motor.fecha()
+
+    args.saida.parent.mkdir(parents=True, exist_ok=True)
+    args.saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[OK] Resultados salvos em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
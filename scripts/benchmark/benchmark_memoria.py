@@ -0,0 +1,120 @@
+"""Pico de memória das etapas 02, 03, 04 e 07 com e sem --chunksize.
+
+Gera numa pasta temporária arquivos de data/raw sintéticos (as linhas dos CSVs reais
+repetidas `fator` vezes), copia scripts/ para lá e roda cada etapa como subprocesso,
+medindo o pico de memória residente (ru_maxrss) de cada uma. No modo em blocos o pico
+deve ficar praticamente igual quando o arquivo cresce; no modo completo cresce junto.
+Que as saídas dos dois modos são idênticas é conferido em tests/test_blocos.py.
+
+Só roda em sistemas com os.wait4 (Linux/macOS).
+
+Uso (na raiz do projeto):
+    python scripts/benchmark/benchmark_memoria.py [--fatores 100 1000] [--chunksize 50000]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+from comum.caminhos import BENCHMARK_DIR, RAW_DIR
+
+OUTPUT_PATH = BENCHMARK_DIR / "benchmark_memoria.json"
+
+# (script, argumentos fixos); 02 e 03 sem pool de processos, para medir um arquivo por vez
+ETAPAS = [
+    ("tratamento/02_limpeza_padronizacao.py", ["--jobs", "1"]),
+    ("tratamento/03_filtragem_regioes.py", ["--jobs", "1"]),
+    ("tratamento/04_padronizacao_csvs.py", []),
+    ("integracao/07_consolida_final_to_csv.py", []),
+]
+
+# ru_maxrss vem em KiB no Linux e em bytes no macOS
+_ESCALA_MAXRSS = 1 if sys.platform == "darwin" else 1024
+
+
+def gera_raw_sintetico(destino, fator):
+    """Copia cada CSV de data/raw repetindo as linhas de dados `fator` vezes"""
+    destino.mkdir(parents=True, exist_ok=True)
+    n_linhas = 0
+    for origem in sorted(RAW_DIR.glob("*.csv")):
+        with open(origem, encoding="utf-8") as f:
+            cabecalho, *linhas = f.read().splitlines(keepends=True)
+        corpo = "".join(l if l.endswith("\n") else l + "\n" for l in linhas)
+        with open(destino / origem.name, "w", encoding="utf-8") as f:
+            f.write(cabecalho)
+            for _ in range(fator):
+                f.write(corpo)
+        n_linhas = max(n_linhas, len(linhas) * fator)
+    return n_linhas
+
+
+def roda_etapa(raiz, etapa, argumentos, chunksize):
+    """(segundos, pico de memória em MB) de uma etapa rodando como subprocesso"""
+    cmd = [sys.executable, str(raiz / "scripts" / etapa), *argumentos]
+    if chunksize:
+        cmd += ["--chunksize", str(chunksize)]
+    inicio = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=raiz, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, uso = os.wait4(proc.pid, 0)
+    duracao = time.perf_counter() - inicio
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"{etapa} falhou: {proc.stderr.read().decode(errors='replace')}")
+    proc.stderr.close()
+    return duracao, uso.ru_maxrss * _ESCALA_MAXRSS / 1e6
+
+
+def roda_pipeline(raiz, chunksize):
+    medidas = {}
+    for etapa, argumentos in ETAPAS:
+        duracao, pico = roda_etapa(raiz, etapa, argumentos, chunksize)
+        medidas[Path(etapa).stem] = {"segundos": round(duracao, 3), "pico_mb": round(pico, 1)}
+    return medidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o pico de memória com e sem processamento em blocos.")
+    parser.add_argument("--fatores", type=int, nargs="+", default=[100, 1000],
+                        help="quantas vezes repetir as linhas de cada CSV de data/raw")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args()
+
+    if not hasattr(os, "wait4"):
+        print("[ERROR] os.wait4 indisponível nesta plataforma; benchmark de memória não suportado.")
+        return
+
+    resultados = []
+    for fator in args.fatores:
+        with tempfile.TemporaryDirectory(prefix="bench_memoria_") as tmp:
+            for modo, chunksize in [("completo", None), ("blocos", args.chunksize)]:
+                raiz = Path(tmp) / modo
+                n_linhas = gera_raw_sintetico(raiz / "data" / "raw", fator)
+                shutil.copytree(SCRIPTS_DIR, raiz / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+                print(f"[INFO] fator {fator} ({n_linhas} linhas por arquivo), modo {modo}...")
+                medidas = roda_pipeline(raiz, chunksize)
+                resultados.append({"fator": fator, "linhas_por_arquivo": n_linhas, "modo": modo,
+                                   "chunksize": chunksize, "etapas": medidas})
+                for etapa, m in medidas.items():
+                    print(f"    {etapa:<32} {m['segundos']:>8.2f}s {m['pico_mb']:>9.1f} MB")
+
+    # Crescimento do pico do menor para o maior fator, por modo
+    print("\n[INFO] Pico de memória (maior etapa) por fator:")
+    for modo in ["completo", "blocos"]:
+        picos = [(r["fator"], max(m["pico_mb"] for m in r["etapas"].values()))
+                 for r in resultados if r["modo"] == modo]
+        print(f"    {modo:<9} " + "  ".join(f"x{f}: {p:.1f} MB" for f, p in picos))
+
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    OUTPUT_PATH.write_text(json.dumps(resultados, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[OK] Resultados salvos em {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
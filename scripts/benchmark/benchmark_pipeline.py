@@ -0,0 +1,184 @@
+"""Tempo e pico de memória de cada etapa do pipeline com dados sintéticos em escala.
+
+Para cada fator (10x a 10.000x os dados reais), gera data/raw sintético numa pasta
+temporária (dados_sinteticos.py), copia scripts/ para lá e roda as etapas como
+subprocessos, medindo tempo e pico de memória residente (ru_maxrss) de cada uma:
+02, 03, 04, 07 e as consultas de 06 no DuckDB embutido. Com --mysql entram também a
+carga (05) e as consultas de 06 no MySQL local; elas gravam no banco configurado em
+05_importa_mysql.py, por isso só rodam quando pedido.
+
+O resultado (JSON) traz o commit, as versões e as medidas por fator e etapa, e pode
+ser comparado com o de outro commit: `--compara base.json` aponta as etapas que
+ficaram mais lentas ou usaram mais memória além da tolerância e termina com código 1.
+
+Só roda em sistemas com os.wait4 (Linux/macOS).
+
+Uso (na raiz do projeto):
+    python scripts/benchmark/benchmark_pipeline.py [--fatores 10 100 1000] [--repeticoes 3]
+    python scripts/benchmark/benchmark_pipeline.py --compara data/benchmark/base.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmark_memoria import roda_etapa
+from dados_sinteticos import gera_raw
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+from comum.caminhos import BENCHMARK_DIR
+
+OUTPUT_PATH = BENCHMARK_DIR / "benchmark_pipeline.json"
+
+# (nome, script, argumentos, precisa de MySQL), na ordem de execução
+ETAPAS = [
+    ("02_limpeza_padronizacao", "tratamento/02_limpeza_padronizacao.py", [], False),
+    ("03_filtragem_regioes", "tratamento/03_filtragem_regioes.py", [], False),
+    ("04_padronizacao_csvs", "tratamento/04_padronizacao_csvs.py", [], False),
+    ("07_consolida_final_to_csv", "integracao/07_consolida_final_to_csv.py", [], False),
+    ("05_importa_mysql", "modelagem/05_importa_mysql.py", [], True),
+    ("06_exporta_consultas[duckdb]", "analise/06_exporta_consultas.py", ["--backend", "duckdb", "--force"], False),
+    ("06_exporta_consultas[mysql]", "analise/06_exporta_consultas.py", ["--force"], True),
+]
+
+TOLERANCIA = 0.25
+# diferenças menores que isso são ruído de medição, qualquer que seja a proporção
+MINIMO_SEGUNDOS = 0.2
+MINIMO_MB = 10.0
+
+
+def mysql_acessivel(host="localhost", porta=3306):
+    try:
+        with socket.create_connection((host, porta), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def metadados():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def mede_fator(fator, etapas, repeticoes):
+    """{etapa: medidas} de um fator, com a mediana do tempo e o maior pico entre as repetições"""
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        raiz = Path(tmp)
+        inicio = time.perf_counter()
+        n_linhas = gera_raw(raiz / "data" / "raw", fator)
+        print(f"[INFO] fator {fator}: {n_linhas} linhas por arquivo (gerado em {time.perf_counter() - inicio:.1f}s)")
+        shutil.copytree(SCRIPTS_DIR, raiz / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+
+        tempos = {nome: [] for nome, *_ in etapas}
+        picos = {nome: [] for nome, *_ in etapas}
+        for _ in range(repeticoes):
+            for nome, script, argumentos, _mysql in etapas:
+                duracao, pico = roda_etapa(raiz, script, argumentos, None)
+                tempos[nome].append(duracao)
+                picos[nome].append(pico)
+
+    medidas = {
+        nome: {
+            "segundos": round(statistics.median(tempos[nome]), 3),
+            "pico_mb": round(max(picos[nome]), 1),
+            "linhas_por_segundo": round(n_linhas * 7 / statistics.median(tempos[nome])),
+        }
+        for nome in tempos
+    }
+    for nome, m in medidas.items():
+        print(f"    {nome:<32} {m['segundos']:>8.2f}s {m['pico_mb']:>9.1f} MB")
+    return {"fator": fator, "linhas_por_arquivo": n_linhas, "etapas": medidas}
+
+
+def compara(base, atual, tolerancia):
+    """Regressões (texto) de `atual` em relação a `base`, por fator e etapa presentes nos dois"""
+    regressoes = []
+    base_por_fator = {r["fator"]: r["etapas"] for r in base["resultados"]}
+    for resultado in atual["resultados"]:
+        anteriores = base_por_fator.get(resultado["fator"], {})
+        for etapa, m in resultado["etapas"].items():
+            anterior = anteriores.get(etapa)
+            if anterior is None:
+                continue
+            for chave, minimo in [("segundos", MINIMO_SEGUNDOS), ("pico_mb", MINIMO_MB)]:
+                antes, depois = anterior[chave], m[chave]
+                if depois - antes > max(minimo, antes * tolerancia):
+                    regressoes.append(
+                        f"fator {resultado['fator']}, {etapa}: {chave} {antes} -> {depois} "
+                        f"(+{(depois / antes - 1) * 100 if antes else float('inf'):.0f}%)"
+                    )
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de todas as etapas com dados sintéticos.")
+    parser.add_argument("--fatores", type=int, nargs="+", default=[10, 100, 1000],
+                        help="tamanhos relativos aos dados reais (ex.: 10 100 1000 10000)")
+    parser.add_argument("--repeticoes", type=int, default=1, help="execuções por fator (mediana do tempo)")
+    parser.add_argument("--mysql", action="store_true",
+                        help="inclui a carga (05) e as consultas no MySQL local (grava no banco do 05)")
+    parser.add_argument("--saida", type=Path, default=OUTPUT_PATH, help=f"arquivo JSON (padrão: {OUTPUT_PATH})")
+    parser.add_argument("--compara", type=Path, default=None, help="JSON de outro commit para comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help=f"aumento relativo aceito antes de acusar regressão (padrão: {TOLERANCIA})")
+    args = parser.parse_args()
+
+    if not hasattr(os, "wait4"):
+        print("[ERROR] os.wait4 indisponível nesta plataforma; benchmark não suportado.")
+        return 1
+
+    etapas = ETAPAS
+    if not args.mysql:
+        etapas = [e for e in ETAPAS if not e[3]]
+    elif not mysql_acessivel():
+        print("[WARN] MySQL inacessível em localhost:3306 — etapas 05 e 06[mysql] puladas")
+        etapas = [e for e in ETAPAS if not e[3]]
+
+    relatorio = {"metadados": metadados(), "repeticoes": args.repeticoes, "resultados": []}
+    for fator in args.fatores:
+        relatorio["resultados"].append(mede_fator(fator, etapas, args.repeticoes))
+
+    args.saida.parent.mkdir(parents=True, exist_ok=True)
+    args.saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[OK] Resultados salvos em {args.saida}")
+
+    if args.compara:
+        base = json.loads(args.compara.read_text(encoding="utf-8"))
+        regressoes = compara(base, relatorio, args.tolerancia)
+        commit_base = base.get("metadados", {}).get("commit")
+        if regressoes:
+            print(f"[WARN] {len(regressoes)} regressão(ões) em relação a {commit_base}:")
+            for r in regressoes:
+                print(f"    {r}")
+            return 1
+        print(f"[OK] Sem regressões em relação a {commit_base} (tolerância {args.tolerancia:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Gerador de data/raw sintético, no formato dos CSVs baixados por 01_coleta_dados.py.
+
+Mesmo cabeçalho (com BOM), mesmos sete arquivos e indicadores, contagens e
+percentuais no formato brasileiro ("106.297", "2,89%"). As regiões são o Brasil, as
+macrorregiões e todas as UFs, mais regiões metropolitanas sintéticas espalhadas por
+todas as UFs ("Região Metropolitana 00012 de Bahia (BA)"); como o nome leva o da UF,
+as do Nordeste entram no recorte metropolis de 03_filtragem_regioes.py, e todas as
+etapas crescem junto com o fator.
+
+`fator` é relativo ao tamanho dos dados reais (56 regiões x 4 anos = 224 linhas por
+arquivo): com `n_anos` anos, o número de RMs sintéticas é ajustado para chegar a
+~224 x fator linhas por arquivo. A geração é determinística (semente fixa).
+
+Uso (na raiz do projeto):
+    python scripts/benchmark/dados_sinteticos.py --fator 100 --destino /tmp/bench/data/raw
+"""
+
+import argparse
+import csv
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.caminhos import RAW_SINTETICO_DIR
+from comum.esquema import INDICADORES
+from comum.etapas import ARQUIVOS_INDICADORES
+from comum.regioes import GRANDES_REGIOES, UFS, UFS_POR_MACRORREGIAO
+
+CABECALHO = [
+    "Ano", "Inadequação", "Região", "Contagem",
+    "Porcentagem em relação ao total de domicílios particulares permanentes duráveis urbanos ",
+]
+
+LINHAS_REAIS = 224
+ANO_FINAL = 2019
+N_ANOS = 4
+SEMENTE = 2016
+
+
+def formata_contagem(n):
+    """106297 -> "106.297" """
+    return f"{n:,}".replace(",", ".")
+
+
+def formata_percentual(p):
+    """2.894 -> "2,89%" """
+    return f"{p:.2f}%".replace(".", ",")
+
+
+def regioes_sinteticas(n_rms):
+    """Brasil, macrorregiões e UFs (na ordem dos dados reais) + `n_rms` RMs, em rodízio pelas UFs"""
+    ufs = [(sigla, uf) for ufs in UFS_POR_MACRORREGIAO.values() for sigla, uf in ufs.items()]
+    rms = []
+    for i in range(n_rms):
+        sigla, uf = ufs[i % len(ufs)]
+        rms.append(f"Região Metropolitana {i:05d} de {uf} ({sigla})")
+    return GRANDES_REGIOES + [uf for _, uf in ufs] + rms
+
+
+def gera_raw(destino, fator, n_anos=N_ANOS, semente=SEMENTE):
+    """Grava os sete CSVs em `destino`; devolve o número de linhas de dados por arquivo"""
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    n_regioes = math.ceil(LINHAS_REAIS * fator / n_anos)
+    regioes = regioes_sinteticas(max(n_regioes - len(GRANDES_REGIOES) - len(UFS), 0))
+    anos = range(ANO_FINAL - n_anos + 1, ANO_FINAL + 1)
+
+    for arquivo, indicador in zip(ARQUIVOS_INDICADORES, INDICADORES):
+        rng = random.Random(f"{semente}:{arquivo}")
+        with open(destino / arquivo, "w", encoding="utf-8-sig", newline="") as f:
+            escritor = csv.writer(f, lineterminator="\n")
+            escritor.writerow(CABECALHO)
+            for ano in anos:
+                for regiao in regioes:
+                    escritor.writerow([
+                        ano, indicador, regiao,
+                        formata_contagem(rng.randint(1_000, 2_000_000)),
+                        formata_percentual(rng.uniform(0.5, 95)),
+                    ])
+    return len(regioes) * len(anos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera CSVs sintéticos no formato de data/raw.")
+    parser.add_argument("--fator", type=int, default=10, help="tamanho relativo aos dados reais (padrão: 10)")
+    parser.add_argument("--anos", type=int, default=N_ANOS, help=f"anos por região (padrão: {N_ANOS})")
+    parser.add_argument("--destino", type=Path, default=RAW_SINTETICO_DIR,
+                        help="pasta de saída (padrão: data/raw_sintetico)")
+    args = parser.parse_args()
+
+    n_linhas = gera_raw(args.destino, args.fator, args.anos)
+    print(f"[OK] {len(ARQUIVOS_INDICADORES)} arquivos em {args.destino} ({n_linhas} linhas cada)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,29 @@
-"""Esse script vai criar uma pasta dados_brutos/ com os arquivos:
+"""Esse script baixa para data/raw/ (a pasta lida por 02_limpeza_padronizacao.py) os arquivos:
 -> abastecimento_agua.csv
 -> esgotamento_sanitario.csv
 -> coleta_lixo.csv
 -> ausencia_banheiro.csv
 -> piso_inadequado.csv
 -> inadequacao_fundiaria.csv
--> total_inadequados.csv"""
+-> total_inadequados.csv
 
-import os
-import pandas as pd
+Os indicadores são baixados em paralelo, gravados como vieram (sem passar pelo
+pandas) e só substituem o arquivo anterior se o conteúdo mudou; planilhas sem
+mudança nem são baixadas de novo (ETag/If-Modified-Since). Ver comum/coleta.py.
 
-# Criar pasta para armazenar os dados brutos
-os.makedirs("dados_brutos", exist_ok=True)
+Uso (a partir da raiz do projeto):
+    python scripts/coleta/01_coleta_dados.py [--destino data/raw] [--url TEMPLATE]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.caminhos import RAW_DIR
+from comum.coleta import ESPERA_BASE, TENTATIVAS, TIMEOUT, URL_PLANILHA, baixa_indicadores
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita
+from comum.instrumentacao import adiciona_opcoes, inicia
 
 # ID fixo da planilha
 SHEET_ID = "1CzNCJm5f4aNR3BY28FPUcaMlkKpC5MLK"
@@ -27,13 +39,40 @@ indicadores = {
     "total_inadequados": "1806311470"
 }
 
-# Loop para baixar e salvar cada indicador
-for nome, gid in indicadores.items():
-    url = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={gid}"
-    print(f"Baixando: {nome} ...")
-    try:
-        df = pd.read_csv(url)
-        df.to_csv(f"dados_brutos/{nome}.csv", index=False, encoding="utf-8-sig")
-        print(f"✅ {nome} salvo com sucesso!")
-    except Exception as e:
-        print(f"❌ Erro ao baixar {nome}: {e}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Baixa as planilhas de indicadores para data/raw.")
+    parser.add_argument("--destino", default=RAW_DIR, help="pasta dos CSVs baixados (padrão: data/raw)")
+    parser.add_argument(
+        "--url", default=URL_PLANILHA,
+        help="template da URL com {sheet_id} e {gid} (ex.: um servidor local nos testes)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="downloads simultâneos (padrão: um por indicador)")
+    parser.add_argument("--tentativas", type=int, default=TENTATIVAS, help=f"tentativas por arquivo (padrão: {TENTATIVAS})")
+    parser.add_argument("--espera", type=float, default=ESPERA_BASE, help=f"espera inicial entre tentativas, em segundos (padrão: {ESPERA_BASE})")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help=f"timeout de cada requisição, em segundos (padrão: {TIMEOUT})")
+    adiciona_opcoes(parser)
+    adiciona_opcoes_escrita(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    inicia("01_coleta_dados", args.perfil)
+    configura_escrita(args.geracoes, args.trava)
+    resultados = baixa_indicadores(
+        indicadores, args.destino, SHEET_ID, url=args.url, workers=args.workers,
+        tentativas=args.tentativas, espera_base=args.espera, timeout=args.timeout,
+    )
+
+    falhas = 0
+    for nome in indicadores:
+        situacao = resultados[nome]
+        if isinstance(situacao, Exception):
+            falhas += 1
+            print(f"❌ Erro ao baixar {nome}: {situacao}")
+        elif situacao == "baixado":
+            print(f"✅ {nome} salvo com sucesso!")
+        elif situacao == "igual":
+            print(f"✅ {nome} sem mudanças (mesmo conteúdo)")
+        else:
+            print(f"✅ {nome} sem mudanças (não modificado no servidor)")
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1 @@
+"""Módulos compartilhados entre os scripts do pipeline (coleta → tratamento → modelagem → análise)."""
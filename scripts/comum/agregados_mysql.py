@@ -0,0 +1,236 @@
+"""Tabelas de resumo mantidas pelo importador, para as consultas não varrerem as tabelas de fatos.
+
+Para cada tabela de fatos (estados, metropolis, nordeste):
+-> resumo_serie_<tabela>: uma linha por série (regiao, inadequacao) com número de anos,
+   média, desvio padrão amostral, mínimo, máximo, último ano e o valor nesse ano
+   (q4, q6 e q7 de 06_exporta_consultas.py);
+-> variacao_anual_<tabela>: uma linha por linha da tabela de fatos (mesmo id), com o
+   valor do ano anterior da série e a diferença em pontos percentuais (o LAG de q3).
+
+O importador (05_importa_mysql.py) chama `atualiza_agregados` depois de gravar cada
+tabela, numa única transação:
+-> carga completa: os resumos são refeitos a partir da tabela inteira;
+-> --incremental: só as partições (ano, inadequacao) que `sincroniza_dataframe` gravou
+   ou apagou. O resumo é refeito só para as séries com linha nessas partições, antes ou
+   depois da carga (a variação anual ainda guarda as de antes, inclusive as regiões
+   que saíram). Média, desvio e último ano dependem de todos os anos da série, então
+   essas séries são relidas inteiras. Na variação anual são refeitas as linhas do
+   indicador a partir do primeiro ano alterado: o LAG de uma linha só muda se ela ou o
+   ano anterior da série mudou. Acrescentar um ano novo refaz só as linhas desse ano.
+As agregações são as mesmas do SQL de 06, então `06_exporta_consultas.py --agregados`
+exporta os mesmos CSVs lendo só as tabelas de resumo, que crescem com o número de séries
+e não com o de linhas.
+
+O SQL serve também ao motor embutido (comum.motor_embutido).
+"""
+
+TABELAS = ["estados", "metropolis", "nordeste"]
+
+
+def tabela_resumo(table_name):
+    return f"resumo_serie_{table_name}"
+
+
+def tabela_variacao(table_name):
+    return f"variacao_anual_{table_name}"
+
+
+def ddl_agregados(table_name):
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {tabela_resumo(table_name)} (
+            inadequacao VARCHAR(255) NOT NULL,
+            regiao VARCHAR(255) NOT NULL,
+            n_anos INT NOT NULL,
+            media DOUBLE NOT NULL,
+            sd DOUBLE,
+            min_pct FLOAT NOT NULL,
+            max_pct FLOAT NOT NULL,
+            ultimo_ano INT NOT NULL,
+            valor_ultimo_ano FLOAT NOT NULL,
+            PRIMARY KEY (inadequacao, regiao)
+        );
+        """,
+        # chave na ordem de q3 (WHERE inadequacao = ... ORDER BY regiao, ano)
+        f"""
+        CREATE TABLE IF NOT EXISTS {tabela_variacao(table_name)} (
+            id BIGINT NOT NULL,
+            inadequacao VARCHAR(255) NOT NULL,
+            regiao VARCHAR(255) NOT NULL,
+            ano INT NOT NULL,
+            valor_percentual FLOAT NOT NULL,
+            valor_ano_anterior FLOAT,
+            diff_pct_points DOUBLE,
+            PRIMARY KEY (inadequacao, regiao, ano, id)
+        );
+        """,
+    ]
+
+
+def sql_atualizacao(table_name, inadequacoes=None):
+    """Comandos (sql, parâmetros) que refazem os resumos dos indicadores (todos, se None)"""
+    if inadequacoes is None:
+        filtro, params = "", ()
+    else:
+        filtro = f"WHERE inadequacao IN ({', '.join(['%s'] * len(inadequacoes))})"
+        params = tuple(inadequacoes)
+
+    resumo, variacao = tabela_resumo(table_name), tabela_variacao(table_name)
+    return [
+        (f"DELETE FROM {resumo} {filtro}", params),
+        (f"""
+        INSERT INTO {resumo}
+            (inadequacao, regiao, n_anos, media, sd, min_pct, max_pct, ultimo_ano, valor_ultimo_ano)
+        SELECT s.inadequacao, s.regiao, s.n_anos, s.media, s.sd, s.min_pct, s.max_pct, u.ano, u.valor_percentual
+        FROM (
+            SELECT
+              inadequacao,
+              regiao,
+              COUNT(*) AS n_anos,
+              AVG(valor_percentual) AS media,
+              STDDEV_SAMP(valor_percentual) AS sd,
+              MIN(valor_percentual) AS min_pct,
+              MAX(valor_percentual) AS max_pct
+            FROM {table_name}
+            {filtro}
+            GROUP BY inadequacao, regiao
+        ) s
+        JOIN (
+            SELECT
+              inadequacao,
+              regiao,
+              ano,
+              valor_percentual,
+              ROW_NUMBER() OVER (PARTITION BY regiao, inadequacao ORDER BY ano DESC, id DESC) AS ordem
+            FROM {table_name}
+            {filtro}
+        ) u ON u.regiao = s.regiao AND u.inadequacao = s.inadequacao AND u.ordem = 1
+        """, params * 2),
+        (f"DELETE FROM {variacao} {filtro}", params),
+        (f"""
+        INSERT INTO {variacao}
+            (id, inadequacao, regiao, ano, valor_percentual, valor_ano_anterior, diff_pct_points)
+        SELECT
+          id,
+          inadequacao,
+          regiao,
+          ano,
+          valor_percentual,
+          LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano) AS valor_ano_anterior,
+          (valor_percentual - LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano)) AS diff_pct_points
+        FROM {table_name}
+        {filtro}
+        """, params),
+    ]
+
+
+def sql_atualizacao_particoes(table_name, particoes):
+    """Comandos (sql, parâmetros) que atualizam os resumos depois de mudanças nas partições (ano, inadequacao).
+
+    Tem de rodar antes de qualquer outra mudança em variacao_anual_<tabela>, que ainda
+    guarda as regiões de cada partição antes da carga.
+    """
+    particoes = sorted(set(particoes))
+    resumo, variacao = tabela_resumo(table_name), tabela_variacao(table_name)
+
+    def nas_particoes(alias):
+        return "(" + " OR ".join([f"({alias}.ano = %s AND {alias}.inadequacao = %s)"] * len(particoes)) + ")"
+
+    params_particoes = tuple(v for ano, inadequacao in particoes for v in (int(ano), inadequacao))
+    # séries (regiao, inadequacao) com linha numa partição alterada, antes (variacao) ou depois (fatos)
+    serie_alterada = f"""(
+            EXISTS (SELECT 1 FROM {variacao} v WHERE v.regiao = {{0}}.regiao AND v.inadequacao = {{0}}.inadequacao
+                    AND {nas_particoes("v")})
+            OR EXISTS (SELECT 1 FROM {table_name} f WHERE f.regiao = {{0}}.regiao AND f.inadequacao = {{0}}.inadequacao
+                       AND {nas_particoes("f")})
+        )"""
+
+    # linhas da variação anual a refazer: do primeiro ano alterado de cada indicador em diante
+    primeiro_ano = {}
+    for ano, inadequacao in particoes:
+        primeiro_ano[inadequacao] = min(int(ano), primeiro_ano.get(inadequacao, int(ano)))
+    a_partir = " OR ".join(["({0}.inadequacao = %s AND {0}.ano >= %s)"] * len(primeiro_ano))
+    params_a_partir = tuple(v for inadequacao, ano in sorted(primeiro_ano.items()) for v in (inadequacao, ano))
+
+    return [
+        (f"DELETE FROM {resumo} WHERE {serie_alterada.format(resumo)}", params_particoes * 2),
+        (f"""
+        INSERT INTO {resumo}
+            (inadequacao, regiao, n_anos, media, sd, min_pct, max_pct, ultimo_ano, valor_ultimo_ano)
+        SELECT s.inadequacao, s.regiao, s.n_anos, s.media, s.sd, s.min_pct, s.max_pct, u.ano, u.valor_percentual
+        FROM (
+            SELECT
+              inadequacao,
+              regiao,
+              COUNT(*) AS n_anos,
+              AVG(valor_percentual) AS media,
+              STDDEV_SAMP(valor_percentual) AS sd,
+              MIN(valor_percentual) AS min_pct,
+              MAX(valor_percentual) AS max_pct
+            FROM {table_name} t
+            WHERE {serie_alterada.format("t")}
+            GROUP BY inadequacao, regiao
+        ) s
+        JOIN (
+            SELECT
+              inadequacao,
+              regiao,
+              ano,
+              valor_percentual,
+              ROW_NUMBER() OVER (PARTITION BY regiao, inadequacao ORDER BY ano DESC, id DESC) AS ordem
+            FROM {table_name} t
+            WHERE {serie_alterada.format("t")}
+        ) u ON u.regiao = s.regiao AND u.inadequacao = s.inadequacao AND u.ordem = 1
+        """, params_particoes * 4),
+        (f"DELETE FROM {variacao} WHERE {a_partir.format(variacao)}", params_a_partir),
+        # ano anterior de cada série pela chave única (ano, inadequacao, regiao) das cargas incrementais
+        (f"""
+        INSERT INTO {variacao}
+            (id, inadequacao, regiao, ano, valor_percentual, valor_ano_anterior, diff_pct_points)
+        SELECT id, inadequacao, regiao, ano, valor_percentual, valor_ano_anterior,
+               (valor_percentual - valor_ano_anterior) AS diff_pct_points
+        FROM (
+            SELECT
+              t.id,
+              t.inadequacao,
+              t.regiao,
+              t.ano,
+              t.valor_percentual,
+              (SELECT p.valor_percentual FROM {table_name} p
+               WHERE p.regiao = t.regiao AND p.inadequacao = t.inadequacao AND p.ano < t.ano
+               ORDER BY p.ano DESC LIMIT 1) AS valor_ano_anterior
+            FROM {table_name} t
+            WHERE {a_partir.format("t")}
+        ) x
+        """, params_a_partir),
+    ]
+
+
+def atualiza_agregados(conn, table_name, particoes=None):
+    """Atualiza, numa transação, os resumos depois da carga de `particoes` [(ano, inadequacao)].
+
+    None (carga completa) refaz tudo. Na primeira vez (tabelas de resumo vazias), refaz
+    todas as séries, mesmo que a carga incremental não tenha alterado nada.
+    """
+    cursor = conn.cursor()
+    for ddl in ddl_agregados(table_name):
+        cursor.execute(ddl)
+    if particoes is not None:
+        cursor.execute(f"SELECT COUNT(*) FROM {tabela_resumo(table_name)}")
+        (n_series,) = cursor.fetchone()
+        if n_series == 0:
+            particoes = None
+        elif not particoes:
+            cursor.close()
+            return
+
+    if particoes is None:
+        comandos = sql_atualizacao(table_name)
+    else:
+        comandos = sql_atualizacao_particoes(table_name, particoes)
+    for sql, params in comandos:
+        cursor.execute(sql, params)
+    conn.commit()
+    cursor.close()
+    escopo = "tabela inteira" if particoes is None else f"{len(set(particoes))} partição(ões)"
+    print(f"[INFO] {table_name}: resumos por série atualizados ({escopo}).")
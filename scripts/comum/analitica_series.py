@@ -0,0 +1,105 @@
+"""Analítica de todas as séries (regiao, inadequacao) de uma vez, em arrays NumPy.
+
+Parte da grade série × ano do índice do consolidado (comum.indice_consolidado), com
+NaN nos anos que a série não tem, e calcula cada métrica por operações sobre a grade
+inteira (somas com máscara, janelas deslizantes, mediana por linha), sem laço por série:
+-> delta_anual: diferença para o ano anterior disponível da série (o LAG de q3);
+-> diff_vs_<ano>: diferença para cada ano anterior da grade (todos os pares de anos; q5
+   é diff_vs_2016 nas linhas de 2019);
+-> z_movel: z-score do valor em relação aos `janela` anos anteriores da grade, só com
+   a janela completa; alerta_z_movel quando passa de `limiar_z`;
+-> z_mad: z-score robusto, 0,6745·(valor - mediana) / MAD da série; outlier_mad quando
+   |z_mad| passa de `limiar_mad` (3,5, de Iglewicz e Hoaglin);
+-> tendencia_pp_ano: inclinação da reta de mínimos quadrados da série, em pontos
+   percentuais por ano (repetida em todas as linhas da série).
+
+O resultado é uma tabela só, uma linha por (tabela, inadequacao, regiao, ano) do
+consolidado, com as métricas em colunas. O custo cresce com séries × anos, então
+milhares de regiões com todos os indicadores cabem numa passada.
+"""
+
+import numpy as np
+import pandas as pd
+
+JANELA = 3
+LIMIAR_Z = 2.0
+LIMIAR_MAD = 3.5
+CASAS = 4
+
+# constante que torna o MAD comparável ao desvio padrão numa normal
+_FATOR_MAD = 0.6745
+
+
+def _soma(valores, mascara, eixo=-1):
+    return np.where(mascara, valores, 0.0).sum(axis=eixo)
+
+
+def z_movel(grade, janela=JANELA):
+    """z-score de cada célula da grade contra as `janela` colunas anteriores (NaN se falta alguma)"""
+    n_series, n_anos = grade.shape
+    anteriores = np.concatenate([np.full((n_series, janela), np.nan), grade], axis=1)
+    janelas = np.lib.stride_tricks.sliding_window_view(anteriores, janela, axis=1)[:, :n_anos]
+    presentes = ~np.isnan(janelas)
+    n = presentes.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media = _soma(janelas, presentes) / n
+        desvios = _soma((janelas - media[..., None]) ** 2, presentes)
+        sd = np.sqrt(desvios / (n - 1))
+        z = (grade - media) / sd
+    return np.where((n == janela) & (sd > 0), z, np.nan)
+
+
+def z_mad(grade):
+    """z-score robusto (mediana e MAD de cada linha da grade)"""
+    mediana = np.nanmedian(grade, axis=1)
+    mad = np.nanmedian(np.abs(grade - mediana[:, None]), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = _FATOR_MAD * (grade - mediana[:, None]) / mad[:, None]
+    return np.where(mad[:, None] > 0, z, np.nan)
+
+
+def tendencia(grade, anos):
+    """Inclinação (por ano) da reta de mínimos quadrados de cada linha (NaN se < 2 anos)"""
+    presentes = ~np.isnan(grade)
+    x = np.broadcast_to(anos - anos.mean(), grade.shape)
+    n = presentes.sum(axis=1)
+    sx, sy = _soma(x, presentes, 1), _soma(grade, presentes, 1)
+    sxx, sxy = _soma(x * x, presentes, 1), _soma(x * grade, presentes, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inclinacao = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    return np.where(n >= 2, inclinacao, np.nan)
+
+
+def calcula_analitica(indice, janela=JANELA, limiar_z=LIMIAR_Z, limiar_mad=LIMIAR_MAD):
+    """DataFrame com as métricas de cada linha do índice, ordenado por (tabela, inadequacao, regiao, ano)"""
+    grade = indice.grade.astype(np.float64)
+    anos = indice.anos
+    serie = indice.serie_da_linha
+    pos_ano = np.searchsorted(anos, indice.ano)
+    valor = indice.valor.astype(np.float64)
+
+    z = z_movel(grade, janela)[serie, pos_ano]
+    robusto = z_mad(grade)[serie, pos_ano]
+    with np.errstate(invalid="ignore"):
+        pares = np.where(anos[None, :] < indice.ano[:, None], valor[:, None] - grade[serie], np.nan)
+
+    colunas = {
+        "tabela": indice.tabelas[indice.tab],
+        "inadequacao": indice.inadequacoes[indice.inad],
+        "regiao": indice.regioes[indice.reg],
+        "ano": indice.ano,
+        "valor_percentual": indice.valor,
+        "delta_anual": np.round(indice.diff, CASAS),
+        "z_movel": np.round(z, CASAS),
+        "alerta_z_movel": np.nan_to_num(z, nan=0.0) > limiar_z,
+        "z_mad": np.round(robusto, CASAS),
+        "outlier_mad": np.abs(np.nan_to_num(robusto, nan=0.0)) > limiar_mad,
+        "tendencia_pp_ano": np.round(tendencia(grade, anos.astype(np.float64))[serie], CASAS),
+    }
+    # a coluna do último ano seria toda vazia
+    for j, ano in enumerate(anos[:-1].tolist()):
+        colunas[f"diff_vs_{ano}"] = np.round(pares[:, j], CASAS)
+
+    df = pd.DataFrame(colunas)
+    ordem = np.lexsort((indice.ano, indice.reg, indice.inad, indice.tab))
+    return df.iloc[ordem].reset_index(drop=True)
@@ -0,0 +1,153 @@
+"""Camada de armazenamento de data/processed, data/filtered e data/final: CSV ou Parquet.
+
+Os scripts continuam se referindo aos arquivos pelo nome .csv; com --formato parquet
+o mesmo nome é gravado com extensão .parquet (colunas inadequação/região com
+dictionary encoding e estatísticas por row group). Na leitura, `le_tabela` usa o
+.parquet quando ele existe e é mais novo que o .csv, então as etapas seguintes leem
+qualquer um dos formatos sem mudança.
+
+O Parquet guarda as colunas com os tipos que o pd.read_csv daria ao reler o CSV
+(comum.etapas.como_relido_de_csv), para que os dois formatos entreguem exatamente os
+mesmos dados às etapas seguintes; a diferença é que no Parquet essa conversão é feita
+uma vez, na gravação, e não a cada leitura.
+
+Filtros (`filtros=[("ano", "in", [2018, 2019]), ("regiao", "==", "Bahia")]`, no
+formato do pyarrow) são aplicados na leitura do Parquet (row groups descartados pelas
+estatísticas) e, no CSV, depois da leitura. "regiao"/"inadequacao" também valem para
+as colunas acentuadas dos arquivos intermediários.
+
+Os CSVs de data/exports (Power BI) não passam por aqui.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from comum.escrita_atomica import escrita_atomica
+from comum.etapas import como_relido_de_csv, como_texto_de_csv
+from comum.instrumentacao import registra_arquivo
+
+FORMATOS = ("csv", "parquet")
+
+COLUNAS_DICIONARIO = ["inadequacao", "inadequação", "regiao", "região"]
+ROW_GROUP_PARQUET = 64_000
+
+_SINONIMOS = {"regiao": "região", "região": "regiao", "inadequacao": "inadequação", "inadequação": "inadequacao"}
+
+_OPERADORES = {
+    "==": lambda s, v: s == v,
+    "=": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "in": lambda s, v: s.isin(list(v)),
+    "not in": lambda s, v: ~s.isin(list(v)),
+}
+
+
+def resolve(caminho):
+    """Arquivo a ler para `caminho`: o .parquet de mesmo nome se for mais novo que o .csv"""
+    csv = Path(caminho).with_suffix(".csv")
+    parquet = csv.with_suffix(".parquet")
+    if parquet.exists() and (not csv.exists() or parquet.stat().st_mtime_ns >= csv.stat().st_mtime_ns):
+        return parquet
+    return csv
+
+
+def existe(caminho):
+    return resolve(caminho).exists()
+
+
+def lista_tabelas(pasta, padrao="*"):
+    """Arquivos (.csv ou .parquet) de `pasta` cujo nome casa com `padrao`, em ordem de nome"""
+    pasta = Path(pasta)
+    nomes = {p.stem for ext in FORMATOS for p in pasta.glob(f"{padrao}.{ext}")}
+    return [resolve(pasta / f"{nome}.csv") for nome in sorted(nomes)]
+
+
+def colunas_tabela(caminho):
+    """Nomes das colunas, sem ler os dados"""
+    arquivo = resolve(caminho)
+    if arquivo.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(arquivo).names
+    return list(pd.read_csv(arquivo, nrows=0).columns)
+
+
+def grava_tabela(df, caminho, formato="csv", **kwargs_csv):
+    """Grava `df` em `caminho` (.csv) ou no .parquet de mesmo nome; devolve o arquivo gravado"""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato} (use um de {FORMATOS})")
+    destino = Path(caminho).with_suffix(f".{formato}")
+    if formato == "csv":
+        with escrita_atomica(destino) as tmp:
+            df.to_csv(tmp, index=False, **kwargs_csv)
+        registra_arquivo("escrita", destino, linhas=len(df))
+        return destino
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabela = pa.Table.from_pandas(como_relido_de_csv(df), preserve_index=False)
+    with escrita_atomica(destino) as tmp:
+        pq.write_table(
+            tabela, tmp,
+            use_dictionary=[c for c in tabela.column_names if c in COLUNAS_DICIONARIO],
+            row_group_size=ROW_GROUP_PARQUET,
+        )
+    registra_arquivo("escrita", destino, linhas=len(df))
+    return destino
+
+
+def _ajusta_filtros(filtros, colunas):
+    """Troca regiao/inadequacao pelos nomes acentuados quando é o que o arquivo tem"""
+    ajustados = []
+    for coluna, operador, valor in filtros:
+        if coluna not in colunas and _SINONIMOS.get(coluna) in colunas:
+            coluna = _SINONIMOS[coluna]
+        ajustados.append((coluna, operador, valor))
+    return ajustados
+
+
+def aplica_filtros(df, filtros):
+    """Aplica em memória os mesmos filtros que o Parquet aplica na leitura"""
+    mascara = pd.Series(True, index=df.index)
+    for coluna, operador, valor in _ajusta_filtros(filtros, df.columns):
+        serie = df[coluna]
+        if pd.api.types.is_string_dtype(serie):
+            # lido com dtype=str: compara como texto
+            valor = [str(v) for v in valor] if operador in ("in", "not in") else str(valor)
+        mascara &= _OPERADORES[operador](serie, valor)
+    return df[mascara].reset_index(drop=True)
+
+
+def texto_como_csv(df, dtype):
+    """DataFrame lido do Parquet como o pd.read_csv o leria com `dtype`.
+
+    `dtype` é str ou um defaultdict com padrão str e tipos para algumas colunas
+    (ex.: comum.esquema.tipos_leitura_texto).
+    """
+    texto = como_texto_de_csv(df)
+    if isinstance(dtype, dict):
+        texto = texto.astype({c: t for c, t in dtype.items() if c in texto.columns})
+    return texto
+
+
+def le_tabela(caminho, filtros=None, dtype=None, **kwargs_csv):
+    """Lê `caminho` em CSV ou Parquet (ver `resolve`); com `dtype` (str) o Parquet vem como texto, como no CSV"""
+    arquivo = resolve(caminho)
+    if arquivo.suffix != ".parquet":
+        df = pd.read_csv(arquivo, dtype=dtype, **kwargs_csv)
+        registra_arquivo("leitura", arquivo, linhas=len(df))
+        return aplica_filtros(df, filtros) if filtros else df
+
+    import pyarrow.parquet as pq
+
+    if filtros:
+        filtros = _ajusta_filtros(filtros, pq.read_schema(arquivo).names)
+    df = pd.read_parquet(arquivo, filters=filtros or None)
+    registra_arquivo("leitura", arquivo, linhas=len(df))
+    return texto_como_csv(df, dtype) if dtype is not None else df
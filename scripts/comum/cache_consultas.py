@@ -0,0 +1,120 @@
+"""Cache persistente dos resultados exportados por 06_exporta_consultas.py.
+
+A chave de cada consulta é o hash de: arquivo de saída, SQL normalizado (espaços
+colapsados), parâmetros e carimbo de versão das tabelas que ela lê (versao_tabelas).
+Cada entrada guarda uma cópia dos CSVs gerados em data/cache/consultas/.
+
+Em um acerto, se os CSVs em data/exports/ ainda são os mesmos (mesmo sha256), nada é
+feito; se foram apagados ou alterados, são restaurados da cópia — sem rodar a consulta.
+O tamanho total é limitado; as entradas usadas há mais tempo saem primeiro (LRU).
+"""
+
+import hashlib
+import json
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from comum import caminhos
+from comum.escrita_atomica import escreve_texto, escrita_atomica
+
+CACHE_DIR = caminhos.CACHE_DIR / "consultas"
+CACHE_MAX_MB = 256
+
+# as tabelas de resumo (comum.agregados_mysql) contam como a tabela de fatos de que derivam
+_RE_TABELAS = re.compile(
+    r"\b(?:FROM|JOIN)\s+(?:(?:resumo_serie|variacao_anual)_)?(estados|metropolis|nordeste)\b", re.IGNORECASE
+)
+
+
+def normaliza_sql(query):
+    return " ".join(query.split()).rstrip(";").strip()
+
+
+def tabelas_da_consulta(query):
+    return sorted({t.lower() for t in _RE_TABELAS.findall(query)})
+
+
+def sha256_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class CacheResultados:
+    """Índice (JSON) + cópias dos CSVs; seguro para uso pelas threads do executor"""
+
+    def __init__(self, output_dir, cache_dir=CACHE_DIR, max_mb=CACHE_MAX_MB):
+        self.output_dir = Path(output_dir)
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.caminho_indice = self.cache_dir / "indice.json"
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if self.caminho_indice.exists():
+            self.indice = json.loads(self.caminho_indice.read_text(encoding="utf-8"))
+        else:
+            self.indice = {}
+
+    def chave(self, filename, query, params, versoes):
+        versoes_usadas = {t: versoes.get(t) for t in tabelas_da_consulta(query)}
+        conteudo = json.dumps(
+            [filename, normaliza_sql(query), list(params or ()), versoes_usadas],
+            ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def restaura(self, chave):
+        """True se a entrada existe e os CSVs de saída estão (ou foram restaurados) em dia"""
+        with self._lock:
+            entrada = self.indice.get(chave)
+            if entrada is None:
+                return False
+            for arquivo in entrada["arquivos"]:
+                destino = self.output_dir / arquivo["caminho"]
+                if destino.exists() and sha256_arquivo(destino) == arquivo["sha256"]:
+                    continue
+                copia = self.cache_dir / chave / arquivo["copia"]
+                if not copia.exists():
+                    return False
+                with escrita_atomica(destino) as tmp:
+                    shutil.copyfile(copia, tmp)
+                print(f"[CACHE] Restaurado: {destino}")
+            entrada["ultimo_uso"] = time.time()
+            self._salva_indice()
+            return True
+
+    def guarda(self, chave, caminhos):
+        """Registra os CSVs recém-gravados (`caminhos` dentro de output_dir) sob `chave`"""
+        with self._lock:
+            pasta = self.cache_dir / chave
+            pasta.mkdir(parents=True, exist_ok=True)
+            arquivos, tamanho = [], 0
+            for i, caminho in enumerate(caminhos):
+                caminho = Path(caminho)
+                copia = f"{i}.csv"
+                shutil.copyfile(caminho, pasta / copia)
+                tamanho += caminho.stat().st_size
+                arquivos.append({
+                    "caminho": caminho.relative_to(self.output_dir).as_posix(),
+                    "copia": copia,
+                    "sha256": sha256_arquivo(caminho),
+                })
+            self.indice[chave] = {"arquivos": arquivos, "bytes": tamanho, "ultimo_uso": time.time()}
+            self._aplica_limite()
+            self._salva_indice()
+
+    def _aplica_limite(self):
+        total = sum(e["bytes"] for e in self.indice.values())
+        for chave in sorted(self.indice, key=lambda c: self.indice[c]["ultimo_uso"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.indice.pop(chave)["bytes"]
+            shutil.rmtree(self.cache_dir / chave, ignore_errors=True)
+
+    def _salva_indice(self):
+        escreve_texto(self.caminho_indice, json.dumps(self.indice, ensure_ascii=False, indent=1))
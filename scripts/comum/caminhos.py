@@ -0,0 +1,25 @@
+"""Pastas do projeto, num lugar só.
+
+Tudo é relativo à raiz do repositório (dois níveis acima deste arquivo), não à pasta
+de onde o comando foi chamado: os scripts numerados e `python scripts/domicilios ...`
+leem e gravam nas mesmas pastas, de qualquer diretório.
+"""
+
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = RAIZ / "scripts"
+
+DATA_DIR = RAIZ / "data"
+RAW_DIR = DATA_DIR / "raw"
+PROCESSED_DIR = DATA_DIR / "processed"
+FILTERED_DIR = DATA_DIR / "filtered"
+FINAL_DIR = DATA_DIR / "final"
+EXPORTS_DIR = DATA_DIR / "exports"
+
+CACHE_DIR = DATA_DIR / "cache"
+METRICAS_DIR = DATA_DIR / "metricas"
+DIAGNOSTICO_DIR = DATA_DIR / "diagnostico"
+QUARENTENA_DIR = DATA_DIR / "quarentena"
+BENCHMARK_DIR = DATA_DIR / "benchmark"
+RAW_SINTETICO_DIR = DATA_DIR / "raw_sintetico"
@@ -0,0 +1,130 @@
+"""Motor de carga em lote para o MySQL.
+
+Duas estratégias:
+-> load_data:   grava os lotes em CSV temporário e usa LOAD DATA LOCAL INFILE.
+-> executemany: envia os lotes com executemany (o conector reescreve em INSERT multi-linha).
+
+Ambas fazem commit a cada `commit_size` linhas e reportam linhas/s ao final.
+O INSERT linha a linha original continua em 05_importa_mysql.py (--modo linha).
+"""
+
+import os
+import tempfile
+import time
+
+import mysql.connector
+
+# Colunas das tabelas (ordem usada em todos os INSERTs)
+COLUNAS_TABELA = ["ano", "inadequacao", "regiao", "contagem", "valor_percentual"]
+
+# Colunas correspondentes nos CSVs finais (data/final/*_final.csv)
+COLUNAS_CSV = ["ano", "inadequação", "região", "contagem", "valor_percentual"]
+
+MODOS_CARGA = ("load_data", "executemany")
+
+COMMIT_SIZE_PADRAO = 5000
+
+
+class LoadDataIndisponivel(Exception):
+    """O servidor (ou a conexão) recusou LOAD DATA LOCAL INFILE antes de carregar qualquer lote"""
+
+
+def prepara_dataframe(df):
+    """Seleciona as colunas do CSV final, na ordem da tabela, com percentual numérico"""
+    df = df[COLUNAS_CSV].copy()
+    df["valor_percentual"] = df["valor_percentual"].astype(str).str.replace(",", ".").astype(float)
+    return df
+
+
+def linhas_para_insert(df):
+    """Converte o DataFrame em lista de tuplas com tipos nativos do Python (sem iterrows)"""
+    colunas = [df[c].tolist() for c in df.columns]
+    return list(zip(*colunas))
+
+
+def _sql_insert(table_name):
+    colunas = ", ".join(COLUNAS_TABELA)
+    marcadores = ", ".join(["%s"] * len(COLUNAS_TABELA))
+    return f"INSERT INTO {table_name} ({colunas}) VALUES ({marcadores})"
+
+
+def _lotes(total, commit_size):
+    for inicio in range(0, total, commit_size):
+        yield inicio, min(inicio + commit_size, total)
+
+
+def carga_executemany(conn, df, table_name, commit_size=COMMIT_SIZE_PADRAO):
+    """Envia lotes de `commit_size` linhas com executemany (INSERT multi-linha)"""
+    cursor = conn.cursor()
+    sql = _sql_insert(table_name)
+    linhas = linhas_para_insert(df)
+    for inicio, fim in _lotes(len(linhas), commit_size):
+        cursor.executemany(sql, linhas[inicio:fim])
+        conn.commit()
+    cursor.close()
+    return len(linhas)
+
+
+def carga_load_data(conn, df, table_name, commit_size=COMMIT_SIZE_PADRAO):
+    """Grava cada lote em CSV temporário e carrega com LOAD DATA LOCAL INFILE.
+
+    Requer `allow_local_infile=True` na conexão e `local_infile=ON` no servidor.
+    """
+    cursor = conn.cursor()
+    colunas = ", ".join(COLUNAS_TABELA)
+    total = len(df)
+    for inicio, fim in _lotes(total, commit_size):
+        fd, caminho_tmp = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        try:
+            df.iloc[inicio:fim].to_csv(caminho_tmp, index=False, header=False, encoding="utf-8", lineterminator="\n")
+            caminho_sql = caminho_tmp.replace("\\", "/")
+            sql = f"""
+                LOAD DATA LOCAL INFILE '{caminho_sql}'
+                INTO TABLE {table_name}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                LINES TERMINATED BY '\\n'
+                ({colunas})
+            """
+            try:
+                cursor.execute(sql)
+            except mysql.connector.Error as e:
+                # Só é seguro trocar de estratégia se nenhum lote foi gravado ainda
+                if inicio == 0:
+                    raise LoadDataIndisponivel(str(e)) from e
+                raise
+            conn.commit()
+        finally:
+            os.remove(caminho_tmp)
+    cursor.close()
+    return total
+
+
+ESTRATEGIAS = {
+    "load_data": carga_load_data,
+    "executemany": carga_executemany,
+}
+
+
+def carrega_dataframe(conn, df, table_name, modo="load_data", commit_size=COMMIT_SIZE_PADRAO):
+    """Carrega `df` (já preparado) em `table_name` e imprime a vazão em linhas/s.
+
+    Se LOAD DATA for recusado pelo servidor (local_infile desligado), cai para executemany.
+    """
+    if modo not in ESTRATEGIAS:
+        raise ValueError(f"Modo de carga inválido: {modo} (use um de {tuple(ESTRATEGIAS)})")
+
+    inicio = time.perf_counter()
+    try:
+        n_linhas = ESTRATEGIAS[modo](conn, df, table_name, commit_size)
+    except LoadDataIndisponivel as e:
+        print(f"[WARN] LOAD DATA LOCAL INFILE indisponível ({e}) — usando executemany")
+        conn.rollback()
+        modo = "executemany"
+        n_linhas = carga_executemany(conn, df, table_name, commit_size)
+    duracao = time.perf_counter() - inicio
+
+    taxa = n_linhas / duracao if duracao > 0 else float("inf")
+    print(f"[INFO] {table_name}: {n_linhas} linhas em {duracao:.2f}s ({taxa:,.0f} linhas/s, modo={modo})")
+    return n_linhas
@@ -0,0 +1,187 @@
+"""Download concorrente e retomável das planilhas de indicadores (01_coleta_dados.py).
+
+Cada indicador é baixado numa thread (urllib, sem dependências externas) e o corpo
+da resposta vai direto para o disco, em blocos, sem passar pelo pandas. O arquivo só
+substitui o anterior em data/raw depois de baixado por inteiro (arquivo .part +
+rename atômico de comum.escrita_atomica), e só se o conteúdo mudou (sha256), então
+as etapas seguintes não veem arquivos pela metade nem mudanças falsas.
+
+Em data/cache/coleta_estado.json ficam, por indicador, ETag, Last-Modified e sha256
+do último download:
+
+* a requisição seguinte é condicional (If-None-Match / If-Modified-Since): 304 = sem
+  mudanças, nada é baixado;
+* servidor sem validadores: o corpo é baixado e comparado pelo sha256;
+* download interrompido: o .part fica e a próxima tentativa (ou execução) pede só o
+  restante (Range + If-Range com a ETag), se o servidor aceitar.
+
+Falhas de rede, timeouts, 429 e 5xx são repetidos com espera exponencial com jitter;
+os demais erros HTTP falham na hora. A URL é um template ({sheet_id}, {gid}), o que
+permite apontar a coleta para um servidor HTTP local nos testes.
+"""
+
+import hashlib
+import http.client
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from comum.caminhos import CACHE_DIR
+from comum.escrita_atomica import escreve_texto, publica
+from comum.instrumentacao import conta, cronometro, registra_arquivo
+
+URL_PLANILHA = "https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+CAMINHO_ESTADO = CACHE_DIR / "coleta_estado.json"
+
+TIMEOUT = 60
+TENTATIVAS = 4
+ESPERA_BASE = 1.0
+TAMANHO_BLOCO = 1 << 16
+
+_STATUS_REPETIVEIS = {408, 429, 500, 502, 503, 504}
+
+
+class ErroDefinitivo(Exception):
+    """Erro HTTP que não adianta repetir (404, 403...)"""
+
+
+def _sha256_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b""):
+            h.update(bloco)
+    return h
+
+
+def le_estado(caminho=CAMINHO_ESTADO):
+    caminho = Path(caminho)
+    if caminho.exists():
+        try:
+            return json.loads(caminho.read_text(encoding="utf-8"))
+        except ValueError:
+            print(f"[WARN] Estado da coleta ilegível, baixando tudo: {caminho}")
+    return {}
+
+
+def grava_estado(estado, caminho=CAMINHO_ESTADO):
+    escreve_texto(caminho, json.dumps(estado, ensure_ascii=False, indent=1))
+
+
+def _cabecalhos(destino, parcial, anterior):
+    cabecalhos = {}
+    if destino.exists():
+        if anterior.get("etag"):
+            cabecalhos["If-None-Match"] = anterior["etag"]
+        if anterior.get("last_modified"):
+            cabecalhos["If-Modified-Since"] = anterior["last_modified"]
+    if parcial.exists() and anterior.get("etag_parcial"):
+        cabecalhos["Range"] = f"bytes={parcial.stat().st_size}-"
+        cabecalhos["If-Range"] = anterior["etag_parcial"]
+    return cabecalhos
+
+
+def baixa_arquivo(url, destino, anterior, timeout=TIMEOUT):
+    """Uma tentativa de download de `url` para `destino`.
+
+    `anterior` é o registro do indicador no estado da coleta; é atualizado aqui
+    (inclusive com a ETag de um download interrompido, para retomar depois).
+    Devolve "baixado", "sem mudanças" ou "igual" (baixado, mesmo conteúdo).
+    """
+    destino = Path(destino)
+    parcial = destino.with_name(destino.name + ".part")
+    requisicao = urllib.request.Request(url, headers=_cabecalhos(destino, parcial, anterior))
+    try:
+        resposta = urllib.request.urlopen(requisicao, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return "sem mudanças"
+        if e.code == 416:
+            # Range inválido (arquivo mudou no servidor): recomeça do zero
+            parcial.unlink(missing_ok=True)
+            anterior.pop("etag_parcial", None)
+        if e.code in _STATUS_REPETIVEIS or e.code == 416:
+            raise
+        raise ErroDefinitivo(f"HTTP {e.code} em {url}") from e
+
+    with resposta:
+        etag = resposta.headers.get("ETag")
+        retomando = resposta.status == 206
+        if retomando:
+            h = _sha256_arquivo(parcial)
+            modo = "ab"
+        else:
+            h, modo = hashlib.sha256(), "wb"
+
+        anterior["etag_parcial"] = etag
+        recebidos = 0
+        with open(parcial, modo) as f:
+            for bloco in iter(lambda: resposta.read(TAMANHO_BLOCO), b""):
+                f.write(bloco)
+                h.update(bloco)
+                recebidos += len(bloco)
+        # read(n) não acusa conexão fechada antes do Content-Length
+        esperados = resposta.headers.get("Content-Length")
+        if esperados is not None and recebidos < int(esperados):
+            raise http.client.IncompleteRead(b"", int(esperados) - recebidos)
+
+    sha = h.hexdigest()
+    anterior.pop("etag_parcial", None)
+    anterior.update({"etag": etag, "last_modified": resposta.headers.get("Last-Modified"), "sha256": sha})
+    if destino.exists() and _sha256_arquivo(destino).hexdigest() == sha:
+        parcial.unlink()
+        return "igual"
+    publica(parcial, destino)
+    return "baixado"
+
+
+def baixa_com_tentativas(url, destino, anterior, tentativas=TENTATIVAS, espera_base=ESPERA_BASE, timeout=TIMEOUT):
+    """`baixa_arquivo` com até `tentativas` tentativas e espera exponencial com jitter entre elas"""
+    for tentativa in range(1, tentativas + 1):
+        try:
+            return baixa_arquivo(url, destino, anterior, timeout)
+        except ErroDefinitivo:
+            raise
+        except (OSError, http.client.HTTPException) as e:
+            # URLError, timeout, conexão caída, resposta incompleta
+            if tentativa == tentativas:
+                raise
+            espera = espera_base * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5)
+            print(f"[WARN] {Path(destino).name}: {e} — nova tentativa em {espera:.1f}s ({tentativa}/{tentativas})")
+            time.sleep(espera)
+
+
+def baixa_indicadores(indicadores, destino_dir, sheet_id, url=URL_PLANILHA, workers=None,
+                      tentativas=TENTATIVAS, espera_base=ESPERA_BASE, timeout=TIMEOUT,
+                      caminho_estado=CAMINHO_ESTADO):
+    """Baixa {nome: gid} em paralelo para destino_dir/nome.csv; devolve {nome: situação ou exceção}"""
+    destino_dir = Path(destino_dir)
+    destino_dir.mkdir(parents=True, exist_ok=True)
+    estado = le_estado(caminho_estado)
+
+    def baixa(item):
+        nome, gid = item
+        anterior = estado.setdefault(nome, {})
+        print(f"Baixando: {nome} ...")
+        try:
+            with cronometro("download", arquivo=f"{nome}.csv"):
+                situacao = baixa_com_tentativas(
+                    url.format(sheet_id=sheet_id, gid=gid), destino_dir / f"{nome}.csv",
+                    anterior, tentativas, espera_base, timeout,
+                )
+        except Exception as e:
+            conta("downloads", situacao="erro")
+            return nome, e
+        conta("downloads", situacao=situacao)
+        if situacao == "baixado":
+            registra_arquivo("escrita", destino_dir / f"{nome}.csv")
+        return nome, situacao
+
+    with ThreadPoolExecutor(max_workers=workers or len(indicadores) or 1) as pool:
+        resultados = dict(pool.map(baixa, indicadores.items()))
+
+    grava_estado(estado, caminho_estado)
+    return resultados
@@ -0,0 +1,123 @@
+"""Consolidação dos CSVs finais num único arquivo para o BI (07_consolida_final_to_csv.py).
+
+`consolida_arquivo` padroniza um CSV final (lido como texto, com região e indicador
+como category: comum.esquema.tipos_leitura_texto) para o esquema
+ano,inadequacao,regiao,contagem,valor_percentual,source_file e `junta_consolidados`
+concatena os resultados; o pipeline em memória usa as mesmas funções.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from comum.esquema import aplica_esquema
+from comum.numeros_br import parse_count_series, parse_percent_series
+
+# Mapeamento de possíveis nomes de coluna para padrão interno
+COL_MAP = {
+    "ano": "year",
+    "year": "year",
+    "inadequação": "indicator",
+    "inadequacao": "indicator",
+    "indicator": "indicator",
+    "região": "region",
+    "regiao": "region",
+    "region": "region",
+    "contagem": "count",
+    "count": "count",
+    "valor_percentual": "percent_value",
+    "porcentagem_em_relação_ao_total_de_domicílios_particulares_permanentes_duráveis_urbanos": "percent_value",
+    "percentual": "percent_value",
+    "percent_value": "percent_value"
+}
+
+def normalize_colnames(df):
+    cols = {c: c.strip().lower().replace(" ", "_") for c in df.columns}
+    df = df.rename(columns=cols)
+    rename_map = {}
+    for c in df.columns:
+        if c in COL_MAP:
+            rename_map[c] = COL_MAP[c]
+    df = df.rename(columns=rename_map)
+    return df
+
+def infer_indicator_from_filename(path: Path):
+    name = path.stem.lower()
+
+    parts = name.split("_")
+
+    known = {
+        "abastecimento": "Abastecimento de água",
+        "abastecimento_agua": "Abastecimento de água",
+        "esgotamento": "Esgotamento",
+        "esgotamento_sanitario": "Esgotamento",
+        "coleta": "Coleta de Lixo",
+        "coleta_lixo": "Coleta de Lixo",
+        "ausencia_banheiro": "Ausência de Banheiro",
+        "piso": "Piso inadequado",
+        "piso_inadequado": "Piso inadequado",
+        "inadequacao": "Inadequação fundiária",
+        "inadequacao_fundiaria": "Inadequação fundiária",
+        "total": "Domicílios inadequados",
+        "total_inadequados": "Domicílios inadequados"
+    }
+    for k, v in known.items():
+        if k in name:
+            return v
+
+    return name.replace("_", " ").title()
+
+def consolida_arquivo(df, source_file):
+    """DataFrame de um CSV final (todas as colunas como texto) no esquema consolidado"""
+    df = normalize_colnames(df)
+
+    if "indicator" not in df.columns:
+        df["indicator"] = infer_indicator_from_filename(Path(source_file))
+
+    if "year" not in df.columns and "ano" in df.columns:
+        df = df.rename(columns={"ano": "year"})
+
+    if "region" not in df.columns:
+        if len(df.columns) >= 3:
+            df = df.rename(columns={df.columns[2]: "region"})
+        else:
+            df["region"] = None
+
+    if "count" not in df.columns:
+        if len(df.columns) >= 4:
+            df = df.rename(columns={df.columns[3]: "count"})
+        else:
+            df["count"] = None
+
+    if "percent_value" not in df.columns:
+        if len(df.columns) >= 5:
+            df = df.rename(columns={df.columns[4]: "percent_value"})
+        else:
+            df["percent_value"] = None
+
+    df["year"] = df["year"].astype(str).str.extract(r"(\d{4})", expand=False).astype(float).astype('Int64')
+
+    df["count_clean"] = parse_count_series(df["count"])
+    df["percent_clean"] = parse_percent_series(df["percent_value"])
+
+    df["tipo_inadequacao"] = df["indicator"].astype(str).str.strip()
+
+    df_final = df[["year", "tipo_inadequacao", "region", "count_clean", "percent_clean"]].copy()
+    df_final = df_final.rename(columns={
+        "year": "ano",
+        "tipo_inadequacao": "inadequacao",
+        "region": "regiao",
+        "count_clean": "contagem",
+        "percent_clean": "valor_percentual"
+    })
+
+    df_final["source_file"] = source_file
+    return df_final
+
+def junta_consolidados(dfs):
+    """Concatena os arquivos consolidados e fixa os tipos finais"""
+    full = pd.concat(dfs, ignore_index=True)
+    full["contagem"] = pd.to_numeric(full["contagem"], errors="coerce").astype("Int64")
+    full["valor_percentual"] = pd.to_numeric(full["valor_percentual"], errors="coerce")
+    full = full[["ano", "inadequacao", "regiao", "contagem", "valor_percentual", "source_file"]]
+    return aplica_esquema(full)
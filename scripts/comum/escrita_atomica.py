@@ -0,0 +1,170 @@
+"""Escrita atômica das saídas do pipeline.
+
+Toda saída é gravada num temporário oculto na mesma pasta (.<nome>.<pid>.<thread>.tmp),
+que recebe fsync e só então é renomeado por cima do destino (os.replace, atômico no
+mesmo sistema de arquivos), com fsync da pasta. Quem lê o destino (o Power BI, o
+importador, outra etapa) vê o arquivo antigo inteiro ou o novo inteiro, nunca um
+arquivo pela metade, então leitores e escritores podem rodar ao mesmo tempo. Se a
+escrita falha, o temporário é apagado e o destino fica como estava.
+
+Duas opções, desligadas por padrão (--geracoes N e --trava nos scripts que gravam
+dados, ou `configura_escrita`):
+-> gerações: antes de ser substituído, o arquivo atual ganha um hard link em
+   .geracoes/<nome>.g<NNNNNN><extensão>, na mesma pasta; ficam as N mais recentes.
+   `geracoes(caminho)` lista as versões anteriores, da mais nova para a mais velha;
+-> trava: a troca (gerações + rename) acontece com uma trava exclusiva por arquivo
+   (.<nome>.lock, flock no Linux/macOS e msvcrt no Windows), para que dois jobs que
+   gravam o mesmo dado não embaralhem a numeração das gerações. Um leitor que precisa
+   do arquivo e das gerações coerentes entre si usa `trava(caminho, compartilhada=True)`.
+
+Arquivos internos (manifesto, estado da coleta, índice do cache, métricas) também são
+gravados de forma atômica, mas sem gerações nem trava (`versionado=False`).
+"""
+
+import contextlib
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PASTA_GERACOES = ".geracoes"
+
+_config = {"geracoes": 0, "trava": False}
+
+
+def configura_escrita(geracoes=None, trava=None):
+    """Gerações mantidas e uso da trava nas próximas escritas deste processo"""
+    if geracoes is not None:
+        _config["geracoes"] = max(int(geracoes), 0)
+    if trava is not None:
+        _config["trava"] = bool(trava)
+
+
+def configuracao_escrita():
+    """Configuração atual, para repassar aos processos filhos (comum.execucao_paralela)"""
+    return dict(_config)
+
+
+def adiciona_opcoes_escrita(parser):
+    parser.add_argument(
+        "--geracoes", type=int, default=0,
+        help="versões anteriores de cada saída mantidas em .geracoes/ (padrão: 0)",
+    )
+    parser.add_argument(
+        "--trava", action="store_true",
+        help="trava exclusiva por arquivo ao publicar cada saída (jobs concorrentes)",
+    )
+
+
+def temporario(caminho):
+    caminho = Path(caminho)
+    return caminho.with_name(f".{caminho.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _fsync_arquivo(caminho):
+    with open(caminho, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_pasta(pasta):
+    if not hasattr(os, "O_DIRECTORY"):  # Windows: o rename já é durável
+        return
+    fd = os.open(pasta, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def trava(caminho, compartilhada=False):
+    """Trava de `caminho` (arquivo .<nome>.lock ao lado); espera se outro processo a tem"""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho.with_name(f".{caminho.name}.lock"), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if compartilhada else fcntl.LOCK_EX)
+        else:
+            # msvcrt só tem trava exclusiva; LK_LOCK tenta por 10 s antes de desistir
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def geracoes(caminho):
+    """Versões anteriores de `caminho` [(número, arquivo)], da mais nova para a mais velha"""
+    caminho = Path(caminho)
+    padrao = re.compile(rf"{re.escape(caminho.stem)}\.g(\d+){re.escape(caminho.suffix)}")
+    pasta = caminho.parent / PASTA_GERACOES
+    versoes = []
+    if pasta.exists():
+        for arquivo in pasta.iterdir():
+            casou = padrao.fullmatch(arquivo.name)
+            if casou:
+                versoes.append((int(casou.group(1)), arquivo))
+    return sorted(versoes, reverse=True)
+
+
+def _guarda_geracao(caminho, manter):
+    """Hard link (ou cópia) do arquivo atual como nova geração; apaga as que passam de `manter`"""
+    versoes = geracoes(caminho)
+    numero = versoes[0][0] + 1 if versoes else 1
+    destino = caminho.parent / PASTA_GERACOES / f"{caminho.stem}.g{numero:06d}{caminho.suffix}"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(caminho, destino)
+    except OSError:
+        shutil.copy2(caminho, destino)
+    for _numero, antiga in ([(numero, destino)] + versoes)[manter:]:
+        antiga.unlink()
+
+
+def publica(tmp, caminho, versionado=True):
+    """fsync de `tmp` e rename atômico para `caminho` (com gerações e trava, se configuradas)"""
+    caminho = Path(caminho)
+    _fsync_arquivo(tmp)
+    manter = _config["geracoes"] if versionado else 0
+    usa_trava = _config["trava"] and versionado
+    with trava(caminho) if usa_trava else contextlib.nullcontext():
+        if manter and caminho.exists():
+            _guarda_geracao(caminho, manter)
+        os.replace(tmp, caminho)
+    _fsync_pasta(caminho.parent)
+
+
+@contextlib.contextmanager
+def escrita_atomica(caminho, versionado=True):
+    """Caminho temporário para gravar; vira `caminho` só se o bloco `with` terminar sem erro"""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temporario(caminho)
+    try:
+        yield tmp
+        publica(tmp, caminho, versionado)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def escreve_texto(caminho, texto, encoding="utf-8", versionado=False):
+    """Path.write_text atômico (por padrão sem gerações nem trava: arquivos internos)"""
+    with escrita_atomica(caminho, versionado) as tmp:
+        tmp.write_text(texto, encoding=encoding)
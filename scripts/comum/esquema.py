@@ -0,0 +1,85 @@
+"""Tipos compactos das colunas do pipeline.
+
+`inadequação` e `região` vêm de conjuntos pequenos (7 indicadores; regiões, estados e
+regiões metropolitanas) e ficam como `category`: cada valor distinto é guardado uma
+vez e as linhas guardam só um código, o que reduz a memória e acelera filtros
+(==, isin, str.contains) e groupbys. As categorias começam pelos valores conhecidos
+abaixo, na ordem deles; valores novos (outras extrações) entram no fim, então nada
+vira NaN.
+
+Colunas numéricas: ano em int16, contagem em int64 e valor_percentual em float32
+(o mesmo FLOAT de 4 bytes das tabelas MySQL). Só colunas que já são numéricas são
+convertidas; a contagem dos arquivos intermediários, que ainda é texto ("575.009"),
+fica como está. Os CSVs gravados continuam iguais.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from comum.regioes import GRANDES_REGIOES, UFS
+
+# Indicadores, como aparecem nos arquivos de data/raw
+INDICADORES = [
+    "Abastecimento de água",
+    "Ausência de banheiro",
+    "Coleta de lixo",
+    "Esgotamento",
+    "Inadequação fundiária",
+    "piso inadequado",
+    "Domicílios inadequados",
+]
+
+REGIOES_CONHECIDAS = GRANDES_REGIOES + UFS
+
+COLUNAS_INDICADOR = ["inadequação", "inadequacao"]
+COLUNAS_REGIAO = ["região", "regiao"]
+
+
+def tipo_categorico(serie, conhecidas=()):
+    """CategoricalDtype com as `conhecidas` presentes na série, seguidas dos demais valores em ordem"""
+    presentes = set(serie.dropna().unique())
+    categorias = [c for c in conhecidas if c in presentes]
+    categorias += sorted(presentes.difference(categorias), key=str)
+    return pd.CategoricalDtype(categorias)
+
+
+def categoriza(serie, conhecidas=()):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    return serie.astype(tipo_categorico(serie, conhecidas))
+
+
+def aplica_categorias(df):
+    """Só as colunas de indicador e região como category"""
+    for coluna in df.columns:
+        if coluna in COLUNAS_INDICADOR:
+            df[coluna] = categoriza(df[coluna], INDICADORES)
+        elif coluna in COLUNAS_REGIAO:
+            df[coluna] = categoriza(df[coluna], REGIOES_CONHECIDAS)
+    return df
+
+
+def _cabe_em(serie, tipo):
+    info = np.iinfo(tipo)
+    return serie.dropna().between(info.min, info.max).all()
+
+
+def aplica_esquema(df):
+    """Categorias + tipos numéricos compactos nas colunas conhecidas (altera e devolve `df`)"""
+    df = aplica_categorias(df)
+    if "ano" in df.columns and pd.api.types.is_integer_dtype(df["ano"]) and _cabe_em(df["ano"], np.int16):
+        anulavel = isinstance(df["ano"].dtype, pd.api.extensions.ExtensionDtype)
+        df["ano"] = df["ano"].astype("Int16" if anulavel else "int16")
+    if "contagem" in df.columns and pd.api.types.is_integer_dtype(df["contagem"]):
+        anulavel = isinstance(df["contagem"].dtype, pd.api.extensions.ExtensionDtype)
+        df["contagem"] = df["contagem"].astype("Int64" if anulavel else "int64")
+    if "valor_percentual" in df.columns and pd.api.types.is_float_dtype(df["valor_percentual"]):
+        df["valor_percentual"] = df["valor_percentual"].astype("float32")
+    return df
+
+
+def tipos_leitura_texto():
+    """dtype para pd.read_csv: indicador e região como category, o resto como texto (07)"""
+    return defaultdict(lambda: str, {c: "category" for c in COLUNAS_INDICADOR + COLUNAS_REGIAO})
@@ -0,0 +1,114 @@
+"""Transformações de cada etapa do pipeline, sem leitura/escrita de arquivos.
+
+Usadas pelos scripts numerados (que leem e gravam os CSVs de cada pasta) e pelo
+pipeline em memória (scripts/pipeline/executa_pipeline.py), que encadeia as etapas
+sem passar pelos arquivos intermediários.
+"""
+
+import pandas as pd
+
+from comum.esquema import aplica_esquema
+from comum.instrumentacao import conta
+from comum.numeros_br import parse_percent_series
+from comum.regioes import INDICE_NORDESTE
+
+# Arquivos de indicadores em data/raw (02_limpeza_padronizacao.py)
+ARQUIVOS_INDICADORES = [
+    "abastecimento_agua.csv",
+    "ausencia_banheiro.csv",
+    "coleta_lixo.csv",
+    "esgotamento_sanitario.csv",
+    "inadequacao_fundiaria.csv",
+    "piso_inadequado.csv",
+    "total_inadequados.csv",
+]
+
+COLUNA_PERCENTUAL_ORIGINAL = "porcentagem_em_relação_ao_total_de_domicílios_particulares_permanentes_duráveis_urbanos"
+
+CATEGORIAS = ["nordeste", "estados", "metropolis"]
+
+# --- 02: limpeza -----------------------------------------------------------------
+
+def padroniza_colunas(df):
+    """Nomes de coluna sem espaços nas pontas, minúsculos e com _ no lugar de espaço"""
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    return df
+
+
+# --- 03/04: filtragem e padronização ---------------------------------------------
+
+def padroniza_percentual(df):
+    """Renomeia a coluna de percentual para valor_percentual e converte "74,29%" em 74.29.
+
+    Aplica também os tipos compactos de comum.esquema (região/inadequação como category,
+    percentual float32), que aceleram os filtros de `filtra_regioes`.
+    """
+    if COLUNA_PERCENTUAL_ORIGINAL in df.columns:
+        df = df.rename(columns={COLUNA_PERCENTUAL_ORIGINAL: "valor_percentual"})
+        df['valor_percentual'] = parse_percent_series(df['valor_percentual'])
+    return aplica_esquema(df)
+
+
+def filtra_regioes(df):
+    """Divide um indicador nos recortes do Nordeste: {categoria: DataFrame}
+
+    Os recortes são avaliados uma vez por nome de região (comum.regioes) e aplicados
+    às linhas pelos códigos da coluna `região` (category).
+    """
+    mascaras = INDICE_NORDESTE.mascaras(df["região"])
+    recortes = {cat: df[mascara] for cat, mascara in mascaras.items()}
+    conta("linhas_filtro_entrada", len(df))
+    for cat, df_cat in recortes.items():
+        conta("linhas_filtro_saida", len(df_cat), recorte=cat)
+    return recortes
+
+
+def concatena_categoria(dfs):
+    """Junta os indicadores filtrados de uma categoria num único DataFrame final"""
+    # categorias diferentes entre arquivos viram texto no concat; o esquema é reaplicado
+    return aplica_esquema(pd.concat([padroniza_percentual(df) for df in dfs], ignore_index=True))
+
+
+# --- Passagem em memória entre etapas ---------------------------------------------
+
+def _texto_csv(serie):
+    """Valores de uma coluna como o to_csv os escreve (nulos continuam nulos)"""
+    if pd.api.types.is_float_dtype(serie):
+        # astype(str) usa a representação mais curta do próprio tipo (float32: "45.8")
+        return serie.astype(str).where(serie.notna())
+    return serie.astype(object).map(lambda v: v if pd.isna(v) else str(v))
+
+
+def como_relido_de_csv(df):
+    """Tipos que o DataFrame teria se fosse gravado em CSV e lido de novo com pd.read_csv.
+
+    Os scripts passam os dados de uma etapa para outra por CSV, e o pd.read_csv reinfere
+    os tipos de cada arquivo: uma coluna de texto cujos valores são todos numéricos
+    ("575.009") vira float. O pipeline em memória repete essa inferência para gerar
+    exatamente os mesmos arquivos que os scripts.
+    """
+    df = df.copy()
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(object)
+        if serie.dtype == object or pd.api.types.is_string_dtype(serie):
+            try:
+                df[coluna] = pd.to_numeric(serie)
+            except (ValueError, TypeError):
+                # continua texto: valores não-texto (ex.: float numa coluna mista) como no CSV
+                df[coluna] = _texto_csv(serie).astype("str") if serie.dtype == object else serie
+        elif isinstance(serie.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(serie):
+            # inteiro anulável: no CSV vira float se houver vazios
+            df[coluna] = serie.astype("float64") if serie.isna().any() else serie.astype("int64")
+        elif pd.api.types.is_integer_dtype(serie):
+            df[coluna] = serie.astype("int64")
+        elif serie.dtype == "float32":
+            # float32 é gravado com a representação curta ("45.8") e relido como float64
+            df[coluna] = _texto_csv(serie).astype("float64")
+    return df
+
+
+def como_texto_de_csv(df):
+    """Equivalente a gravar em CSV e ler de novo com pd.read_csv(dtype=str)"""
+    return df.apply(lambda col: _texto_csv(col).astype("str"))
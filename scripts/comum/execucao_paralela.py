@@ -0,0 +1,88 @@
+"""Execução de uma função por arquivo num pool de processos (etapas 02 e 03).
+
+Cada tarefa roda isolada: uma exceção vira um erro registrado só daquela tarefa e as
+demais continuam. As mensagens impressas por cada tarefa são capturadas no processo
+filho e reimpressas na ordem das tarefas, não na ordem em que terminaram, então o log
+é o mesmo com qualquer número de processos. As métricas de cada tarefa
+(comum.instrumentacao) também voltam ao processo principal.
+"""
+
+import contextlib
+import io
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from comum import escrita_atomica, instrumentacao
+
+
+def jobs_padrao():
+    return os.cpu_count() or 1
+
+
+def _inicializa_filho(config_escrita):
+    instrumentacao.descarta()
+    escrita_atomica.configura_escrita(**config_escrita)
+
+
+def _executa_medindo(funcao, tarefa, kwargs):
+    with instrumentacao.cronometro("tarefa", tarefa=Path(str(tarefa)).name):
+        return funcao(tarefa, **kwargs)
+
+
+def _executa_capturando(funcao, tarefa, kwargs):
+    """Roda no processo filho: (saída impressa, resultado, traceback ou None, métricas da tarefa)"""
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(saida):
+        try:
+            resultado, erro = _executa_medindo(funcao, tarefa, kwargs), None
+        except Exception:
+            resultado, erro = None, traceback.format_exc()
+    return saida.getvalue(), resultado, erro, instrumentacao.extrai()
+
+
+def executa_em_paralelo(funcao, tarefas, jobs=None, **kwargs):
+    """Aplica `funcao(tarefa, **kwargs)` a cada tarefa; devolve [(tarefa, resultado, erro)] na ordem de `tarefas`.
+
+    Com jobs=1 roda no próprio processo (sem pool), imprimindo na hora.
+    """
+    tarefas = list(tarefas)
+    jobs = min(jobs or jobs_padrao(), max(len(tarefas), 1))
+    resultados = []
+
+    if jobs == 1:
+        for tarefa in tarefas:
+            try:
+                resultados.append((tarefa, _executa_medindo(funcao, tarefa, kwargs), None))
+            except Exception:
+                erro = traceback.format_exc()
+                print(f"[ERROR] Falha em {tarefa}:\n{erro}")
+                resultados.append((tarefa, None, erro))
+        return resultados
+
+    # --geracoes/--trava do processo principal valem também nos filhos (spawn não herda o módulo)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_inicializa_filho,
+                             initargs=(escrita_atomica.configuracao_escrita(),)) as pool:
+        futuros = [pool.submit(_executa_capturando, funcao, tarefa, kwargs) for tarefa in tarefas]
+        for tarefa, futuro in zip(tarefas, futuros):
+            try:
+                saida, resultado, erro, metricas = futuro.result()
+                instrumentacao.incorpora(metricas)
+            except Exception:
+                # processo filho morreu ou o resultado não pôde ser transferido
+                saida, resultado, erro = "", None, traceback.format_exc()
+            print(saida, end="")
+            if erro:
+                print(f"[ERROR] Falha em {tarefa}:\n{erro}")
+            resultados.append((tarefa, resultado, erro))
+    return resultados
+
+
+def resume_falhas(resultados):
+    """Imprime o resumo das tarefas que falharam; devolve o código de saída do script"""
+    falhas = [tarefa for tarefa, _, erro in resultados if erro]
+    if not falhas:
+        return 0
+    print(f"[ERROR] {len(falhas)} de {len(resultados)} arquivo(s) com erro: " + ", ".join(str(f) for f in falhas))
+    return 1
@@ -0,0 +1,199 @@
+"""Consultas em memória sobre o consolidado (data/exports/infraestrutura_final.csv), sem banco.
+
+O arquivo (ou o snapshot binário de 07, comum.snapshot, quando está em dia) é lido uma
+vez e vira arrays NumPy ordenados por (inadequacao, regiao, ano), com as regiões, os indicadores e as tabelas de origem (source_file) como códigos de
+dicionário. Na carga são calculados, para todas as séries de uma vez:
+-> o deslocamento de cada série (regiao, inadequacao) nos arrays;
+-> média, desvio padrão amostral e último valor de cada série;
+-> o valor do ano anterior e a diferença (o LAG de q3);
+-> uma grade série × ano e a ordem de ranking por (tabela, inadequacao, ano, valor).
+
+Cada consulta é então uma busca em dicionário seguida de fatias dos arrays, em
+microssegundos, e devolve listas de tuplas com tipos nativos do Python:
+
+    indice = IndiceConsolidado.carrega()
+    indice.serie("Pernambuco", "Abastecimento de água")      # q2: [(ano, valor), ...]
+    indice.top_n(2019, "Domicílios inadequados", 5)           # q1: [(regiao, contagem, valor), ...]
+    indice.diff_anos(2016, 2019)                              # q5
+    indice.alertas()                                          # q7
+
+Os valores seguem os tipos do MySQL: valor_percentual em float32 (FLOAT) e contas em
+float64, então os resultados são os das consultas de 06_exporta_consultas.py, conferidos
+em tests/test_indice_consolidado.py. A exceção é `contagem`: o consolidado tem a
+contagem inteira ("2.133.121" -> 2133121), e o MySQL lê o último ponto como decimal,
+descarta os anteriores e arredonda (2133).
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from comum.caminhos import EXPORTS_DIR
+from comum.instrumentacao import registra_arquivo
+from comum.snapshot import Snapshot, snapshot_atual
+
+CONSOLIDADO = EXPORTS_DIR / "infraestrutura_final.csv"
+
+
+def _tuplas(*colunas):
+    return list(zip(*(c.tolist() for c in colunas)))
+
+
+def _grupos(*chaves):
+    """Início de cada grupo de valores iguais em arrays já ordenados por `chaves` (+ o fim)"""
+    muda = np.zeros(len(chaves[0]), dtype=bool)
+    muda[0:1] = True
+    for chave in chaves:
+        muda[1:] |= chave[1:] != chave[:-1]
+    return np.append(np.flatnonzero(muda), len(chaves[0]))
+
+
+def _dicionario(coluna):
+    """(valores distintos em ordem, código de cada linha); só os distintos são ordenados"""
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        valores, de_categoria = np.unique(np.asarray(coluna.cat.categories, dtype=str), return_inverse=True)
+        return valores, de_categoria[coluna.cat.codes.to_numpy()]
+    codigos, valores = pd.factorize(coluna.astype(str), sort=True)
+    return np.asarray(valores, dtype=str), codigos
+
+
+class IndiceConsolidado:
+    """Arrays do consolidado ordenados por (inadequacao, regiao, ano), com as séries indexadas"""
+
+    def __init__(self, df):
+        df = df.dropna(subset=["ano", "inadequacao", "regiao", "valor_percentual"])
+        self.inadequacoes, inad = _dicionario(df["inadequacao"])
+        self.regioes, reg = _dicionario(df["regiao"])
+        arquivos, tab = _dicionario(df["source_file"])
+        self.tabelas, de_arquivo = np.unique([re.sub(r"_final\.\w+$", "", a) for a in arquivos], return_inverse=True)
+        tab = de_arquivo[tab]
+        ano = df["ano"].to_numpy(dtype=np.int64)
+
+        ordem = np.lexsort((ano, reg, inad))
+        self.inad, self.reg, self.tab, self.ano = inad[ordem], reg[ordem], tab[ordem], ano[ordem]
+        self.valor = df["valor_percentual"].to_numpy(dtype=np.float32)[ordem]
+        self.contagem = df["contagem"].fillna(0).to_numpy(dtype=np.int64)[ordem]
+
+        # séries: linhas inicio[s]:inicio[s + 1]
+        self.inicio = _grupos(self.inad, self.reg)
+        primeiras = self.inicio[:-1]
+        n_anos = np.diff(self.inicio)
+        self.serie_inad, self.serie_reg, self.serie_tab = self.inad[primeiras], self.reg[primeiras], self.tab[primeiras]
+        self.serie_da_linha = np.repeat(np.arange(len(primeiras)), n_anos)
+        self._series = {
+            (self.regioes[r], self.inadequacoes[i]): s
+            for s, (r, i) in enumerate(zip(self.serie_reg.tolist(), self.serie_inad.tolist()))
+        }
+
+        # estatísticas por série (AVG/STDDEV_SAMP do FLOAT, em double)
+        v = self.valor.astype(np.float64)
+        self.media = np.add.reduceat(v, primeiras) / n_anos
+        desvios = np.add.reduceat((v - self.media[self.serie_da_linha]) ** 2, primeiras)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.sd = np.where(n_anos > 1, np.sqrt(desvios / (n_anos - 1)), np.nan)
+        self.ultima_linha = self.inicio[1:] - 1
+
+        # LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano)
+        self.anterior = np.empty(len(v), dtype=np.float32)
+        self.anterior[1:] = self.valor[:-1]
+        self.anterior[primeiras] = np.nan
+        self.diff = v - self.anterior.astype(np.float64)
+
+        # grade série × ano (NaN onde a série não tem o ano)
+        self.anos, pos_ano = np.unique(self.ano, return_inverse=True)
+        self.grade = np.full((len(primeiras), len(self.anos)), np.nan, dtype=np.float32)
+        self.grade[self.serie_da_linha, pos_ano] = self.valor
+        self._pos_ano = {a: i for i, a in enumerate(self.anos.tolist())}
+        self._series_tabela = {t: np.flatnonzero(self.serie_tab == i) for i, t in enumerate(self.tabelas.tolist())}
+
+        # ranking: linhas ordenadas por (tabela, inadequacao, ano, valor decrescente)
+        self.ranking = np.lexsort((-v, self.ano, self.inad, self.tab))
+        limites = _grupos(self.tab[self.ranking], self.inad[self.ranking], self.ano[self.ranking])
+        self._rankings = {}
+        for ini, fim in zip(limites[:-1].tolist(), limites[1:].tolist()):
+            linha = self.ranking[ini]
+            chave = (self.tabelas[self.tab[linha]], self.inadequacoes[self.inad[linha]], int(self.ano[linha]))
+            self._rankings[chave] = (ini, fim)
+
+    @classmethod
+    def carrega(cls, caminho=CONSOLIDADO):
+        """Lê o snapshot binário gravado por 07 (.snap) se estiver em dia com o CSV; senão, o CSV"""
+        caminho = Path(caminho)
+        snapshot = caminho.with_suffix(".snap")
+        if snapshot_atual(caminho, snapshot):
+            df = Snapshot(snapshot).para_dataframe()
+            fonte = snapshot
+        else:
+            df = pd.read_csv(caminho)
+            fonte = caminho
+        registra_arquivo("leitura", fonte, linhas=len(df))
+        return cls(df)
+
+    def __len__(self):
+        return len(self.valor)
+
+    def _linhas_serie(self, regiao, inadequacao):
+        s = self._series.get((regiao, inadequacao))
+        if s is None:
+            return slice(0, 0)
+        return slice(self.inicio[s], self.inicio[s + 1])
+
+    def serie(self, regiao, inadequacao):
+        """[(ano, valor_percentual)] da série, por ano (q2)"""
+        linhas = self._linhas_serie(regiao, inadequacao)
+        return _tuplas(self.ano[linhas], self.valor[linhas])
+
+    def variacao(self, regiao, inadequacao):
+        """[(ano, valor_percentual, valor_ano_anterior, diff_pct_points)] da série (LAG de q3)"""
+        linhas = self._linhas_serie(regiao, inadequacao)
+        return _tuplas(self.ano[linhas], self.valor[linhas], self.anterior[linhas], self.diff[linhas])
+
+    def variacao_indicador(self, inadequacao, tabela="estados"):
+        """[(regiao, ano, valor_percentual, valor_ano_anterior, diff_pct_points)] de todas as séries (q3)"""
+        series = self._series_tabela.get(tabela, np.empty(0, dtype=np.int64))
+        series = series[self.inadequacoes[self.serie_inad[series]] == inadequacao]
+        if not len(series):
+            return []
+        linhas = np.concatenate([np.arange(self.inicio[s], self.inicio[s + 1]) for s in series.tolist()])
+        return _tuplas(self.regioes[self.reg[linhas]], self.ano[linhas], self.valor[linhas],
+                       self.anterior[linhas], self.diff[linhas])
+
+    def top_n(self, ano, inadequacao, n=5, tabela="estados"):
+        """[(regiao, contagem, valor_percentual)] das `n` maiores do ano (q1/q1b); empates na ordem das regiões"""
+        ini, fim = self._rankings.get((tabela, inadequacao, ano), (0, 0))
+        linhas = self.ranking[ini:min(fim, ini + n)]
+        return _tuplas(self.regioes[self.reg[linhas]], self.contagem[linhas], self.valor[linhas])
+
+    def diff_anos(self, ano_a, ano_b, tabela="estados", n=50):
+        """[(inadequacao, regiao, valor_a, valor_b, diff)] das `n` maiores diferenças b - a (q5)"""
+        if ano_a not in self._pos_ano or ano_b not in self._pos_ano:
+            return []
+        series = self._series_tabela.get(tabela, np.empty(0, dtype=np.int64))
+        va = self.grade[series, self._pos_ano[ano_a]]
+        vb = self.grade[series, self._pos_ano[ano_b]]
+        ambos = ~(np.isnan(va) | np.isnan(vb))
+        series, va, vb = series[ambos], va[ambos], vb[ambos]
+        diff = np.round(vb.astype(np.float64) - va.astype(np.float64), 2)
+        # empates por regiao e inadequacao, como no ORDER BY de q5
+        topo = np.lexsort((self.serie_inad[series], self.serie_reg[series], -diff))[:n]
+        s = series[topo]
+        return _tuplas(self.inadequacoes[self.serie_inad[s]], self.regioes[self.serie_reg[s]], va[topo], vb[topo], diff[topo])
+
+    def alertas(self, tabela="estados", limiar=2.0):
+        """[(regiao, inadequacao, atual, media, sd, diff_from_mean)] com último valor > média + limiar·sd (q7)
+
+        Média, desvio e diferença arredondados em 2 casas, como no SQL.
+        """
+        series = self._series_tabela.get(tabela, np.empty(0, dtype=np.int64))
+        atual = self.valor[self.ultima_linha[series]].astype(np.float64)
+        media, sd = self.media[series], self.sd[series]
+        with np.errstate(invalid="ignore"):
+            acima = atual > media + limiar * sd
+        series, atual, media, sd = series[acima], atual[acima], media[acima], sd[acima]
+        diff = np.round(atual - media, 2)
+        topo = np.lexsort((self.serie_inad[series], self.serie_reg[series], -diff))
+        s = series[topo]
+        return _tuplas(self.regioes[self.serie_reg[s]], self.inadequacoes[self.serie_inad[s]],
+                       atual[topo].astype(np.float32), np.round(media[topo], 2), np.round(sd[topo], 2), diff[topo])
@@ -0,0 +1,289 @@
+"""Métricas de execução das etapas: tempos, linhas, bytes e pico de memória.
+
+Cada script chama `inicia("03_filtragem_regioes", args.perfil)` no começo. Daí em
+diante, o código instrumentado registra métricas num coletor do processo:
+
+    with cronometro("filtra_arquivo", arquivo=nome):       # ou @cronometro("...")
+        ...
+    conta("linhas_filtro_saida", len(df), recorte="estados")
+    registra_arquivo("escrita", destino, linhas=len(df))   # linhas e bytes gravados
+
+As camadas comuns já registram leitura/escrita (comum.armazenamento,
+comum.leitura_em_blocos) e as linhas que entram e saem de cada recorte
+(comum.etapas.filtra_regioes), então as etapas ganham as contagens sem código extra.
+Nos pools de processos (02 e 03), as métricas de cada tarefa voltam ao processo
+principal junto com o resultado (comum.execucao_paralela).
+
+Ao sair (atexit), o relatório é gravado em data/metricas/:
+
+* <etapa>.json: relatório da última execução;
+* <etapa>.prom: as mesmas métricas em texto OpenMetrics (prefixo domicilios_), no
+  formato do textfile collector do node_exporter;
+* historico.jsonl: uma linha por execução, para séries no monitoramento.
+
+`--perfil cprofile` grava também <etapa>.prof (pstats, só o processo principal) e
+põe as funções mais caras no relatório; `--perfil tracemalloc` põe o pico de memória
+alocada pelo Python e as linhas que mais alocaram.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from comum.caminhos import METRICAS_DIR
+from comum.escrita_atomica import escreve_texto
+
+PREFIXO_OPENMETRICS = "domicilios_"
+PERFIS = ("cprofile", "tracemalloc")
+N_TOPO_PERFIL = 15
+
+# ru_maxrss vem em KiB no Linux e em bytes no macOS
+_ESCALA_MAXRSS = 1 if sys.platform == "darwin" else 1024
+
+
+def _chave(nome, rotulos):
+    return nome, tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+
+class Metricas:
+    """Contadores e tempos acumulados, indexados por (nome, rótulos); seguro entre threads"""
+
+    def __init__(self):
+        self.contadores = defaultdict(float)
+        self.tempos = {}
+        self._lock = threading.Lock()
+
+    def conta(self, nome, valor=1, **rotulos):
+        with self._lock:
+            self.contadores[_chave(nome, rotulos)] += valor
+
+    def registra_tempo(self, nome, segundos, n=1, maximo=None, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._lock:
+            n_ant, total, maximo_ant = self.tempos.get(chave, (0, 0.0, 0.0))
+            self.tempos[chave] = (n_ant + n, total + segundos, max(maximo_ant, segundos if maximo is None else maximo))
+
+    def exporta(self):
+        """Forma serializável (também a que volta dos processos filhos)"""
+        return {
+            "contadores": [
+                {"nome": n, "rotulos": dict(r), "valor": int(v) if float(v).is_integer() else v}
+                for (n, r), v in self.contadores.items()
+            ],
+            "tempos": [
+                {"nome": n, "rotulos": dict(r), "n": c, "segundos": round(t, 6), "max_segundos": round(m, 6)}
+                for (n, r), (c, t, m) in self.tempos.items()
+            ],
+        }
+
+    def incorpora(self, dados):
+        for c in dados["contadores"]:
+            self.conta(c["nome"], c["valor"], **c["rotulos"])
+        for t in dados["tempos"]:
+            self.registra_tempo(t["nome"], t["segundos"], t["n"], t["max_segundos"], **t["rotulos"])
+
+
+_metricas = Metricas()
+_execucao = {}
+
+
+class cronometro(contextlib.ContextDecorator):
+    """Mede o tempo de um bloco `with` ou de cada chamada da função decorada"""
+
+    def __init__(self, nome, **rotulos):
+        self.nome = nome
+        self.rotulos = rotulos
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _metricas.registra_tempo(self.nome, time.perf_counter() - self._inicio, **self.rotulos)
+        return False
+
+
+def conta(nome, valor=1, **rotulos):
+    _metricas.conta(nome, valor, **rotulos)
+
+
+def registra_tempo(nome, segundos, **rotulos):
+    """Duração já medida pelo próprio código (ex.: consultas de 06)"""
+    _metricas.registra_tempo(nome, segundos, **rotulos)
+
+
+def registra_arquivo(operacao, caminho, linhas=None, n_bytes=None):
+    """Linhas e bytes lidos/gravados ("leitura" ou "escrita") de um arquivo; bytes pelo tamanho, se omitidos"""
+    caminho = Path(caminho)
+    if n_bytes is None:
+        n_bytes = caminho.stat().st_size if caminho.exists() else 0
+    sufixo = "lidos" if operacao == "leitura" else "gravados"
+    _metricas.conta(f"bytes_{sufixo}", n_bytes, arquivo=caminho.name)
+    if linhas is not None:
+        linhas_sufixo = "lidas" if operacao == "leitura" else "gravadas"
+        _metricas.conta(f"linhas_{linhas_sufixo}", linhas, arquivo=caminho.name)
+
+
+def extrai():
+    """Métricas acumuladas neste processo desde a última extração (processos filhos)"""
+    global _metricas
+    dados, _metricas = _metricas.exporta(), Metricas()
+    return dados
+
+
+def descarta():
+    """Zera o coletor (início de um processo filho criado por fork, que herda o do pai)"""
+    extrai()
+
+
+def incorpora(dados):
+    """Soma ao coletor deste processo as métricas extraídas num processo filho"""
+    if dados:
+        _metricas.incorpora(dados)
+
+
+def adiciona_opcoes(parser):
+    parser.add_argument(
+        "--perfil", choices=PERFIS, default=None,
+        help="perfil de CPU (cprofile) ou de memória (tracemalloc) no relatório de data/metricas",
+    )
+
+
+def inicia(etapa, perfil=None, diretorio=METRICAS_DIR):
+    """Começa a medir a execução de `etapa`; o relatório é gravado ao sair do processo"""
+    _execucao.update(etapa=etapa, perfil=perfil, diretorio=Path(diretorio),
+                     inicio=time.time(), inicio_perf=time.perf_counter())
+    if perfil == "cprofile":
+        import cProfile
+
+        _execucao["profiler"] = cProfile.Profile()
+        _execucao["profiler"].enable()
+    elif perfil == "tracemalloc":
+        import tracemalloc
+
+        tracemalloc.start(10)
+    atexit.register(finaliza)
+
+
+def _pico_rss():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None, None
+    proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _ESCALA_MAXRSS
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * _ESCALA_MAXRSS
+    return proprio, filhos
+
+
+def _perfil_cprofile(destino):
+    import pstats
+
+    profiler = _execucao.pop("profiler")
+    profiler.disable()
+    profiler.dump_stats(destino)
+    estatisticas = pstats.Stats(profiler).stats
+    topo = sorted(estatisticas.items(), key=lambda item: item[1][3], reverse=True)[:N_TOPO_PERFIL]
+    return {
+        "arquivo": str(destino),
+        "funcoes": [
+            {"funcao": f"{Path(arq).name}:{linha}({nome})", "chamadas": nc,
+             "segundos_proprios": round(tt, 6), "segundos_acumulados": round(ct, 6)}
+            for (arq, linha, nome), (_cc, nc, tt, ct, _chamadores) in topo
+        ],
+    }
+
+
+def _perfil_tracemalloc():
+    import tracemalloc
+
+    atual, pico = tracemalloc.get_traced_memory()
+    topo = tracemalloc.take_snapshot().statistics("lineno")[:N_TOPO_PERFIL]
+    tracemalloc.stop()
+    return {
+        "pico_bytes": pico,
+        "atual_bytes": atual,
+        "linhas": [{"local": str(s.traceback[0]), "bytes": s.size, "blocos": s.count} for s in topo],
+    }
+
+
+def _escapa(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos_openmetrics(rotulos):
+    if not rotulos:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapa(v)}"' for k, v in sorted(rotulos.items())) + "}"
+
+
+def openmetrics(relatorio):
+    """Relatório em texto OpenMetrics (contadores _total, tempos como summary _sum/_count)"""
+    base = {"etapa": relatorio["etapa"]}
+    linhas = []
+
+    def metrica(nome, tipo, amostras):
+        nome = PREFIXO_OPENMETRICS + nome
+        linhas.append(f"# TYPE {nome} {tipo}")
+        for sufixo, rotulos, valor in amostras:
+            linhas.append(f"{nome}{sufixo}{_rotulos_openmetrics({**base, **rotulos})} {valor}")
+
+    metrica("execucao_duracao_segundos", "gauge", [("", {}, relatorio["duracao_segundos"])])
+    metrica("execucao_inicio_segundos", "gauge", [("", {}, relatorio["inicio"])])
+    for chave in ("pico_rss_bytes", "pico_rss_filhos_bytes"):
+        if relatorio[chave] is not None:
+            metrica(chave, "gauge", [("", {}, relatorio[chave])])
+
+    contadores = defaultdict(list)
+    for c in relatorio["metricas"]["contadores"]:
+        contadores[c["nome"]].append(("_total", c["rotulos"], c["valor"]))
+    for nome, amostras in sorted(contadores.items()):
+        metrica(nome, "counter", amostras)
+
+    tempos = defaultdict(list)
+    for t in relatorio["metricas"]["tempos"]:
+        tempos[t["nome"]] += [("_sum", t["rotulos"], t["segundos"]), ("_count", t["rotulos"], t["n"])]
+    for nome, amostras in sorted(tempos.items()):
+        metrica(f"{nome}_segundos", "summary", amostras)
+
+    linhas.append("# EOF")
+    return "\n".join(linhas) + "\n"
+
+
+def finaliza():
+    """Grava o relatório da execução (chamada automaticamente ao sair)"""
+    if "etapa" not in _execucao:
+        return None
+    etapa, diretorio = _execucao["etapa"], _execucao["diretorio"]
+    diretorio.mkdir(parents=True, exist_ok=True)
+    proprio, filhos = _pico_rss()
+    relatorio = {
+        "etapa": etapa,
+        "inicio": round(_execucao["inicio"], 3),
+        "duracao_segundos": round(time.perf_counter() - _execucao["inicio_perf"], 6),
+        "pid": os.getpid(),
+        "argv": sys.argv[1:],
+        "pico_rss_bytes": proprio,
+        "pico_rss_filhos_bytes": filhos,
+        "metricas": _metricas.exporta(),
+    }
+    if _execucao["perfil"] == "cprofile":
+        relatorio["cprofile"] = _perfil_cprofile(diretorio / f"{etapa}.prof")
+    elif _execucao["perfil"] == "tracemalloc":
+        relatorio["tracemalloc"] = _perfil_tracemalloc()
+
+    # o textfile collector do node_exporter pode ler o .prom a qualquer momento
+    escreve_texto(diretorio / f"{etapa}.json", json.dumps(relatorio, ensure_ascii=False, indent=1))
+    escreve_texto(diretorio / f"{etapa}.prom", openmetrics(relatorio))
+    with open(diretorio / "historico.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(relatorio, ensure_ascii=False) + "\n")
+
+    pico = f", pico {proprio / 1e6:.0f} MB" if proprio else ""
+    print(f"[INFO] Métricas de {etapa}: {relatorio['duracao_segundos']:.2f}s{pico} -> {diretorio / f'{etapa}.json'}")
+    _execucao.clear()
+    return relatorio
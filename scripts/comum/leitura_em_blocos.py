@@ -0,0 +1,128 @@
+"""Leitura e escrita de CSV em blocos, com memória limitada pelo tamanho do bloco.
+
+O pd.read_csv infere o tipo de cada coluna olhando o arquivo inteiro; lendo com
+`chunksize`, cada bloco teria a própria inferência (um bloco só com "802.400" viraria
+float e seria gravado como "802.4"). Por isso `le_em_blocos` faz duas passadas:
+a primeira só descobre o tipo que cada coluna teria na leitura completa e a segunda
+lê os blocos já com esses tipos. Assim cada bloco tem os mesmos valores e tipos das
+linhas correspondentes do arquivo lido de uma vez, e os CSVs gravados são iguais.
+
+Arquivos .parquet (comum.armazenamento) já têm os tipos gravados e são lidos direto
+por row batches, sem a primeira passada.
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from comum.armazenamento import resolve, texto_como_csv
+from comum.escrita_atomica import publica, temporario
+from comum.instrumentacao import conta, registra_arquivo
+
+TAMANHO_BLOCO_PADRAO = 100_000
+
+
+def _combina_tipos(a, b):
+    """Tipo da coluna no arquivo inteiro a partir dos tipos em dois trechos"""
+    if a is None or a == b:
+        return b
+    numericos = (pd.api.types.is_integer_dtype, pd.api.types.is_float_dtype)
+    if all(any(f(t) for f in numericos) for t in (a, b)):
+        return "float64"
+    if pd.api.types.is_string_dtype(a) or pd.api.types.is_string_dtype(b):
+        return str
+    return object
+
+
+def infere_tipos(caminho, chunksize=TAMANHO_BLOCO_PADRAO, **kwargs):
+    """Dicionário coluna -> tipo que pd.read_csv(caminho) daria, lendo em blocos"""
+    tipos = {}
+    for bloco in pd.read_csv(caminho, chunksize=chunksize, **kwargs):
+        for coluna, tipo in bloco.dtypes.items():
+            tipos[coluna] = _combina_tipos(tipos.get(coluna), tipo)
+    return tipos
+
+
+def le_em_blocos(caminho, chunksize=TAMANHO_BLOCO_PADRAO, **kwargs):
+    """Itera sobre blocos de `chunksize` linhas com os tipos da leitura completa.
+
+    Com dtype explícito (07_consolida_final_to_csv.py) não há inferência e a
+    primeira passada é dispensada. `caminho` pode ter o .parquet de mesmo nome (ver
+    comum.armazenamento.resolve).
+    """
+    arquivo = resolve(caminho)
+    registra_arquivo("leitura", arquivo)
+    if arquivo.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for lote in pq.ParquetFile(arquivo).iter_batches(batch_size=chunksize):
+            bloco = lote.to_pandas()
+            conta("linhas_lidas", len(bloco), arquivo=arquivo.name)
+            yield texto_como_csv(bloco, kwargs["dtype"]) if kwargs.get("dtype") is not None else bloco
+        return
+
+    caminho = arquivo
+    if kwargs.get("dtype") is None:
+        kwargs["dtype"] = infere_tipos(caminho, chunksize, **kwargs)
+    for bloco in pd.read_csv(caminho, chunksize=chunksize, **kwargs):
+        conta("linhas_lidas", len(bloco), arquivo=arquivo.name)
+        yield bloco
+
+
+class EscritorCSV:
+    """Grava blocos num CSV: o primeiro cria o arquivo (com cabeçalho), os demais anexam.
+
+    Os blocos vão para um temporário ao lado de `caminho`, que só o substitui em `fecha`
+    (comum.escrita_atomica): até lá quem lê `caminho` vê a versão anterior inteira, e um
+    erro no meio (`descarta`, ou a saída do `with` com exceção) deixa-a como estava.
+    """
+
+    def __init__(self, caminho, versionado=True, **kwargs):
+        self.caminho = Path(caminho)
+        self.tmp = temporario(self.caminho)
+        self.versionado = versionado
+        self.kwargs = kwargs
+        self.iniciado = False
+        self.n_linhas = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *exc):
+        if tipo is None:
+            self.fecha()
+        else:
+            self.descarta()
+
+    def grava(self, df):
+        inicio = not self.iniciado
+        antes = 0 if inicio else os.path.getsize(self.tmp)
+        df.to_csv(self.tmp, mode="w" if inicio else "a", header=inicio, index=False, **self.kwargs)
+        self.iniciado = True
+        self.n_linhas += len(df)
+        registra_arquivo("escrita", self.caminho, linhas=len(df), n_bytes=os.path.getsize(self.tmp) - antes)
+
+    def ponto(self):
+        """Marca o estado atual, para desfazer com `volta` se um arquivo falhar no meio"""
+        tamanho = os.path.getsize(self.tmp) if self.iniciado else None
+        return tamanho, self.n_linhas
+
+    def volta(self, ponto):
+        tamanho, n_linhas = ponto
+        if tamanho is None:
+            self.descarta()
+        else:
+            with open(self.tmp, "r+b") as f:
+                f.truncate(tamanho)
+        self.n_linhas = n_linhas
+
+    def fecha(self):
+        """Publica o CSV gravado em `caminho`; sem nenhum bloco gravado, `caminho` fica como estava"""
+        if self.iniciado:
+            publica(self.tmp, self.caminho, self.versionado)
+
+    def descarta(self):
+        if self.tmp.exists():
+            self.tmp.unlink()
+        self.iniciado = False
@@ -0,0 +1,98 @@
+"""Manifesto de build: reconstrução incremental das etapas 02 -> 03 -> 04 -> 07.
+
+Cada alvo (um arquivo de data/raw na 02, um tratado na 03, uma categoria na 04, o
+consolidado na 07) é registrado com o sha256 das entradas e saídas e os parâmetros
+da etapa. Com --incremental, uma etapa pula o alvo se as entradas e as saídas estão
+iguais às registradas. Fica então um grafo de dependências como o do make, mas por
+conteúdo:
+
+    raw/coleta_lixo.csv -> processed/tratado_coleta_lixo.csv
+        -> filtered/{nordeste,estados,metropolis}/*_tratado_coleta_lixo.csv
+        -> final/{nordeste,estados,metropolis}_final.csv -> exports/infraestrutura_final.csv
+
+Um alvo refeito com o mesmo conteúdo não invalida os seguintes. O código da etapa
+(o script e todos os módulos de scripts/comum, que as etapas importam direta ou
+indiretamente) conta como entrada. Para não reler arquivos sem mudança,
+o hash é guardado junto com tamanho e mtime e só é recalculado quando eles mudam.
+
+O registro é feito sempre, com ou sem --incremental, de modo que a primeira execução
+incremental depois de uma completa já pula o que está em dia. As etapas 05
+(--incremental, hash por partição) e 06 (cache por versão das tabelas) continuam o
+grafo a partir de data/final.
+"""
+
+import json
+from pathlib import Path
+
+from comum.cache_consultas import sha256_arquivo
+from comum.caminhos import CACHE_DIR
+from comum.escrita_atomica import escreve_texto
+
+CAMINHO_MANIFESTO = CACHE_DIR / "manifesto_build.json"
+
+# Código compartilhado pelas etapas (conta como entrada de todo alvo): a pasta comum inteira,
+# já que uma mudança em numeros_br, esquema, validacao etc. altera as saídas tanto quanto etapas.py
+CODIGO_COMUM = sorted(Path(__file__).resolve().parent.glob("*.py"))
+
+
+class Manifesto:
+    """Entradas/saídas de cada alvo, com hash de conteúdo (JSON em data/cache)"""
+
+    def __init__(self, caminho=CAMINHO_MANIFESTO):
+        self.caminho = Path(caminho)
+        # chaves relativas à raiz do projeto (data/cache/manifesto_build.json -> raiz)
+        self.raiz = self.caminho.resolve().parents[2]
+        dados = {}
+        if self.caminho.exists():
+            try:
+                dados = json.loads(self.caminho.read_text(encoding="utf-8"))
+            except ValueError:
+                print(f"[WARN] Manifesto ilegível, reconstruindo tudo: {self.caminho}")
+        self.arquivos = dados.get("arquivos", {})
+        self.alvos = dados.get("alvos", {})
+
+    def _chave(self, caminho):
+        caminho = Path(caminho).resolve()
+        try:
+            return caminho.relative_to(self.raiz).as_posix()
+        except ValueError:
+            return caminho.as_posix()
+
+    def hash_arquivo(self, caminho):
+        """sha256 do arquivo (None se não existe), recalculado só se tamanho/mtime mudaram"""
+        caminho = Path(caminho)
+        if not caminho.exists():
+            return None
+        st = caminho.stat()
+        chave = self._chave(caminho)
+        info = self.arquivos.get(chave)
+        if info and info["tamanho"] == st.st_size and info["mtime_ns"] == st.st_mtime_ns:
+            return info["sha256"]
+        sha = sha256_arquivo(caminho)
+        self.arquivos[chave] = {"tamanho": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+        return sha
+
+    def _hashes(self, caminhos):
+        return {self._chave(c): self.hash_arquivo(c) for c in caminhos}
+
+    def atualizado(self, alvo, entradas, parametros=None):
+        """True se as entradas e parâmetros são os registrados e as saídas não mudaram"""
+        registro = self.alvos.get(alvo)
+        if registro is None or registro["parametros"] != (parametros or {}):
+            return False
+        if registro["entradas"] != self._hashes(list(entradas) + CODIGO_COMUM):
+            return False
+        return all(self.hash_arquivo(self.raiz / s) == sha for s, sha in registro["saidas"].items())
+
+    def registra(self, alvo, entradas, saidas, parametros=None):
+        self.alvos[alvo] = {
+            "entradas": self._hashes(list(entradas) + CODIGO_COMUM),
+            "saidas": self._hashes(s for s in saidas if Path(s).exists()),
+            "parametros": parametros or {},
+        }
+
+    def salva(self):
+        escreve_texto(
+            self.caminho,
+            json.dumps({"arquivos": self.arquivos, "alvos": self.alvos}, ensure_ascii=False, indent=1),
+        )
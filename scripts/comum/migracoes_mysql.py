@@ -0,0 +1,172 @@
+"""Migrações de esquema das tabelas estados/metropolis/nordeste.
+
+Cada migração tem um id e é registrada em `schema_migracoes` ao ser aplicada,
+então rodar o importador de novo não refaz nada. Antes e depois de aplicar uma
+migração, o EXPLAIN das consultas de 06_exporta_consultas.py é salvo em
+data/diagnostico/, para conferir que os full table scans (type = ALL) sumiram.
+
+Índices (todos cobrem as colunas lidas, evitando voltar à linha da tabela):
+-> ix_<tabela>_inad_ano:    (inadequacao, ano, valor_percentual, regiao, contagem)
+   top-N do ano (q1/q1b), subconsultas por ano da diferença 2016/2019 (q5), comparativo (q8).
+-> ix_<tabela>_inad_regiao: (inadequacao, regiao, ano, valor_percentual)
+   série temporal (q2), LAG (q3), agregados por série (q4/q6/q7) e o join do último ano (q7).
+
+Particionamento RANGE por ano é opcional (--particionar no importador).
+"""
+
+import pandas as pd
+
+from comum.caminhos import DIAGNOSTICO_DIR
+from comum.escrita_atomica import escrita_atomica
+
+TABELAS = ["estados", "metropolis", "nordeste"]
+
+TABELA_MIGRACOES = "schema_migracoes"
+
+DDL_MIGRACOES = f"""
+    CREATE TABLE IF NOT EXISTS {TABELA_MIGRACOES} (
+        migracao VARCHAR(100) NOT NULL PRIMARY KEY,
+        aplicada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+INDICES = {
+    "inad_ano": ["inadequacao", "ano", "valor_percentual", "regiao", "contagem"],
+    "inad_regiao": ["inadequacao", "regiao", "ano", "valor_percentual"],
+}
+
+# Padrões de acesso de 06_exporta_consultas.py usados no EXPLAIN (mesmos filtros e ordenações)
+CONSULTAS_EXPLAIN = {
+    "q1_top_n": (
+        "SELECT ano, inadequacao, regiao, contagem, valor_percentual FROM estados "
+        "WHERE ano = %s AND inadequacao = %s ORDER BY valor_percentual DESC LIMIT 5",
+        (2019, "Domicílios inadequados"),
+    ),
+    "q1b_top_n_metropolis": (
+        "SELECT ano, inadequacao, regiao, contagem, valor_percentual FROM metropolis "
+        "WHERE ano = %s AND inadequacao = %s ORDER BY valor_percentual DESC LIMIT 5",
+        (2019, "Abastecimento de água"),
+    ),
+    "q2_serie": (
+        "SELECT ano, valor_percentual FROM estados WHERE regiao = %s AND inadequacao = %s ORDER BY ano",
+        ("Pernambuco", "Abastecimento de água"),
+    ),
+    "q3_lag": (
+        "SELECT regiao, inadequacao, ano, valor_percentual, "
+        "LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano) AS anterior "
+        "FROM estados WHERE inadequacao = %s ORDER BY regiao, ano",
+        ("Domicílios inadequados",),
+    ),
+    "q4_resumo": (
+        "SELECT regiao, inadequacao, AVG(valor_percentual), STDDEV_SAMP(valor_percentual) "
+        "FROM estados GROUP BY regiao, inadequacao",
+        (),
+    ),
+    "q5_diff_anos": (
+        "SELECT a.inadequacao, a.regiao, b.valor_percentual - a.valor_percentual "
+        "FROM (SELECT regiao, inadequacao, valor_percentual FROM estados WHERE ano = 2016) a "
+        "JOIN (SELECT regiao, inadequacao, valor_percentual FROM estados WHERE ano = 2019) b "
+        "ON a.regiao = b.regiao AND a.inadequacao = b.inadequacao",
+        (),
+    ),
+    "q7_ultimo_ano": (
+        "SELECT s.regiao, s.inadequacao, s.valor_percentual FROM estados s "
+        "JOIN (SELECT regiao, inadequacao, MAX(ano) AS max_ano FROM estados GROUP BY regiao, inadequacao) lm "
+        "ON s.regiao = lm.regiao AND s.inadequacao = lm.inadequacao AND s.ano = lm.max_ano",
+        (),
+    ),
+    "q8_comparativo": (
+        "SELECT e.regiao, m.regiao FROM estados e LEFT JOIN metropolis m "
+        "ON e.inadequacao = m.inadequacao AND e.ano = m.ano WHERE e.ano = %s AND e.inadequacao = %s",
+        (2019, "Abastecimento de água"),
+    ),
+}
+
+
+def _indice_existe(cursor, table_name, indice):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table_name, indice))
+    return cursor.fetchone()[0] > 0
+
+
+def cria_indices_analiticos(cursor):
+    for table_name in TABELAS:
+        for sufixo, colunas in INDICES.items():
+            indice = f"ix_{table_name}_{sufixo}"
+            if _indice_existe(cursor, table_name, indice):
+                continue
+            cursor.execute(f"CREATE INDEX {indice} ON {table_name} ({', '.join(colunas)})")
+            print(f"[INFO] Índice '{indice}' criado em '{table_name}'.")
+
+
+def particiona_por_ano(cursor):
+    """RANGE (ano) com uma partição por ano presente nos dados e uma pmax para anos futuros.
+
+    O MySQL exige a coluna de partição em toda chave única, então a PK vira (id, ano).
+    """
+    for table_name in TABELAS:
+        cursor.execute(f"SELECT DISTINCT ano FROM {table_name} ORDER BY ano")
+        anos = [ano for (ano,) in cursor.fetchall()]
+        particoes = [f"PARTITION p{ano} VALUES LESS THAN ({ano + 1})" for ano in anos]
+        particoes.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+        cursor.execute(f"ALTER TABLE {table_name} DROP PRIMARY KEY, ADD PRIMARY KEY (id, ano)")
+        cursor.execute(f"ALTER TABLE {table_name} PARTITION BY RANGE (ano) ({', '.join(particoes)})")
+        print(f"[INFO] Tabela '{table_name}' particionada por ano ({len(anos)} anos + pmax).")
+
+
+# (id, função, opcional) — aplicadas em ordem; opcionais só quando pedidas explicitamente
+MIGRACOES = [
+    ("001_indices_analiticos", cria_indices_analiticos, False),
+    ("002_particiona_por_ano", particiona_por_ano, True),
+]
+
+
+def registra_explain(conn, rotulo):
+    """Salva o EXPLAIN de todas as consultas em data/diagnostico/explain_<rotulo>.csv.
+
+    Retorna quantos passos do plano fazem full table scan (type = ALL).
+    """
+    DIAGNOSTICO_DIR.mkdir(parents=True, exist_ok=True)
+    cursor = conn.cursor()
+    planos = []
+    for nome, (sql, params) in CONSULTAS_EXPLAIN.items():
+        cursor.execute("EXPLAIN " + sql, params)
+        colunas = [d[0] for d in cursor.description]
+        plano = pd.DataFrame(cursor.fetchall(), columns=colunas)
+        plano.insert(0, "consulta", nome)
+        planos.append(plano)
+    cursor.close()
+
+    df = pd.concat(planos, ignore_index=True)
+    out_path = DIAGNOSTICO_DIR / f"explain_{rotulo}.csv"
+    with escrita_atomica(out_path, versionado=False) as tmp:
+        df.to_csv(tmp, index=False, encoding="utf-8")
+    full_scans = int((df["type"] == "ALL").sum())
+    print(f"[INFO] EXPLAIN salvo em {out_path} ({full_scans} full table scans)")
+    return full_scans
+
+
+def aplica_migracoes(conn, incluir_opcionais=()):
+    """Aplica as migrações pendentes, registrando o EXPLAIN antes e depois de cada uma"""
+    cursor = conn.cursor()
+    cursor.execute(DDL_MIGRACOES)
+    cursor.execute(f"SELECT migracao FROM {TABELA_MIGRACOES}")
+    aplicadas = {m for (m,) in cursor.fetchall()}
+
+    for migracao, funcao, opcional in MIGRACOES:
+        if migracao in aplicadas or (opcional and migracao not in incluir_opcionais):
+            continue
+
+        print(f"[INFO] Aplicando migração {migracao}...")
+        antes = registra_explain(conn, f"{migracao}_antes")
+        funcao(cursor)
+        cursor.execute(f"INSERT INTO {TABELA_MIGRACOES} (migracao) VALUES (%s)", (migracao,))
+        conn.commit()
+        depois = registra_explain(conn, f"{migracao}_depois")
+        print(f"[INFO] Migração {migracao} aplicada (full scans: {antes} → {depois}).")
+
+    cursor.close()
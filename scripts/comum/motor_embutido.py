@@ -0,0 +1,150 @@
+"""Motor analítico embutido (DuckDB) para rodar as consultas sem servidor MySQL.
+
+Carrega data/final/{estados,metropolis,nordeste}_final.csv (ou .parquet) em tabelas com o mesmo
+esquema e os mesmos tipos do importador e executa o SQL de 06_exporta_consultas.py
+com uma tradução mínima de dialeto, para que os CSVs saiam iguais aos do MySQL:
+-> placeholders %s viram ?;
+-> valor_percentual é FLOAT (4 bytes), como no MySQL, mas entra nas contas como
+   DOUBLE (o MySQL promove FLOAT em expressões aritméticas; o DuckDB não);
+-> ROUND vira round_even (o MySQL arredonda DOUBLE para o par mais próximo);
+-> NULLs ordenados como no MySQL (primeiro no ASC, por último no DESC).
+
+A conversão das colunas segue a carga que gerou os exports de data/exports: valor_percentual
+com vírgula vira ponto (como no importador) e contagem, enviada como texto, fica com o
+último ponto como separador decimal (os anteriores são descartados) e é arredondada para
+inteiro ('575.009' -> 575, '2.133.121' -> 2133, '67.08' -> 67).
+
+As tabelas preparadas ficam em cache Parquet (data/cache/embutido/) e são lidas direto
+dali enquanto nem o CSV de origem nem este módulo (a conversão) mudarem. Com agregados=True, as tabelas de resumo de
+comum.agregados_mysql são montadas na carga, com o mesmo SQL do importador.
+"""
+
+import math
+import re
+import threading
+from pathlib import Path
+
+
+from comum.agregados_mysql import ddl_agregados, sql_atualizacao
+from comum.armazenamento import le_tabela, resolve
+from comum.caminhos import CACHE_DIR, FINAL_DIR
+from comum.carga_mysql import COLUNAS_TABELA, prepara_dataframe
+
+BACKENDS_EMBUTIDOS = ("duckdb",)
+
+PARQUET_CACHE_DIR = CACHE_DIR / "embutido"
+
+TABELAS = ["estados", "metropolis", "nordeste"]
+
+_RE_PREFIXO_NUMERICO = re.compile(r"^\s*[+-]?(?:\d+(?:\.\d+)*\.?|\.\d+)")
+
+# Tradução MySQL -> DuckDB (ordem importa)
+_TRADUCOES = [
+    # operando esquerdo de + / -
+    (re.compile(r"(\b(?:\w+\.)?valor_percentual\b)(\s*[-+])"), r"CAST(\1 AS DOUBLE)\2"),
+    # operando direito: LAG(...) OVER (...) recebe o CAST por dentro
+    (re.compile(r"([-+]\s*)LAG\(((?:\w+\.)?valor_percentual)\)"), r"\1LAG(CAST(\2 AS DOUBLE))"),
+    (re.compile(r"([-+]\s*)((?:\w+\.)?valor_percentual\b)"), r"\1CAST(\2 AS DOUBLE)"),
+    (re.compile(r"\bROUND\(", re.IGNORECASE), "round_even("),
+    (re.compile(r"%s"), "?"),
+]
+
+
+def inteiro_como_mysql(valor):
+    """Converte como a carga em BIGINT: prefixo numérico com o último ponto decimal, arredondado"""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        if isinstance(valor, float) and math.isnan(valor):
+            return None
+        numero = float(valor)
+    else:
+        m = _RE_PREFIXO_NUMERICO.match(str(valor))
+        if m:
+            inteira, ponto, decimal = m.group(0).strip().rpartition(".")
+            numero = float(inteira.replace(".", "") + ponto + decimal)
+        else:
+            numero = 0.0
+    return int(math.floor(abs(numero) + 0.5)) * (1 if numero >= 0 else -1)
+
+
+def carrega_tabela(csv_path):
+    """DataFrame com as colunas da tabela MySQL correspondente (contagem já convertida)"""
+    df = prepara_dataframe(le_tabela(csv_path))
+    df.columns = COLUNAS_TABELA
+    df["contagem"] = df["contagem"].map(inteiro_como_mysql).astype("Int64")
+    df.insert(0, "id", range(1, len(df) + 1))
+    return df
+
+
+def traduz_sql(query):
+    for padrao, troca in _TRADUCOES:
+        query = padrao.sub(troca, query)
+    return query
+
+
+class MotorEmbutido:
+    """Banco DuckDB em memória com as três tabelas; `le(query, params)` devolve um DataFrame"""
+
+    def __init__(self, backend="duckdb", final_dir=FINAL_DIR, agregados=False):
+        if backend not in BACKENDS_EMBUTIDOS:
+            raise ValueError(f"Backend embutido inválido: {backend} (use um de {BACKENDS_EMBUTIDOS})")
+        import duckdb  # dependência opcional, só para o motor embutido
+
+        self.backend = backend
+        self.final_dir = Path(final_dir)
+        # .csv ou o .parquet de mesmo nome (comum.armazenamento)
+        self.fontes = {t: resolve(self.final_dir / f"{t}_final.csv") for t in TABELAS}
+        self._lock = threading.Lock()
+
+        self.conn = duckdb.connect(":memory:")
+        self.conn.execute("SET default_null_order = 'nulls_first_on_asc_last_on_desc'")
+        for table_name, csv_path in self.fontes.items():
+            if csv_path.exists():
+                self._carrega(table_name, csv_path)
+                if agregados:
+                    self._monta_agregados(table_name)
+        print(f"[INFO] Motor embutido ({backend}) carregado de {self.final_dir}.")
+
+    def _carrega(self, table_name, csv_path):
+        parquet = PARQUET_CACHE_DIR / f"{table_name}.parquet"
+        origem = max(csv_path.stat().st_mtime, Path(__file__).stat().st_mtime)
+        if parquet.exists() and parquet.stat().st_mtime >= origem:
+            self.conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM read_parquet(?)", [str(parquet)])
+            return
+
+        self.conn.register("df_origem", carrega_tabela(csv_path))
+        self.conn.execute(f"""
+            CREATE TABLE {table_name} AS
+            SELECT id, ano, inadequacao, regiao, contagem, CAST(valor_percentual AS FLOAT) AS valor_percentual
+            FROM df_origem
+        """)
+        self.conn.unregister("df_origem")
+        PARQUET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self.conn.execute(f"COPY {table_name} TO '{parquet.as_posix()}' (FORMAT PARQUET)")
+
+    def _monta_agregados(self, table_name):
+        for ddl in ddl_agregados(table_name):
+            self.conn.execute(ddl)
+        for sql, params in sql_atualizacao(table_name):
+            self.conn.execute(traduz_sql(sql), list(params))
+
+    def le(self, query, params=None):
+        # cada thread usa seu próprio cursor
+        with self._lock:
+            cursor = self.conn.cursor()
+        try:
+            return cursor.execute(traduz_sql(query), list(params or ())).df()
+        finally:
+            cursor.close()
+
+    def versoes(self):
+        """Carimbo por tabela a partir do CSV de origem (para o cache de resultados)"""
+        versoes = {}
+        for table_name, csv_path in self.fontes.items():
+            if csv_path.exists():
+                st = csv_path.stat()
+                codigo = Path(__file__).stat().st_mtime_ns
+                versoes[table_name] = f"{self.backend}:{st.st_mtime_ns}:{st.st_size}:{codigo}"
+        return versoes
+
+    def fecha(self):
+        self.conn.close()
@@ -0,0 +1,115 @@
+"""Conversão de números no formato brasileiro ("2.728.518", "74,29%").
+
+`parse_count` / `parse_percent` tratam uma célula (comportamento original de
+07_consolida_final_to_csv.py, inclusive os fallbacks para células malformadas).
+
+`parse_count_series` / `parse_percent_series` tratam uma coluna inteira com operações
+`.str` do pandas: as células no formato esperado são convertidas de uma vez e só as
+restantes (raras) passam pela função escalar, então o resultado é exatamente
+`pd.to_numeric(serie.apply(parse_xxx), errors="coerce")`.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Inteiros que o float() do parse_count representa sem perda (< 2**53)
+_RE_CONTAGEM_SIMPLES = r"[+-]?[0-9]{1,15}"
+_RE_PERCENTUAL_SIMPLES = r"[+-]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)"
+
+
+def parse_count(x):
+    if pd.isna(x):
+        return None
+    s = str(x).strip()
+
+    s = s.replace('"', '').replace("'", "")
+    s = s.replace("\xa0", "")
+    s = s.replace(".", "")
+    s = s.replace(",", ".")
+
+    try:
+        f = float(s)
+        if f.is_integer():
+            return int(f)
+        return f
+    except:
+        nums = re.sub(r"[^\d]", "", s)
+        if nums == "":
+            return None
+        return int(nums)
+
+
+def parse_percent(x):
+    if pd.isna(x):
+        return None
+    s = str(x).strip()
+    s = s.replace("%", "").replace('"', '').replace("'", "")
+    s = s.replace(".", "") if (s.count(".") > 1 and "," in s) else s  # guard
+    s = s.replace(",", ".")
+    try:
+        return float(s)
+    except:
+        nums = re.sub(r"[^\d\.]", "", s)
+        if nums == "":
+            return None
+        try:
+            return float(nums)
+        except:
+            return None
+
+
+def _texto(serie):
+    """Células como texto, igual a str(x).strip() (as nulas são descartadas depois)"""
+    return serie.astype(str).str.strip()
+
+
+def _combina(serie, s, padrao, tipo, funcao_escalar):
+    """Converte de uma vez as células que casam com `padrao`; as demais vão para a função escalar"""
+    if serie.empty:
+        return pd.to_numeric(serie.map(funcao_escalar), errors="coerce")
+    nulos = serie.isna().to_numpy()
+    rapidos = s.str.fullmatch(padrao).fillna(False).to_numpy(dtype=bool) & ~nulos
+    lentos = ~rapidos & ~nulos
+    valores = s[rapidos].astype(tipo).to_numpy()
+
+    if not lentos.any():
+        # mesmo dtype que pd.to_numeric daria: inteiro sem nulos, float com NaN nos nulos
+        if tipo is np.int64 and not nulos.any():
+            return pd.Series(valores, index=serie.index, dtype=np.int64)
+        resultado = np.full(len(serie), np.nan)
+        resultado[rapidos] = valores
+        return pd.Series(resultado, index=serie.index)
+
+    resultado = np.full(len(serie), None, dtype=object)
+    resultado[rapidos] = valores.astype(object)
+    resultado[lentos] = [funcao_escalar(x) for x in serie.to_numpy(dtype=object)[lentos]]
+    return pd.to_numeric(pd.Series(resultado, index=serie.index), errors="coerce")
+
+
+def parse_count_series(serie):
+    """Versão vetorizada de parse_count para uma coluna inteira"""
+    s = (
+        _texto(serie)
+        .str.replace('"', "", regex=False)
+        .str.replace("'", "", regex=False)
+        .str.replace("\xa0", "", regex=False)
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+    return _combina(serie, s, _RE_CONTAGEM_SIMPLES, np.int64, parse_count)
+
+
+def parse_percent_series(serie):
+    """Versão vetorizada de parse_percent para uma coluna inteira"""
+    s = (
+        _texto(serie)
+        .str.replace("%", "", regex=False)
+        .str.replace('"', "", regex=False)
+        .str.replace("'", "", regex=False)
+    )
+    guard = (s.str.count(r"\.") > 1) & s.str.contains(",", regex=False)
+    s = s.where(~guard, s.str.replace(".", "", regex=False))
+    s = s.str.replace(",", ".", regex=False)
+    return _combina(serie, s, _RE_PERCENTUAL_SIMPLES, np.float64, parse_percent)
@@ -0,0 +1,136 @@
+"""Dimensão de regiões: classificação de cada nome de região e recortes por escopo.
+
+Os arquivos trazem poucas dezenas de nomes distintos de região (país, macrorregiões,
+UFs, regiões metropolitanas) repetidos em milhares de linhas. `classifica_regiao`
+classifica um nome uma única vez (com cache) em (escopo, macrorregião, UF):
+
+    "Bahia"                                 -> ("uf", "Nordeste", "Bahia")
+    "Região Metropolitana de Recife (PE)"   -> ("metropolitana", "Nordeste", "Pernambuco")
+    "Sudeste"                               -> ("macrorregiao", "Sudeste", None)
+
+`IndiceRegioes.mascaras` aplica os recortes a uma coluna `category`: avalia cada
+recorte só nas categorias (nomes distintos) e espalha o resultado para as linhas
+pelos códigos, sem regex nem comparação de texto por linha.
+
+O recorte "metropolis" do Nordeste mantém a regra original de 03_filtragem_regioes.py
+(nome com "Região Metropolitana" e o nome de um estado ou capital do Nordeste), para
+não mudar data/final; por essa regra ficam de fora a RM da Grande São Luís (o nome
+vem quebrado em duas linhas) e a RIDE da Grande Teresina. Para outras macrorregiões,
+`recortes_macrorregiao` monta os recortes só a partir da classificação.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# UFs por macrorregião (sigla -> nome)
+UFS_POR_MACRORREGIAO = {
+    "Norte": {
+        "RO": "Rondônia", "AC": "Acre", "AM": "Amazonas", "RR": "Roraima",
+        "PA": "Pará", "AP": "Amapá", "TO": "Tocantins",
+    },
+    "Nordeste": {
+        "MA": "Maranhão", "PI": "Piauí", "CE": "Ceará", "RN": "Rio Grande do Norte",
+        "PB": "Paraíba", "PE": "Pernambuco", "AL": "Alagoas", "SE": "Sergipe", "BA": "Bahia",
+    },
+    "Sudeste": {"MG": "Minas Gerais", "ES": "Espírito Santo", "RJ": "Rio de Janeiro", "SP": "São Paulo"},
+    "Sul": {"PR": "Paraná", "SC": "Santa Catarina", "RS": "Rio Grande do Sul"},
+    "Centro-Oeste": {"MS": "Mato Grosso do Sul", "MT": "Mato Grosso", "GO": "Goiás", "DF": "Distrito Federal"},
+}
+
+MACRORREGIOES = list(UFS_POR_MACRORREGIAO)
+GRANDES_REGIOES = ["Brasil"] + MACRORREGIOES
+UFS = [uf for ufs in UFS_POR_MACRORREGIAO.values() for uf in ufs.values()]
+
+_UF_POR_SIGLA = {s: uf for ufs in UFS_POR_MACRORREGIAO.values() for s, uf in ufs.items()}
+_MACRORREGIAO_DA_UF = {uf: macro for macro, ufs in UFS_POR_MACRORREGIAO.items() for uf in ufs.values()}
+_RE_SIGLA_FINAL = re.compile(r"\(([A-Z]{2})\)\s*$")
+
+# Lista de estados do Nordeste
+ESTADOS_NORDESTE = list(UFS_POR_MACRORREGIAO["Nordeste"].values())
+
+# Estados e capitais usados para reconhecer as Regiões Metropolitanas do Nordeste
+TERMOS_METROPOLIS_NORDESTE = [
+    "Maranhão", "São Luís",
+    "Piauí", "Teresina",
+    "Ceará", "Fortaleza",
+    "Rio Grande do Norte", "Natal",
+    "Paraíba", "João Pessoa",
+    "Pernambuco", "Recife",
+    "Alagoas", "Maceió",
+    "Sergipe", "Aracaju",
+    "Bahia", "Salvador"
+]
+
+
+@lru_cache(maxsize=None)
+def classifica_regiao(nome):
+    """(escopo, macrorregião, UF) de um nome de região; escopo em pais/macrorregiao/uf/metropolitana/outro"""
+    nome_limpo = " ".join(str(nome).split())
+    if nome_limpo == "Brasil":
+        return ("pais", None, None)
+    if nome_limpo in UFS_POR_MACRORREGIAO:
+        return ("macrorregiao", nome_limpo, None)
+    if nome_limpo in _MACRORREGIAO_DA_UF:
+        return ("uf", _MACRORREGIAO_DA_UF[nome_limpo], nome_limpo)
+    m = _RE_SIGLA_FINAL.search(nome_limpo)
+    if m and m.group(1) in _UF_POR_SIGLA:
+        # RM ou RIDE: "... (PE)" -> estado-mãe pela sigla
+        uf = _UF_POR_SIGLA[m.group(1)]
+        return ("metropolitana", _MACRORREGIAO_DA_UF[uf], uf)
+    return ("outro", None, None)
+
+
+def recortes_macrorregiao(macrorregiao):
+    """Recortes {nome: predicado(nome, classificação)} de uma macrorregião: ela mesma, UFs e RMs"""
+    return {
+        "macrorregiao": lambda nome, c: c[0] == "macrorregiao" and c[1] == macrorregiao,
+        "estados": lambda nome, c: c[0] == "uf" and c[1] == macrorregiao,
+        "metropolis": lambda nome, c: c[0] == "metropolitana" and c[1] == macrorregiao,
+    }
+
+
+def _metropolis_nordeste(nome, _classificacao):
+    """Regra original de 03_filtragem_regioes.py, avaliada uma vez por nome"""
+    return "Região Metropolitana" in nome and any(t in nome for t in TERMOS_METROPOLIS_NORDESTE)
+
+
+# Recortes gravados em data/filtered/{nordeste,estados,metropolis}
+RECORTES_NORDESTE = {
+    "nordeste": recortes_macrorregiao("Nordeste")["macrorregiao"],
+    "estados": recortes_macrorregiao("Nordeste")["estados"],
+    "metropolis": _metropolis_nordeste,
+}
+
+
+class IndiceRegioes:
+    """Pertinência de cada nome de região a cada recorte, calculada uma vez por nome"""
+
+    def __init__(self, recortes=RECORTES_NORDESTE):
+        self.recortes = dict(recortes)
+        self._pertinencia = {}
+
+    def pertinencia(self, nome):
+        """Tupla de booleanos, um por recorte (na ordem de `self.recortes`)"""
+        if nome not in self._pertinencia:
+            c = classifica_regiao(nome)
+            self._pertinencia[nome] = tuple(bool(p(nome, c)) for p in self.recortes.values())
+        return self._pertinencia[nome]
+
+    def mascaras(self, serie):
+        """{recorte: máscara booleana} para uma coluna de regiões (category ou texto)"""
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype("category")
+        categorias = serie.cat.categories
+        tabela = np.array([self.pertinencia(nome) for nome in categorias], dtype=bool)
+        tabela = tabela.reshape(len(categorias), len(self.recortes))
+        # código -1 (região nula) não pertence a nenhum recorte
+        tabela = np.vstack([tabela, np.zeros((1, len(self.recortes)), dtype=bool)])
+        codigos = serie.cat.codes.to_numpy()
+        linhas = tabela[np.where(codigos >= 0, codigos, len(categorias))]
+        return {recorte: linhas[:, i] for i, recorte in enumerate(self.recortes)}
+
+
+INDICE_NORDESTE = IndiceRegioes()
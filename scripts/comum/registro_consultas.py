@@ -0,0 +1,233 @@
+"""Registro de consultas nomeadas com varredura de parâmetros (anos × indicadores × regiões).
+
+Em vez de rodar uma consulta por combinação, cada varredura vira UMA consulta agrupada
+(filtros com IN e funções de janela particionadas pelas dimensões varridas); o resultado
+é dividido no cliente em um CSV por combinação, em data/exports/varreduras/.
+
+Uma dimensão não informada não é filtrada: a varredura cobre todos os valores presentes
+na tabela (matriz completa para o BI). No LAG, os anos filtram as linhas devolvidas, não
+a série: o valor do ano anterior ao primeiro ano pedido vem da tabela. Os rankings
+desempatam pela região, então a divisão em arquivos não depende da ordem do banco.
+"""
+
+import re
+import unicodedata
+
+
+def slug(texto):
+    """'Abastecimento de água' -> 'abastecimento_de_agua'"""
+    sem_acento = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "_", sem_acento.lower()).strip("_")
+
+
+def _filtro_in(coluna, valores, params):
+    """Monta 'AND coluna IN (%s, ...)' e acrescenta os valores em `params`"""
+    if not valores:
+        return ""
+    params.extend(valores)
+    return f" AND {coluna} IN ({', '.join(['%s'] * len(valores))})"
+
+
+# --- Templates ------------------------------------------------------------------
+# Cada template recebe (anos, indicadores, regioes, top_n) e devolve (sql, params, divisor),
+# onde divisor(df) -> {arquivo relativo: DataFrame}.
+
+def _top_n(tabela, alias):
+    def template(anos, indicadores, regioes, top_n):
+        params = []
+        filtros = (
+            _filtro_in("ano", anos, params)
+            + _filtro_in("inadequacao", indicadores, params)
+            + _filtro_in("regiao", regioes, params)
+        )
+        params.append(int(top_n))
+        sql = f"""
+        SELECT ano, inadequacao, {alias}, contagem, valor_percentual
+        FROM (
+          SELECT
+            ano,
+            inadequacao,
+            regiao AS {alias},
+            contagem,
+            valor_percentual,
+            ROW_NUMBER() OVER (PARTITION BY ano, inadequacao ORDER BY valor_percentual DESC, regiao) AS posicao
+          FROM {tabela}
+          WHERE 1 = 1{filtros}
+        ) t
+        WHERE posicao <= %s
+        ORDER BY ano, inadequacao, posicao;
+        """
+
+        def divisor(df):
+            return {
+                f"top{top_n}_{tabela}/{ano}_{slug(inadequacao)}.csv": parte
+                for (ano, inadequacao), parte in df.groupby(["ano", "inadequacao"], sort=True)
+            }
+
+        return sql, params, divisor
+
+    return template
+
+
+def _serie(anos, indicadores, regioes, top_n):
+    params = []
+    filtros = (
+        _filtro_in("regiao", regioes, params)
+        + _filtro_in("inadequacao", indicadores, params)
+        + _filtro_in("ano", anos, params)
+    )
+    sql = f"""
+    SELECT regiao, inadequacao, ano, valor_percentual
+    FROM estados
+    WHERE 1 = 1{filtros}
+    ORDER BY regiao, inadequacao, ano;
+    """
+
+    def divisor(df):
+        return {
+            f"evolucao/{slug(regiao)}_{slug(inadequacao)}.csv": parte[["ano", "valor_percentual"]]
+            for (regiao, inadequacao), parte in df.groupby(["regiao", "inadequacao"], sort=True)
+        }
+
+    return sql, params, divisor
+
+
+def _lag(anos, indicadores, regioes, top_n):
+    params = []
+    filtros = _filtro_in("inadequacao", indicadores, params) + _filtro_in("regiao", regioes, params)
+    # anos só depois do LAG, para não perder o ano anterior ao primeiro pedido
+    filtros_anos = _filtro_in("ano", anos, params)
+    sql = f"""
+    SELECT estado, inadequacao, ano, valor_percentual, valor_ano_anterior, diff_pct_points
+    FROM (
+      SELECT
+        regiao AS estado,
+        inadequacao,
+        ano,
+        valor_percentual,
+        LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano) AS valor_ano_anterior,
+        (valor_percentual - LAG(valor_percentual) OVER (PARTITION BY regiao, inadequacao ORDER BY ano)) AS diff_pct_points
+      FROM estados
+      WHERE 1 = 1{filtros}
+    ) t
+    WHERE 1 = 1{filtros_anos}
+    ORDER BY inadequacao, estado, ano;
+    """
+
+    def divisor(df):
+        return {
+            f"lag_variacao/{slug(inadequacao)}.csv": parte
+            for inadequacao, parte in df.groupby("inadequacao", sort=True)
+        }
+
+    return sql, params, divisor
+
+
+def _diff_anos(anos, indicadores, regioes, top_n):
+    """Top 50 maiores variações para cada par de anos (ano_inicial < ano_final)"""
+    params = []
+    filtros_a = _filtro_in("a.ano", anos, params)
+    filtros_b = _filtro_in("b.ano", anos, params)
+    filtros_inad = _filtro_in("a.inadequacao", indicadores, params)
+    filtros_reg = _filtro_in("a.regiao", regioes, params)
+    sql = f"""
+    SELECT ano_inicial, ano_final, inadequacao, estado, pct_inicial, pct_final, diff
+    FROM (
+      SELECT
+        a.ano AS ano_inicial,
+        b.ano AS ano_final,
+        a.inadequacao,
+        a.regiao AS estado,
+        a.valor_percentual AS pct_inicial,
+        b.valor_percentual AS pct_final,
+        ROUND(b.valor_percentual - a.valor_percentual,2) AS diff,
+        ROW_NUMBER() OVER (
+          PARTITION BY a.ano, b.ano
+          ORDER BY ROUND(b.valor_percentual - a.valor_percentual,2) DESC, a.regiao, a.inadequacao
+        ) AS posicao
+      FROM estados a
+      JOIN estados b
+        ON a.regiao = b.regiao AND a.inadequacao = b.inadequacao AND a.ano < b.ano
+      WHERE 1 = 1{filtros_a}{filtros_b}{filtros_inad}{filtros_reg}
+    ) t
+    WHERE posicao <= 50
+    ORDER BY ano_inicial, ano_final, posicao;
+    """
+
+    def divisor(df):
+        saidas = {}
+        for (inicial, final), parte in df.groupby(["ano_inicial", "ano_final"], sort=True):
+            parte = parte.drop(columns=["ano_inicial", "ano_final"]).rename(columns={
+                "pct_inicial": f"pct_{inicial}",
+                "pct_final": f"pct_{final}",
+                "diff": f"diff_{final}_{inicial}",
+            })
+            saidas[f"diff_anos/diff_{final}_{inicial}_top50.csv"] = parte
+        return saidas
+
+    return sql, params, divisor
+
+
+def _comparativo(anos, indicadores, regioes, top_n):
+    params = []
+    filtros = (
+        _filtro_in("e.ano", anos, params)
+        + _filtro_in("e.inadequacao", indicadores, params)
+        + _filtro_in("e.regiao", regioes, params)
+    )
+    sql = f"""
+    SELECT ano, inadequacao, estado, pct_estado, metropole, pct_metropole, diff_metropole_minus_estado
+    FROM (
+      SELECT
+        e.ano,
+        e.inadequacao,
+        e.regiao AS estado,
+        e.valor_percentual AS pct_estado,
+        m.regiao AS metropole,
+        m.valor_percentual AS pct_metropole,
+        ROUND(m.valor_percentual - e.valor_percentual,2) AS diff_metropole_minus_estado,
+        ROW_NUMBER() OVER (
+          PARTITION BY e.ano, e.inadequacao
+          ORDER BY ROUND(m.valor_percentual - e.valor_percentual,2) DESC, e.regiao, m.regiao
+        ) AS posicao
+      FROM estados e
+      LEFT JOIN metropolis m
+        ON e.inadequacao = m.inadequacao AND e.ano = m.ano
+      WHERE 1 = 1{filtros}
+    ) t
+    WHERE posicao <= 100
+    ORDER BY ano, inadequacao, posicao;
+    """
+
+    def divisor(df):
+        return {
+            f"comparativo_estado_metropole/{ano}_{slug(inadequacao)}.csv": parte
+            for (ano, inadequacao), parte in df.groupby(["ano", "inadequacao"], sort=True)
+        }
+
+    return sql, params, divisor
+
+
+TEMPLATES = {
+    "top_n_estados": _top_n("estados", "estado"),
+    "top_n_metropolis": _top_n("metropolis", "metropole"),
+    "evolucao": _serie,
+    "lag_variacao": _lag,
+    "diff_anos": _diff_anos,
+    "comparativo_estado_metropole": _comparativo,
+}
+
+
+def monta_varredura(nome, anos=None, indicadores=None, regioes=None, top_n=5):
+    """Devolve (rótulo, sql, params, divisor) da varredura `nome` sobre as combinações pedidas.
+
+    As chaves devolvidas pelo divisor são caminhos relativos a data/exports/.
+    """
+    if nome not in TEMPLATES:
+        raise ValueError(f"Consulta desconhecida: {nome} (disponíveis: {', '.join(TEMPLATES)})")
+    sql, params, divisor = TEMPLATES[nome](anos or [], indicadores or [], regioes or [], top_n)
+
+    def divisor_em_varreduras(df):
+        return {f"varreduras/{arquivo}": parte for arquivo, parte in divisor(df).items()}
+
+    return nome, sql, tuple(params), divisor_em_varreduras
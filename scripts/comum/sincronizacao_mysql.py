@@ -0,0 +1,214 @@
+"""Sincronização incremental (upsert idempotente) das tabelas estados/metropolis/nordeste.
+
+Chave natural: (ano, inadequacao, regiao), garantida por um índice único.
+Os dados são divididos em partições (ano, inadequacao); cada partição tem um hash
+de conteúdo guardado na tabela `controle_carga`. Em uma nova execução só as partições
+cujo hash mudou são enviadas, via INSERT ... ON DUPLICATE KEY UPDATE, e as linhas que
+sumiram da partição no CSV são removidas do banco, assim como as partições inteiras
+(um ano ou indicador que saiu do CSV) e o hash delas. Rodar duas vezes seguidas não
+altera nada na segunda.
+
+Uma carga sem --incremental (que só anexa linhas) numa tabela que já tem o índice
+único passa antes por `prepara_carga_completa`: as partições do CSV são apagadas, para
+que o LOAD DATA (que com LOCAL ignora as linhas de chave repetida) e o executemany (que
+pararia com IntegrityError) gravem os valores novos, e os hashes de `controle_carga`
+da tabela são descartados, já que não descrevem mais o conteúdo gravado.
+"""
+
+import hashlib
+import time
+
+from comum.carga_mysql import COLUNAS_TABELA, COMMIT_SIZE_PADRAO, linhas_para_insert
+
+CHAVE_NATURAL = ["ano", "inadequacao", "regiao"]
+CHAVE_PARTICAO = ["ano", "inadequacao"]
+
+TABELA_CONTROLE = "controle_carga"
+
+DDL_CONTROLE = f"""
+    CREATE TABLE IF NOT EXISTS {TABELA_CONTROLE} (
+        tabela VARCHAR(64) NOT NULL,
+        ano INT NOT NULL,
+        inadequacao VARCHAR(255) NOT NULL,
+        hash_conteudo CHAR(64) NOT NULL,
+        n_linhas INT NOT NULL,
+        atualizado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (tabela, ano, inadequacao)
+    );
+"""
+
+
+def nome_indice_unico(table_name):
+    return f"uq_{table_name}_ano_inadequacao_regiao"
+
+
+def _tem_chave_unica(cursor, table_name):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table_name, nome_indice_unico(table_name)))
+    (existe,) = cursor.fetchone()
+    return bool(existe)
+
+
+def garante_chave_unica(conn, table_name):
+    """Cria o índice único da chave natural, removendo antes as duplicatas das cargas antigas.
+
+    Entre linhas repetidas, mantém a de maior id (a carga mais recente).
+    """
+    cursor = conn.cursor()
+    indice = nome_indice_unico(table_name)
+    if not _tem_chave_unica(cursor, table_name):
+        cursor.execute(f"""
+            DELETE t_antiga FROM {table_name} t_antiga
+            JOIN {table_name} t_nova
+              ON t_antiga.ano = t_nova.ano
+             AND t_antiga.inadequacao = t_nova.inadequacao
+             AND t_antiga.regiao = t_nova.regiao
+             AND t_antiga.id < t_nova.id
+        """)
+        if cursor.rowcount:
+            print(f"[INFO] {table_name}: {cursor.rowcount} linhas duplicadas removidas.")
+        cursor.execute(f"ALTER TABLE {table_name} ADD UNIQUE KEY {indice} ({', '.join(CHAVE_NATURAL)})")
+        conn.commit()
+        print(f"[INFO] Índice único '{indice}' criado em '{table_name}'.")
+
+    cursor.execute(DDL_CONTROLE)
+    cursor.close()
+
+
+def prepara_carga_completa(conn, table_name, df):
+    """Antes de uma carga sem --incremental de `df` (já preparado): ver o docstring do módulo"""
+    cursor = conn.cursor()
+    cursor.execute(DDL_CONTROLE)
+    cursor.execute(f"DELETE FROM {TABELA_CONTROLE} WHERE tabela = %s", (table_name,))
+    if _tem_chave_unica(cursor, table_name):
+        particoes = df[CHAVE_PARTICAO].drop_duplicates().itertuples(index=False)
+        n_removidas = 0
+        for ano, inadequacao in particoes:
+            cursor.execute(f"DELETE FROM {table_name} WHERE ano = %s AND inadequacao = %s", (int(ano), inadequacao))
+            n_removidas += cursor.rowcount
+        print(f"[INFO] {table_name}: índice único presente, {n_removidas} linhas das partições do CSV "
+              f"apagadas antes da carga.")
+    conn.commit()
+    cursor.close()
+
+
+def hash_particao(df_particao):
+    """Hash estável do conteúdo de uma partição (independe da ordem das linhas no CSV)"""
+    conteudo = (
+        df_particao[["regiao", "contagem", "valor_percentual"]]
+        .astype(str)
+        .sort_values(["regiao", "contagem", "valor_percentual"])
+        .to_csv(index=False, header=False, lineterminator="\n")
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def hashes_gravados(conn, table_name):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT ano, inadequacao, hash_conteudo FROM {TABELA_CONTROLE} WHERE tabela = %s",
+        (table_name,),
+    )
+    hashes = {(ano, inadequacao): h for ano, inadequacao, h in cursor.fetchall()}
+    cursor.close()
+    return hashes
+
+
+def _sql_upsert(table_name):
+    colunas = ", ".join(COLUNAS_TABELA)
+    marcadores = ", ".join(["%s"] * len(COLUNAS_TABELA))
+    atualizacoes = ", ".join(
+        f"{c} = VALUES({c})" for c in COLUNAS_TABELA if c not in CHAVE_NATURAL
+    )
+    return (
+        f"INSERT INTO {table_name} ({colunas}) VALUES ({marcadores}) "
+        f"ON DUPLICATE KEY UPDATE {atualizacoes}"
+    )
+
+
+def particoes_gravadas(conn, table_name):
+    """Partições (ano, inadequacao) da tabela e as registradas em controle_carga"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT DISTINCT ano, inadequacao FROM {table_name}")
+    particoes = set(cursor.fetchall())
+    cursor.execute(f"SELECT ano, inadequacao FROM {TABELA_CONTROLE} WHERE tabela = %s", (table_name,))
+    particoes.update(cursor.fetchall())
+    cursor.close()
+    return particoes
+
+
+def _remove_orfas(cursor, table_name, ano, inadequacao, regioes):
+    """Apaga da partição as regiões que não estão mais no CSV"""
+    if regioes:
+        marcadores = ", ".join(["%s"] * len(regioes))
+        cursor.execute(
+            f"DELETE FROM {table_name} WHERE ano = %s AND inadequacao = %s AND regiao NOT IN ({marcadores})",
+            (ano, inadequacao, *regioes),
+        )
+    else:
+        cursor.execute(f"DELETE FROM {table_name} WHERE ano = %s AND inadequacao = %s", (ano, inadequacao))
+    return cursor.rowcount
+
+
+def sincroniza_dataframe(conn, df, table_name, commit_size=COMMIT_SIZE_PADRAO, anos=None):
+    """Upsert incremental de `df` (já preparado, colunas na ordem de COLUNAS_TABELA).
+
+    Cada partição alterada é gravada em uma única transação (upsert + remoção + hash),
+    então uma falha no meio não deixa a partição pela metade. As partições gravadas que
+    não estão em `df` são apagadas; com `anos` (df filtrado por ano), só as desses anos.
+    Retorna as partições (ano, inadequacao) alteradas ou apagadas.
+    """
+    inicio = time.perf_counter()
+    garante_chave_unica(conn, table_name)
+
+    df = df.copy()
+    df.columns = COLUNAS_TABELA
+    anteriores = hashes_gravados(conn, table_name)
+    sql = _sql_upsert(table_name)
+
+    cursor = conn.cursor()
+    alteradas = []
+    n_particoes = n_linhas = n_removidas = 0
+    for (ano, inadequacao), particao in df.groupby(CHAVE_PARTICAO, sort=True):
+        n_particoes += 1
+        ano = int(ano)
+        novo_hash = hash_particao(particao)
+        if anteriores.get((ano, inadequacao)) == novo_hash:
+            continue
+
+        linhas = linhas_para_insert(particao)
+        for i in range(0, len(linhas), commit_size):
+            cursor.executemany(sql, linhas[i:i + commit_size])
+        n_removidas += _remove_orfas(cursor, table_name, ano, inadequacao, particao["regiao"].tolist())
+        cursor.execute(f"""
+            INSERT INTO {TABELA_CONTROLE} (tabela, ano, inadequacao, hash_conteudo, n_linhas)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE hash_conteudo = VALUES(hash_conteudo), n_linhas = VALUES(n_linhas)
+        """, (table_name, ano, inadequacao, novo_hash, len(linhas)))
+        conn.commit()
+
+        alteradas.append((ano, inadequacao))
+        n_linhas += len(linhas)
+
+    # partições inteiras que saíram do CSV (um ano ou um indicador a menos)
+    presentes = {(int(a), i) for a, i in df[CHAVE_PARTICAO].drop_duplicates().itertuples(index=False)}
+    for ano, inadequacao in sorted(particoes_gravadas(conn, table_name) - presentes):
+        if anos is not None and ano not in anos:
+            continue
+        n_removidas += _remove_orfas(cursor, table_name, ano, inadequacao, [])
+        cursor.execute(
+            f"DELETE FROM {TABELA_CONTROLE} WHERE tabela = %s AND ano = %s AND inadequacao = %s",
+            (table_name, ano, inadequacao),
+        )
+        conn.commit()
+        alteradas.append((ano, inadequacao))
+
+    cursor.close()
+    duracao = time.perf_counter() - inicio
+    print(
+        f"[INFO] {table_name}: {len(alteradas)}/{n_particoes} partições alteradas, "
+        f"{n_linhas} linhas sincronizadas, {n_removidas} removidas em {duracao:.2f}s"
+    )
+    return alteradas
@@ -0,0 +1,197 @@
+"""Snapshot binário do consolidado, lido por numpy.memmap sem cópia nem parsing.
+
+07_consolida_final_to_csv.py grava, junto com data/exports/infraestrutura_final.csv,
+o arquivo infraestrutura_final.snap:
+
+    b"DOMSNAP1" | tamanho do cabeçalho (uint64 LE) | cabeçalho JSON | colunas
+
+-> o cabeçalho traz a versão do formato, o número de linhas, o esquema (nome, dtype
+   NumPy, deslocamento e tamanho de cada coluna, e da máscara de nulos, se houver), os
+   dicionários das colunas de texto e o sha256 da área de colunas;
+-> cada coluna é um array de largura fixa (ano int16, contagem int64,
+   valor_percentual float64, o mesmo valor do CSV) alinhado em 64 bytes; inadequacao,
+   regiao e source_file são códigos int32 no dicionário do cabeçalho (em ordem
+   alfabética; -1 é nulo).
+
+`Snapshot(caminho)` mapeia o arquivo e devolve as colunas como views do mapa: nada é
+lido até ser usado, e processos que abrem o mesmo arquivo compartilham as páginas do
+cache do sistema. Abrir custa o parsing do cabeçalho, em milissegundos, qualquer que
+seja o tamanho. `verifica=True` confere o sha256 (lê o arquivo inteiro).
+
+Os leitores usam o snapshot só quando ele é mais novo que o CSV (`snapshot_atual`),
+como o .parquet de comum.armazenamento, e recebem os mesmos valores que leriam do CSV.
+O dtype de cada coluna vem do cabeçalho, então snapshots antigos (valor_percentual
+float32) continuam legíveis até o próximo 07.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from comum.caminhos import EXPORTS_DIR
+from comum.escrita_atomica import escrita_atomica
+
+SNAPSHOT_CONSOLIDADO = EXPORTS_DIR / "infraestrutura_final.snap"
+
+MAGICO = b"DOMSNAP1"
+VERSAO = 1
+ALINHAMENTO = 64
+
+# coluna: dtype NumPy (little-endian) ou None para texto com dicionário
+ESQUEMA = {
+    "ano": "<i2",
+    "inadequacao": None,
+    "regiao": None,
+    "contagem": "<i8",
+    "valor_percentual": "<f8",
+    "source_file": None,
+}
+TIPO_CODIGO = "<i4"
+
+
+def _alinhado(posicao):
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+class _Dicionario:
+    """Códigos de uma coluna de texto ao longo dos blocos, na ordem em que os valores aparecem"""
+
+    def __init__(self):
+        self.codigos = {}
+
+    def codifica(self, serie):
+        locais, valores = pd.factorize(serie.astype(object), use_na_sentinel=True)
+        globais = np.array([self.codigos.setdefault(str(v), len(self.codigos)) for v in valores] + [-1],
+                           dtype=np.int32)
+        return globais[locais]
+
+    def ordena(self):
+        """(valores em ordem alfabética, código novo de cada código antigo, com -1 no fim)"""
+        valores = sorted(self.codigos)
+        novo = {v: i for i, v in enumerate(valores)}
+        remapa = np.array([novo[v] for v in self.codigos] + [-1], dtype=np.int32)
+        return valores, remapa
+
+
+def grava_snapshot(blocos, caminho=SNAPSHOT_CONSOLIDADO):
+    """Grava os DataFrames de `blocos` (esquema do consolidado) num snapshot; devolve o número de linhas.
+
+    Só os arrays de largura fixa ficam na memória, então o 07 em blocos também grava o
+    snapshot sem montar o DataFrame inteiro.
+    """
+    partes = {nome: [] for nome in ESQUEMA}
+    nulos = {nome: [] for nome, tipo in ESQUEMA.items() if tipo}
+    dicionarios = {nome: _Dicionario() for nome, tipo in ESQUEMA.items() if tipo is None}
+    for bloco in blocos:
+        for nome, tipo in ESQUEMA.items():
+            if tipo is None:
+                partes[nome].append(dicionarios[nome].codifica(bloco[nome]))
+                continue
+            valores = pd.to_numeric(bloco[nome], errors="coerce")
+            nulos[nome].append(valores.isna().to_numpy())
+            preenchido = 0 if np.dtype(tipo).kind == "i" else np.nan
+            partes[nome].append(valores.to_numpy(dtype=tipo, na_value=preenchido))
+
+    arrays, colunas = [], []
+    for nome, tipo in ESQUEMA.items():
+        coluna = {"nome": nome, "tipo": tipo or TIPO_CODIGO}
+        dados = np.concatenate(partes[nome]) if partes[nome] else np.empty(0, dtype=coluna["tipo"])
+        if tipo is None:
+            coluna["dicionario"], remapa = dicionarios[nome].ordena()
+            dados = remapa[dados]
+        arrays.append((coluna, "dados", dados.astype(coluna["tipo"], copy=False)))
+        if tipo and np.dtype(tipo).kind == "i" and nulos[nome] and np.concatenate(nulos[nome]).any():
+            arrays.append((coluna, "nulos", np.concatenate(nulos[nome]).astype(np.uint8)))
+        colunas.append(coluna)
+
+    # deslocamentos relativos ao início da área de colunas
+    posicao = 0
+    for coluna, campo, dados in arrays:
+        posicao = _alinhado(posicao)
+        coluna[campo] = {"offset": posicao, "nbytes": dados.nbytes}
+        posicao += dados.nbytes
+
+    sha = hashlib.sha256()
+    area = bytearray(_alinhado(posicao))
+    for coluna, campo, dados in arrays:
+        inicio = coluna[campo]["offset"]
+        area[inicio:inicio + dados.nbytes] = dados.tobytes()
+    sha.update(area)
+
+    n_linhas = len(arrays[0][2])
+    cabecalho = json.dumps({
+        "versao": VERSAO,
+        "linhas": n_linhas,
+        "colunas": colunas,
+        "sha256": sha.hexdigest(),
+    }, ensure_ascii=False).encode("utf-8")
+    inicio_area = _alinhado(len(MAGICO) + 8 + len(cabecalho))
+
+    # leitores com o snapshot antigo mapeado continuam com ele até fechar (o rename não o altera)
+    with escrita_atomica(caminho) as tmp, open(tmp, "wb") as f:
+        f.write(MAGICO)
+        f.write(np.uint64(len(cabecalho)).astype("<u8").tobytes())
+        f.write(cabecalho)
+        f.write(b"\0" * (inicio_area - len(MAGICO) - 8 - len(cabecalho)))
+        f.write(area)
+    return n_linhas
+
+
+class Snapshot:
+    """Colunas de um snapshot como arrays NumPy mapeados do arquivo (somente leitura)"""
+
+    def __init__(self, caminho=SNAPSHOT_CONSOLIDADO, verifica=False):
+        self.caminho = Path(caminho)
+        self._mapa = np.memmap(self.caminho, dtype=np.uint8, mode="r")
+        if bytes(self._mapa[:len(MAGICO)]) != MAGICO:
+            raise ValueError(f"{self.caminho} não é um snapshot ({MAGICO.decode()})")
+        tamanho = int(self._mapa[len(MAGICO):len(MAGICO) + 8].view("<u8")[0])
+        fim_cabecalho = len(MAGICO) + 8 + tamanho
+        self.cabecalho = json.loads(bytes(self._mapa[len(MAGICO) + 8:fim_cabecalho]).decode("utf-8"))
+        if self.cabecalho["versao"] != VERSAO:
+            raise ValueError(f"{self.caminho}: versão {self.cabecalho['versao']} do snapshot (esperada {VERSAO})")
+        self._area = self._mapa[_alinhado(fim_cabecalho):]
+        self.linhas = self.cabecalho["linhas"]
+        self.dicionarios = {c["nome"]: c["dicionario"] for c in self.cabecalho["colunas"] if "dicionario" in c}
+
+        self.colunas, self.nulos = {}, {}
+        for coluna in self.cabecalho["colunas"]:
+            self.colunas[coluna["nome"]] = self._view(coluna["dados"], coluna["tipo"])
+            if "nulos" in coluna:
+                self.nulos[coluna["nome"]] = self._view(coluna["nulos"], np.bool_)
+        if verifica:
+            self.verifica()
+
+    def _view(self, bloco, tipo):
+        fim = bloco["offset"] + bloco["nbytes"]
+        if fim > len(self._area):
+            raise ValueError(f"{self.caminho} truncado: coluna termina em {fim}, área tem {len(self._area)} bytes")
+        return self._area[bloco["offset"]:fim].view(tipo)
+
+    def __len__(self):
+        return self.linhas
+
+    def verifica(self):
+        if hashlib.sha256(self._area).hexdigest() != self.cabecalho["sha256"]:
+            raise ValueError(f"{self.caminho}: sha256 não confere com o cabeçalho")
+
+    def para_dataframe(self):
+        """DataFrame no esquema do consolidado; texto como category sobre os códigos do arquivo"""
+        dados = {}
+        for nome, valores in self.colunas.items():
+            if nome in self.dicionarios:
+                dados[nome] = pd.Categorical.from_codes(valores, categories=self.dicionarios[nome])
+            elif nome in self.nulos:
+                dados[nome] = pd.arrays.IntegerArray(np.asarray(valores), np.asarray(self.nulos[nome]))
+            else:
+                dados[nome] = np.asarray(valores)
+        return pd.DataFrame(dados, copy=False)
+
+
+def snapshot_atual(csv, caminho=SNAPSHOT_CONSOLIDADO):
+    """True se o snapshot existe e não é mais velho que o CSV que ele espelha"""
+    caminho, csv = Path(caminho), Path(csv)
+    return caminho.exists() and (not csv.exists() or caminho.stat().st_mtime_ns >= csv.stat().st_mtime_ns)
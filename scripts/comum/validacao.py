@@ -0,0 +1,197 @@
+"""Validação dos dados em blocos, com as linhas rejeitadas numa quarentena.
+
+Um `Validador` por arquivo recebe os blocos na ordem em que são lidos (o arquivo
+inteiro ou os blocos de --chunksize) e faz cada verificação de uma vez sobre o bloco,
+com operações de coluna:
+-> colunas obrigatórias presentes (ano, inadequação, região, contagem e percentual);
+-> ano inteiro entre ANO_MINIMO e ANO_MAXIMO;
+-> inadequação e região não vazias;
+-> contagem no formato "1.234.567" (ou só dígitos) e percentual legível ("74,29%" ou
+   74.29) entre 0 e 100, sem os fallbacks de comum.numeros_br que fazem de qualquer
+   texto um número;
+-> cada indicador × região × ano uma única vez no arquivo (a primeira ocorrência fica).
+
+Sem alguma coluna obrigatória o arquivo inteiro é recusado (DadosInvalidos). As
+linhas com erro saem do fluxo e são gravadas em data/quarentena/<arquivo>, com o
+número do registro no arquivo de origem e os motivos. Uma contagem com cara de decimal
+("414.0", "1.09": a planilha perdeu os zeros do separador de milhar) é ambígua, mas
+não impede a análise, que usa o percentual: a linha segue e vai para a quarentena só
+como aviso. Sem nenhuma linha com erro, o bloco segue sem cópia.
+
+Usado por 02 (logo após a leitura de data/raw, antes de qualquer conversão) e por 05
+(todas as tabelas antes da conexão, para que o INSERT não pare no meio por causa de
+uma linha ruim nem uma tabela recusada deixe as outras carregadas).
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from comum.caminhos import QUARENTENA_DIR
+from comum.etapas import COLUNA_PERCENTUAL_ORIGINAL
+from comum.instrumentacao import conta
+from comum.leitura_em_blocos import EscritorCSV
+
+ANO_MINIMO = 1990
+ANO_MAXIMO = datetime.date.today().year
+
+# coluna lógica: nomes aceitos (arquivos de data/raw depois de 02, ou de data/final)
+COLUNAS_OBRIGATORIAS = {
+    "ano": ["ano"],
+    "inadequacao": ["inadequação", "inadequacao"],
+    "regiao": ["região", "regiao"],
+    "contagem": ["contagem"],
+    "percentual": [COLUNA_PERCENTUAL_ORIGINAL, "valor_percentual"],
+}
+
+_RE_CONTAGEM = r"[0-9]{1,3}(?:\.[0-9]{3})+|[0-9]+"
+_RE_CONTAGEM_AMBIGUA = r"[0-9]+[.,][0-9]+"
+_RE_PERCENTUAL = r"[+-]?[0-9]+(?:[.,][0-9]+)?%?"
+
+
+class DadosInvalidos(ValueError):
+    """Falta alguma coluna obrigatória: o arquivo inteiro é recusado"""
+
+
+def _texto(serie):
+    """Células como texto sem espaços nas pontas; nulas viram "" """
+    return serie.astype(str).str.strip().where(serie.notna(), "")
+
+
+class Validador:
+    """Valida os blocos de um arquivo e grava as linhas rejeitadas em data/quarentena/<nome>"""
+
+    def __init__(self, nome, destino_dir=QUARENTENA_DIR, ano_minimo=ANO_MINIMO, ano_maximo=ANO_MAXIMO):
+        self.nome = nome
+        self.ano_minimo = ano_minimo
+        self.ano_maximo = ano_maximo
+        self.destino = destino_dir / nome
+        # a quarentena anterior fica até esta ser publicada em `fecha` (comum.escrita_atomica)
+        self.quarentena = EscritorCSV(self.destino, versionado=False, encoding="utf-8")
+        self.n_linhas = 0
+        self.n_rejeitadas = 0
+        self.n_avisos = 0
+        # hashes (ordenados) das chaves indicador × região × ano já aceitas
+        self._chaves = np.empty(0, dtype=np.uint64)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *exc):
+        if tipo is None:
+            self.fecha()
+        else:
+            self.quarentena.descarta()
+
+    def _colunas(self, bloco):
+        encontradas, ausentes = {}, []
+        for logica, nomes in COLUNAS_OBRIGATORIAS.items():
+            nome = next((n for n in nomes if n in bloco.columns), None)
+            if nome is None:
+                ausentes.append(nomes[0])
+            encontradas[logica] = nome
+        return encontradas, ausentes
+
+    def valida(self, bloco):
+        """Linhas válidas do bloco (o próprio bloco, se todas forem)"""
+        colunas, ausentes = self._colunas(bloco)
+        if ausentes:
+            raise DadosInvalidos(f"{self.nome}: coluna(s) ausente(s): {', '.join(ausentes)}")
+
+        ano = pd.to_numeric(bloco[colunas["ano"]], errors="coerce").to_numpy(dtype=np.float64)
+        inadequacao = _texto(bloco[colunas["inadequacao"]])
+        regiao = _texto(bloco[colunas["regiao"]])
+        contagem = _texto(bloco[colunas["contagem"]])
+        percentual = _texto(bloco[colunas["percentual"]])
+        legivel = percentual.str.fullmatch(_RE_PERCENTUAL).to_numpy(dtype=bool)
+        valor = pd.to_numeric(
+            percentual.str.replace("%", "", regex=False).str.replace(",", ".", regex=False).where(legivel),
+            errors="coerce",
+        ).to_numpy(dtype=np.float64)
+        contagem_ok = contagem.str.fullmatch(_RE_CONTAGEM).to_numpy(dtype=bool)
+        contagem_ambigua = ~contagem_ok & contagem.str.fullmatch(_RE_CONTAGEM_AMBIGUA).to_numpy(dtype=bool)
+
+        with np.errstate(invalid="ignore"):
+            verificacoes = [
+                # (máscara das linhas com problema, motivo, é erro?)
+                (np.isnan(ano) | (ano % 1 != 0) | (ano < self.ano_minimo) | (ano > self.ano_maximo),
+                 f"ano fora de {self.ano_minimo}-{self.ano_maximo}", True),
+                ((inadequacao == "").to_numpy(), "inadequação vazia", True),
+                ((regiao == "").to_numpy(), "região vazia", True),
+                (~contagem_ok & ~contagem_ambigua, "contagem ilegível", True),
+                (~legivel, "percentual ilegível", True),
+                (legivel & ((valor < 0) | (valor > 100)), "percentual fora de 0-100", True),
+                (contagem_ambigua, "contagem ambígua (separador de milhar?)", False),
+            ]
+        erro = np.zeros(len(bloco), dtype=bool)
+        aviso = np.zeros(len(bloco), dtype=bool)
+        motivos = pd.Series("", index=bloco.index, dtype=object)
+        for mascara, motivo, e_erro in verificacoes:
+            if mascara.any():
+                motivos[mascara] += f"{motivo}; "
+                if e_erro:
+                    erro |= mascara
+                else:
+                    aviso |= mascara
+
+        repetida = self._repetidas(ano, inadequacao, regiao, ~erro)
+        if repetida.any():
+            motivos[repetida] += "indicador × região × ano repetido; "
+            erro |= repetida
+
+        self._quarentena(bloco, erro, aviso & ~erro, motivos.str.rstrip("; "))
+        self.n_linhas += len(bloco)
+        return bloco[~erro] if erro.any() else bloco
+
+    def _repetidas(self, ano, inadequacao, regiao, candidatas):
+        """Linhas `candidatas` cuja chave já apareceu (neste bloco ou nos anteriores)"""
+        chaves = pd.util.hash_pandas_object(
+            pd.DataFrame({"ano": ano, "inadequacao": inadequacao.to_numpy(), "regiao": regiao.to_numpy()}),
+            index=False,
+        ).to_numpy()
+        repetida = np.zeros(len(chaves), dtype=bool)
+        idx = np.flatnonzero(candidatas)
+        if not len(idx):
+            return repetida
+        proprias = chaves[idx]
+        pos = np.minimum(np.searchsorted(self._chaves, proprias), max(len(self._chaves) - 1, 0))
+        vistas = self._chaves[pos] == proprias if len(self._chaves) else np.zeros(len(proprias), dtype=bool)
+        repetida[idx] = pd.Series(proprias).duplicated().to_numpy() | vistas
+        self._chaves = np.sort(np.concatenate([self._chaves, proprias[~repetida[idx]]]))
+        return repetida
+
+    def _quarentena(self, bloco, erro, aviso, motivos):
+        marcadas = erro | aviso
+        if marcadas.any():
+            # número do registro no arquivo de origem, com o cabeçalho como 1
+            linhas = self.n_linhas + np.flatnonzero(marcadas) + 2
+            rejeitadas = bloco[marcadas].astype(object).copy()
+            rejeitadas.insert(0, "motivo", motivos[marcadas].to_numpy())
+            rejeitadas.insert(0, "severidade", np.where(erro[marcadas], "erro", "aviso"))
+            rejeitadas.insert(0, "linha", linhas)
+            self.destino.parent.mkdir(parents=True, exist_ok=True)
+            self.quarentena.grava(rejeitadas)
+        self.n_rejeitadas += int(erro.sum())
+        self.n_avisos += int(aviso.sum())
+
+    def fecha(self):
+        """Publica a quarentena e imprime o resumo do arquivo (e métricas); devolve o número de linhas rejeitadas"""
+        if self.quarentena.iniciado:
+            self.quarentena.fecha()
+        elif self.destino.exists():
+            # quarentena de uma execução anterior, que não vale mais
+            self.destino.unlink()
+        if self.n_rejeitadas:
+            conta("linhas_quarentena", self.n_rejeitadas, arquivo=self.nome)
+            print(f"[WARN] {self.nome}: {self.n_rejeitadas} de {self.n_linhas} linhas rejeitadas -> {self.destino}")
+        if self.n_avisos:
+            conta("linhas_aviso", self.n_avisos, arquivo=self.nome)
+            print(f"[INFO] {self.nome}: {self.n_avisos} linhas com aviso (mantidas) -> {self.destino}")
+        return self.n_rejeitadas
+
+
+def valida_tabela(df, nome, **kwargs):
+    """Valida um DataFrame inteiro de uma vez; devolve as linhas válidas"""
+    with Validador(nome, **kwargs) as validador:
+        return validador.valida(df)
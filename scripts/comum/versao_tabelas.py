@@ -0,0 +1,59 @@
+"""Carimbo de versão das tabelas estados/metropolis/nordeste.
+
+O importador chama `registra_versao_tabela` sempre que grava linhas numa tabela; as
+consultas (06_exporta_consultas.py) leem os carimbos com `le_versoes_tabelas` para
+saber se o resultado guardado em cache ainda vale.
+"""
+
+import mysql.connector
+
+TABELAS = ["estados", "metropolis", "nordeste"]
+
+TABELA_VERSOES = "versao_tabelas"
+
+DDL_VERSOES = f"""
+    CREATE TABLE IF NOT EXISTS {TABELA_VERSOES} (
+        tabela VARCHAR(64) NOT NULL PRIMARY KEY,
+        versao BIGINT NOT NULL,
+        n_linhas BIGINT NOT NULL,
+        max_id BIGINT NOT NULL,
+        atualizado_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    );
+"""
+
+
+def registra_versao_tabela(conn, table_name):
+    """Incrementa a versão de `table_name` e guarda contagem de linhas e maior id"""
+    cursor = conn.cursor()
+    cursor.execute(DDL_VERSOES)
+    cursor.execute(f"""
+        INSERT INTO {TABELA_VERSOES} (tabela, versao, n_linhas, max_id)
+        SELECT %s, 1, COUNT(*), COALESCE(MAX(id), 0) FROM {table_name}
+        ON DUPLICATE KEY UPDATE
+            versao = versao + 1, n_linhas = VALUES(n_linhas), max_id = VALUES(max_id)
+    """, (table_name,))
+    conn.commit()
+    cursor.close()
+
+
+def le_versoes_tabelas(conn):
+    """Dicionário tabela -> carimbo 'versao:n_linhas:max_id'.
+
+    Tabelas sem registro (bancos carregados antes do carimbo existir) usam só
+    contagem e maior id, calculados na hora.
+    """
+    cursor = conn.cursor()
+    versoes = {}
+    try:
+        cursor.execute(f"SELECT tabela, versao, n_linhas, max_id FROM {TABELA_VERSOES}")
+        versoes = {t: f"{v}:{n}:{m}" for t, v, n, m in cursor.fetchall()}
+    except mysql.connector.Error:
+        pass  # tabela de versões ainda não existe
+
+    for table_name in TABELAS:
+        if table_name not in versoes:
+            cursor.execute(f"SELECT COUNT(*), COALESCE(MAX(id), 0) FROM {table_name}")
+            n, m = cursor.fetchone()
+            versoes[table_name] = f"?:{n}:{m}"
+    cursor.close()
+    return versoes
@@ -0,0 +1,29 @@
+"""Pipeline inteiro num só processo, com uma linha de comando única (ver cli.py).
+
+Uso (a partir da raiz do projeto):
+    python scripts/domicilios run all
+    python scripts/domicilios run --from 03 --to 05
+    python scripts/domicilios consulta "SELECT regiao, valor_percentual FROM estados WHERE ano = 2019"
+    python -m scripts.domicilios run all
+
+Com `-m`, o pacote é importado como scripts.domicilios e a pasta scripts/ não está no sys.path;
+ela é inserida aqui, antes do primeiro `from comum...`, como nos scripts numerados.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+_SCRIPTS = str(Path(__file__).resolve().parents[1])
+if _SCRIPTS not in sys.path:
+    sys.path.insert(0, _SCRIPTS)
+
+from comum.caminhos import SCRIPTS_DIR
+
+
+def carrega_script(relativo, nome):
+    """Importa um script numerado de scripts/ (o nome começa com dígito, sem `import`)"""
+    spec = importlib.util.spec_from_file_location(nome, SCRIPTS_DIR / relativo)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
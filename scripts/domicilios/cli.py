@@ -0,0 +1,124 @@
+"""Linha de comando única do pipeline.
+
+Subcomandos:
+-> run:      etapas 01 a 08 num só processo (`run all`, `run --from 03 --to 05`);
+-> exporta:  só as consultas de 06 (MySQL ou DuckDB embutido);
+-> consulta: uma consulta SQL avulsa, com o resultado na tela ou num CSV;
+-> etapas:   lista as etapas.
+
+Os módulos de cada subcomando (pandas, conector do MySQL, DuckDB) só são importados
+quando ele roda, então `consulta` e `exporta` não pagam a importação do pipeline.
+"""
+
+import argparse
+import sys
+
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita, escrita_atomica
+from comum.instrumentacao import adiciona_opcoes, inicia
+from domicilios import carrega_script
+
+CODIGOS = ("01", "02", "03", "04", "05", "06", "07", "08")
+FORMATOS = ("csv", "parquet")  # comum.armazenamento.FORMATOS
+BACKENDS = ("mysql", "duckdb")  # "mysql" + comum.motor_embutido.BACKENDS_EMBUTIDOS
+
+
+def selecao(args):
+    """Códigos das etapas pedidas, na ordem do pipeline"""
+    if args.todas and (args.de or args.ate):
+        raise SystemExit("[ERROR] `run all` não combina com --from/--to (use só um dos dois)")
+    de, ate = args.de or CODIGOS[0], args.ate or CODIGOS[-1]
+    codigos = [c for c in CODIGOS if de <= c <= ate and c not in (args.pula or ())]
+    if not codigos:
+        raise SystemExit(f"[ERROR] Nenhuma etapa entre {de} e {ate}")
+    return codigos
+
+
+def cmd_run(args):
+    from domicilios.orquestracao import EtapaFalhou, executa
+
+    try:
+        executa(selecao(args), formato=args.formato, debug=args.debug, backend=args.backend)
+    except EtapaFalhou as e:
+        print(f"[ERROR] {e}")
+        return 1
+    return 0
+
+
+def cmd_exporta(args):
+    script = carrega_script("analise/06_exporta_consultas.py", "exporta_consultas")
+    falhas = script.executa_consultas(script.monta_consultas(args.agregados), backend=args.backend,
+                                      usar_cache=not args.force, agregados=args.agregados)
+    return 1 if falhas else 0
+
+
+def cmd_consulta(args):
+    script = carrega_script("analise/06_exporta_consultas.py", "exporta_consultas")
+    motor = script.abre_backend(args.backend, pool_size=1)
+    try:
+        df = motor.le(args.sql)
+    finally:
+        motor.fecha()
+    if args.saida:
+        with escrita_atomica(args.saida) as tmp:
+            df.to_csv(tmp, index=False, encoding="utf-8")
+        print(f"[OK] {len(df)} linhas salvas em {args.saida}")
+    else:
+        print(df.to_string(index=False))
+    return 0
+
+
+def cmd_etapas(args):
+    from domicilios.orquestracao import ETAPAS
+
+    for codigo, (descricao, _funcao) in ETAPAS.items():
+        print(f"{codigo}  {descricao}")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="domicilios", description="Pipeline de domicílios inadequados do Nordeste.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    run = sub.add_parser("run", help="roda as etapas num único processo")
+    run.add_argument("todas", nargs="?", choices=["all"], help="todas as etapas (padrão sem --from/--to)")
+    run.add_argument("--from", dest="de", choices=CODIGOS, help="primeira etapa (padrão: 01)")
+    run.add_argument("--to", dest="ate", choices=CODIGOS, help="última etapa (padrão: 08)")
+    run.add_argument("--pula", nargs="+", choices=CODIGOS, help="etapas a pular (ex.: --pula 05 sem MySQL)")
+    run.add_argument("--formato", choices=FORMATOS, default="csv",
+                     help="formato de data/final (e dos intermediários); o export é sempre CSV")
+    run.add_argument("--debug", action="store_true",
+                     help="grava também os intermediários em data/processed e data/filtered")
+    run.add_argument("--backend", choices=BACKENDS, default="mysql", help="onde 06 roda as consultas (padrão: mysql)")
+    run.set_defaults(funcao=cmd_run)
+
+    exporta = sub.add_parser("exporta", help="roda as consultas de 06 e grava os CSVs em data/exports")
+    exporta.add_argument("--backend", choices=BACKENDS, default="mysql", help="padrão: mysql")
+    exporta.add_argument("--force", action="store_true", help="ignora o cache de resultados")
+    exporta.add_argument("--agregados", action="store_true", help="lê as tabelas de resumo mantidas pelo importador")
+    exporta.set_defaults(funcao=cmd_exporta)
+
+    consulta = sub.add_parser("consulta", help="roda uma consulta SQL avulsa nas tabelas estados/metropolis/nordeste")
+    consulta.add_argument("sql", help="a consulta (dialeto MySQL)")
+    consulta.add_argument("--backend", choices=BACKENDS, default="duckdb", help="padrão: duckdb (sem servidor)")
+    consulta.add_argument("--saida", default=None, help="grava o resultado neste CSV em vez de mostrar")
+    consulta.set_defaults(funcao=cmd_consulta)
+
+    etapas = sub.add_parser("etapas", help="lista as etapas do pipeline")
+    etapas.set_defaults(funcao=cmd_etapas)
+
+    for subparser in (run, exporta, consulta):
+        adiciona_opcoes(subparser)
+        adiciona_opcoes_escrita(subparser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.comando != "etapas":
+        inicia(f"domicilios_{args.comando}", args.perfil)
+        configura_escrita(args.geracoes, args.trava)
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
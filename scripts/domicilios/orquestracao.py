@@ -0,0 +1,293 @@
+"""Etapas 01 a 08 num único processo, passando os DataFrames de uma para a outra.
+
+Cada etapa recebe a `Execucao` e deixa nela o que produziu para as seguintes:
+-> 02 e 03 são geradores (um arquivo por vez na memória) e só rodam quando a etapa
+   seguinte os consome; se forem a última etapa pedida, ou se a etapa seguinte for
+   pulada (--pula 03), são consumidas antes e gravam a saída em disco, de onde a
+   próxima etapa lê, como o script numerado;
+-> 04 grava data/final e guarda os DataFrames finais, que 05 e 07 usam sem reler;
+-> 07 guarda o consolidado, que 08 indexa sem reler;
+-> 01 (downloads) e 06 (consultas) trabalham com arquivos, como os scripts.
+
+Quando a execução começa no meio (--from 03), a primeira etapa lê de disco o que a
+anterior teria passado adiante, do mesmo jeito que o script numerado correspondente.
+data/processed e data/filtered só são gravados nesses casos ou com debug. Entre uma etapa e outra os tipos são reinferidos como o pd.read_csv
+faria ao reler o CSV (comum.etapas.como_relido_de_csv), então os arquivos gerados são
+idênticos aos dos scripts rodados em sequência.
+"""
+
+import time
+
+import pandas as pd
+
+from comum.armazenamento import grava_tabela, le_tabela, lista_tabelas
+from comum.caminhos import EXPORTS_DIR, FILTERED_DIR, FINAL_DIR, PROCESSED_DIR, RAW_DIR
+from comum.coleta import baixa_indicadores
+from comum.consolidacao import consolida_arquivo, junta_consolidados
+from comum.escrita_atomica import escrita_atomica
+from comum.etapas import (
+    ARQUIVOS_INDICADORES,
+    CATEGORIAS,
+    como_relido_de_csv,
+    como_texto_de_csv,
+    concatena_categoria,
+    filtra_regioes,
+    padroniza_colunas,
+    padroniza_percentual,
+)
+from comum.indice_consolidado import IndiceConsolidado
+from comum.instrumentacao import cronometro, registra_arquivo
+from comum.snapshot import SNAPSHOT_CONSOLIDADO, grava_snapshot
+from comum.validacao import DadosInvalidos, valida_tabela
+from domicilios import carrega_script
+
+OUTPUT_PATH = EXPORTS_DIR / "infraestrutura_final.csv"
+
+
+class EtapaFalhou(Exception):
+    """Uma etapa terminou com erro; as seguintes não rodam"""
+
+
+class Execucao:
+    """Estado compartilhado pelas etapas de uma execução"""
+
+    def __init__(self, codigos, formato="csv", debug=False, backend="mysql"):
+        self.codigos = list(codigos)
+        self.formato = formato
+        self.debug = debug
+        self.backend = backend
+        # 02/03: gerador de (nome, DataFrame) ou (categoria, DataFrame) ainda não consumido,
+        # e o código da etapa que o deixou
+        self.fluxo = None
+        self.fluxo_de = None
+        # 04: {categoria: DataFrame final}, na ordem de CATEGORIAS
+        self.finais = None
+        # 07: DataFrame gravado em data/exports/infraestrutura_final.csv
+        self.consolidado = None
+
+    def grava_intermediario(self, codigo):
+        """02/03 gravam a saída com debug, se forem a última etapa ou se a seguinte for pulada"""
+        if self.debug or codigo == self.codigos[-1]:
+            return True
+        return self.codigos[self.codigos.index(codigo) + 1] != _seguinte(codigo)
+
+    def entrega(self, codigo, fluxo):
+        self.fluxo, self.fluxo_de = fluxo, codigo
+
+    def recebe(self):
+        """Fluxo deixado pela etapa anterior (None se a execução começou nesta etapa)"""
+        fluxo = self.fluxo
+        self.fluxo = self.fluxo_de = None
+        return fluxo
+
+
+def _seguinte(codigo):
+    return f"{int(codigo) + 1:02d}"
+
+
+# --- geradores de 02 a 04 ---------------------------------------------------------
+
+def le_brutos(raw_dir, grava=False, formato="csv"):
+    """Etapa 02: (nome do arquivo tratado, DataFrame) para cada indicador"""
+    for nome in ARQUIVOS_INDICADORES:
+        caminho = raw_dir / nome
+        if not caminho.exists():
+            print(f"[WARN] Arquivo não encontrado: {caminho} — pulando")
+            continue
+        df = padroniza_colunas(pd.read_csv(caminho))
+        registra_arquivo("leitura", caminho, linhas=len(df))
+        try:
+            df = valida_tabela(df, nome)
+        except DadosInvalidos as e:
+            print(f"[ERROR] {e} — pulando")
+            continue
+        nome_tratado = f"tratado_{nome}"
+        if grava:
+            PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+            grava_tabela(df, PROCESSED_DIR / nome_tratado, formato, encoding="utf-8")
+        yield nome_tratado, df
+
+
+def le_tratados():
+    """Entrada de 03 quando 02 não rodou: os arquivos de data/processed"""
+    for caminho in lista_tabelas(PROCESSED_DIR):
+        yield caminho.with_suffix(".csv").name, le_tabela(caminho, sep=",")
+
+
+def filtra(tratados, grava=False, formato="csv"):
+    """Etapa 03: (categoria, DataFrame) para cada recorte não vazio de cada indicador"""
+    for nome, df in tratados:
+        df = padroniza_percentual(df)
+        for cat, df_cat in filtra_regioes(df).items():
+            if df_cat.empty:
+                continue
+            if grava:
+                (FILTERED_DIR / cat).mkdir(parents=True, exist_ok=True)
+                grava_tabela(df_cat, FILTERED_DIR / cat / f"{cat}_{nome}", formato)
+            yield cat, como_relido_de_csv(df_cat)
+
+
+def le_filtrados():
+    """Entrada de 04 quando 03 não rodou: os arquivos de data/filtered"""
+    for cat in CATEGORIAS:
+        for caminho in lista_tabelas(FILTERED_DIR / cat, f"{cat}_*"):
+            yield cat, le_tabela(caminho, sep=",")
+
+
+def padroniza(filtrados):
+    """Etapa 04: (categoria, DataFrame final) por categoria, na ordem de CATEGORIAS"""
+    por_categoria = {cat: [] for cat in CATEGORIAS}
+    for cat, df in filtrados:
+        por_categoria[cat].append(df)
+
+    for cat in CATEGORIAS:
+        if not por_categoria[cat]:
+            print(f"[INFO] Nenhum dado para {cat}, pulando...")
+            continue
+        yield cat, concatena_categoria(por_categoria[cat])
+
+
+# --- etapas -----------------------------------------------------------------------
+
+def coleta(execucao):
+    script = carrega_script("coleta/01_coleta_dados.py", "coleta_dados")
+    resultados = baixa_indicadores(script.indicadores, RAW_DIR, script.SHEET_ID)
+    falhas = {nome: r for nome, r in resultados.items() if isinstance(r, Exception)}
+    for nome, erro in falhas.items():
+        print(f"[ERROR] Erro ao baixar {nome}: {erro}")
+    if falhas:
+        raise EtapaFalhou(f"{len(falhas)} de {len(resultados)} indicadores não foram baixados")
+    print(f"[INFO] {len(resultados)} indicadores em {RAW_DIR}")
+
+
+def limpeza(execucao):
+    execucao.entrega("02", le_brutos(RAW_DIR, execucao.grava_intermediario("02"), execucao.formato))
+
+
+def filtragem(execucao):
+    tratados = execucao.recebe()
+    if tratados is None:
+        tratados = le_tratados()
+    execucao.entrega("03", filtra(tratados, execucao.grava_intermediario("03"), execucao.formato))
+
+
+def padronizacao(execucao):
+    filtrados = execucao.recebe()
+    if filtrados is None:
+        filtrados = le_filtrados()
+    FINAL_DIR.mkdir(parents=True, exist_ok=True)
+    execucao.finais = {}
+    for cat, df_final in padroniza(filtrados):
+        destino = grava_tabela(df_final, FINAL_DIR / f"{cat}_final.csv", execucao.formato)
+        print(f"[INFO] CSV final salvo: {destino.name} ({len(df_final)} linhas)")
+        execucao.finais[cat] = df_final
+
+
+def importacao(execucao):
+    script = carrega_script("modelagem/05_importa_mysql.py", "importa_mysql")
+    if execucao.finais is None:
+        tabelas = script.le_finais()
+    else:
+        tabelas = (
+            (cat, f"{cat}_final.csv", como_relido_de_csv(df))
+            for cat, df in execucao.finais.items()
+        )
+    try:
+        script.importa(tabelas)
+    except DadosInvalidos as e:
+        raise EtapaFalhou(str(e)) from e
+
+
+def exportacao(execucao):
+    script = carrega_script("analise/06_exporta_consultas.py", "exporta_consultas")
+    falhas = script.executa_consultas(script.monta_consultas(), backend=execucao.backend)
+    if falhas:
+        raise EtapaFalhou(f"{falhas} consultas falharam")
+
+
+def consolidacao(execucao):
+    if execucao.finais is None:
+        carrega_script("integracao/07_consolida_final_to_csv.py", "consolida_final").consolidate()
+        return
+    if not execucao.finais:
+        print("[WARN] Nenhum dado para consolidar.")
+        return
+
+    # mesma ordem do glob ordenado de data/final
+    nomes = sorted(f"{cat}_final.csv" for cat in execucao.finais)
+    dfs = [
+        consolida_arquivo(como_texto_de_csv(execucao.finais[nome[: -len("_final.csv")]]), nome)
+        for nome in nomes
+    ]
+    full = junta_consolidados(dfs)
+    with escrita_atomica(OUTPUT_PATH) as tmp:
+        full.to_csv(tmp, index=False, encoding="utf-8")
+    registra_arquivo("escrita", OUTPUT_PATH, linhas=len(full))
+    print(f"[OK] Consolidado salvo em {OUTPUT_PATH} ({len(full)} linhas)")
+    n_linhas = grava_snapshot([full], SNAPSHOT_CONSOLIDADO)
+    registra_arquivo("escrita", SNAPSHOT_CONSOLIDADO, linhas=n_linhas)
+    print(f"[OK] Snapshot binário salvo em {SNAPSHOT_CONSOLIDADO} ({n_linhas} linhas)")
+    execucao.consolidado = full
+
+
+def analitica(execucao):
+    script = carrega_script("analise/08_analitica_series.py", "analitica_series")
+    if execucao.consolidado is None:
+        script.gera_analitica()
+        return
+    script.gera_analitica(IndiceConsolidado(como_relido_de_csv(execucao.consolidado)))
+
+
+# código: (descrição, função)
+ETAPAS = {
+    "01": ("coleta das planilhas em data/raw", coleta),
+    "02": ("limpeza dos nomes de coluna", limpeza),
+    "03": ("filtragem das regiões do Nordeste", filtragem),
+    "04": ("junção por categoria em data/final", padronizacao),
+    "05": ("importação no MySQL", importacao),
+    "06": ("consultas analíticas em data/exports", exportacao),
+    "07": ("consolidação para o BI", consolidacao),
+    "08": ("analítica das séries para o BI", analitica),
+}
+
+# etapas que só montam o gerador; o trabalho é medido junto com a etapa que o consome
+GERADORES = ("02", "03")
+
+
+def _rotulo(codigos):
+    return codigos[0] if len(codigos) == 1 else f"{codigos[0]}-{codigos[-1]}"
+
+
+def _consome_fluxo(execucao, pendentes):
+    """Roda o gerador pendente até o fim, só para gravar as saídas dele"""
+    with cronometro("etapa", etapa=_rotulo(pendentes)):
+        for _ in execucao.recebe():
+            pass
+
+
+def executa(codigos, formato="csv", debug=False, backend="mysql"):
+    """Roda as etapas `codigos` (na ordem de ETAPAS) e devolve a Execucao"""
+    inicio = time.perf_counter()
+    execucao = Execucao(codigos, formato, debug, backend)
+    pendentes = []
+    for codigo in execucao.codigos:
+        descricao, funcao = ETAPAS[codigo]
+        if execucao.fluxo is not None and codigo != _seguinte(execucao.fluxo_de):
+            # a etapa que consumiria o gerador foi pulada: ele grava a saída e esta etapa lê de disco
+            _consome_fluxo(execucao, pendentes)
+            pendentes = []
+        print(f"[INFO] Etapa {codigo}: {descricao}")
+        pendentes.append(codigo)
+        if codigo in GERADORES:
+            funcao(execucao)
+            continue
+        with cronometro("etapa", etapa=_rotulo(pendentes)):
+            funcao(execucao)
+        pendentes = []
+
+    if execucao.fluxo is not None:
+        # a última etapa pedida é um gerador: consome para gravar as saídas dela
+        _consome_fluxo(execucao, pendentes)
+
+    print(f"[INFO] Etapas {_rotulo(execucao.codigos)} concluídas em {time.perf_counter() - inicio:.2f}s")
+    return execucao
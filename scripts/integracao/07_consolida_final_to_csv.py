@@ -1,178 +1,109 @@
-
-import pandas as pd
+import argparse
+import sys
 from pathlib import Path
-import re
 
-BASE_DIR = Path.cwd()  
-FINAL_DIR = BASE_DIR / "data" / "final"
-EXPORTS_DIR = BASE_DIR / "data" / "exports"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.armazenamento import le_tabela, lista_tabelas
+from comum.caminhos import EXPORTS_DIR, FINAL_DIR
+from comum.consolidacao import consolida_arquivo, junta_consolidados
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita, escrita_atomica
+from comum.esquema import tipos_leitura_texto
+from comum.instrumentacao import adiciona_opcoes, inicia, registra_arquivo
+from comum.leitura_em_blocos import EscritorCSV, le_em_blocos
+from comum.manifesto import Manifesto
+from comum.snapshot import SNAPSHOT_CONSOLIDADO, grava_snapshot
+
 EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_PATH = EXPORTS_DIR / "infraestrutura_final.csv"
 
-# Mapeamento de possíveis nomes de coluna para padrão interno
-COL_MAP = {
-    "ano": "year",
-    "year": "year",
-    "inadequação": "indicator",
-    "inadequacao": "indicator",
-    "indicator": "indicator",
-    "região": "region",
-    "regiao": "region",
-    "region": "region",
-    "contagem": "count",
-    "count": "count",
-    "valor_percentual": "percent_value",
-    "porcentagem_em_relação_ao_total_de_domicílios_particulares_permanentes_duráveis_urbanos": "percent_value",
-    "percentual": "percent_value",
-    "percent_value": "percent_value"
-}
-
-def normalize_colnames(df):
-    cols = {c: c.strip().lower().replace(" ", "_") for c in df.columns}
-    df = df.rename(columns=cols)
-    rename_map = {}
-    for c in df.columns:
-        if c in COL_MAP:
-            rename_map[c] = COL_MAP[c]
-    df = df.rename(columns=rename_map)
-    return df
-
-def parse_count(x):
-    if pd.isna(x):
-        return None
-    s = str(x).strip()
-
-    s = s.replace('"', '').replace("'", "")
-    s = s.replace("\xa0", "")
-    s = s.replace(".", "")
-    s = s.replace(",", ".")
-
-    try:
-        f = float(s)
-        if f.is_integer():
-            return int(f)
-        return f
-    except:
-        nums = re.sub(r"[^\d]", "", s)
-        if nums == "":
-            return None
-        return int(nums)
-
-def parse_percent(x):
-    if pd.isna(x):
-        return None
-    s = str(x).strip()
-    s = s.replace("%", "").replace('"', '').replace("'", "")
-    s = s.replace(".", "") if (s.count(".") > 1 and "," in s) else s  # guard
-    s = s.replace(",", ".")
-    try:
-        return float(s)
-    except:
-        nums = re.sub(r"[^\d\.]", "", s)
-        if nums == "":
-            return None
-        try:
-            return float(nums)
-        except:
-            return None
-
-def infer_indicator_from_filename(path: Path):
-    name = path.stem.lower()
-
-    parts = name.split("_")
-
-    known = {
-        "abastecimento": "Abastecimento de água",
-        "abastecimento_agua": "Abastecimento de água",
-        "esgotamento": "Esgotamento",
-        "esgotamento_sanitario": "Esgotamento",
-        "coleta": "Coleta de Lixo",
-        "coleta_lixo": "Coleta de Lixo",
-        "ausencia_banheiro": "Ausência de Banheiro",
-        "piso": "Piso inadequado",
-        "piso_inadequado": "Piso inadequado",
-        "inadequacao": "Inadequação fundiária",
-        "inadequacao_fundiaria": "Inadequação fundiária",
-        "total": "Domicílios inadequados",
-        "total_inadequados": "Domicílios inadequados"
-    }
-    for k, v in known.items():
-        if k in name:
-            return v
-
-    return name.replace("_", " ").title()
-
-def consolidate():
-    csv_files = sorted(FINAL_DIR.glob("*.csv"))
+def consolidate(chunksize=None, incremental=False):
+    # CSVs (ou Parquet) finais; source_file continua com o nome .csv
+    csv_files = lista_tabelas(FINAL_DIR)
     if not csv_files:
         print(f"[WARN] Nenhum CSV encontrado em {FINAL_DIR}")
         return
 
+    manifesto = Manifesto()
+    entradas = csv_files + [__file__]
+    if incremental and manifesto.atualizado("07:infraestrutura_final", entradas):
+        print(f"[INFO] {OUTPUT_PATH.name} sem mudanças, pulando")
+        return
+
+    if chunksize:
+        if consolidate_em_blocos(csv_files, chunksize):
+            # relê o consolidado em blocos: o snapshot só guarda os arrays de largura fixa
+            grava_snapshot_consolidado(le_em_blocos(OUTPUT_PATH, chunksize))
+            registra_consolidado(manifesto, entradas)
+        return
+
     dfs = []
     for p in csv_files:
         try:
-            df = pd.read_csv(p, dtype=str)
+            df = le_tabela(p, dtype=tipos_leitura_texto())
         except Exception as e:
             print(f"[WARN] erro ao ler {p.name}: {e} — pulando")
             continue
 
-        df = normalize_colnames(df)
-
-        if "indicator" not in df.columns:
-            df["indicator"] = infer_indicator_from_filename(p)
-
-        if "year" not in df.columns and "ano" in df.columns:
-            df = df.rename(columns={"ano": "year"})
-
-        if "region" not in df.columns:
-            if len(df.columns) >= 3:
-                df = df.rename(columns={df.columns[2]: "region"})
-            else:
-                df["region"] = None
-
-        if "count" not in df.columns:
-            if len(df.columns) >= 4:
-                df = df.rename(columns={df.columns[3]: "count"})
-            else:
-                df["count"] = None
-
-        if "percent_value" not in df.columns:
-            if len(df.columns) >= 5:
-                df = df.rename(columns={df.columns[4]: "percent_value"})
-            else:
-                df["percent_value"] = None
-
-        df["year"] = df["year"].astype(str).str.extract(r"(\d{4})", expand=False).astype(float).astype('Int64')
-
-        df["count_clean"] = df["count"].apply(parse_count)
-        df["percent_clean"] = df["percent_value"].apply(parse_percent)
-
-        df["tipo_inadequacao"] = df["indicator"].astype(str).str.strip()
-
-        df_final = df[["year", "tipo_inadequacao", "region", "count_clean", "percent_clean"]].copy()
-        df_final = df_final.rename(columns={
-            "year": "ano",
-            "tipo_inadequacao": "inadequacao",
-            "region": "regiao",
-            "count_clean": "contagem",
-            "percent_clean": "valor_percentual"
-        })
-
-        df_final["source_file"] = p.name
-
-        dfs.append(df_final)
+        dfs.append(consolida_arquivo(df, p.with_suffix(".csv").name))
 
     if not dfs:
         print("[WARN] Nenhum DataFrame válido para concatenar.")
         return
 
-    full = pd.concat(dfs, ignore_index=True)
-    full["contagem"] = pd.to_numeric(full["contagem"], errors="coerce").astype("Int64")
-    full["valor_percentual"] = pd.to_numeric(full["valor_percentual"], errors="coerce")
-    full = full[["ano", "inadequacao", "regiao", "contagem", "valor_percentual", "source_file"]]
+    full = junta_consolidados(dfs)
 
-    full.to_csv(OUTPUT_PATH, index=False, encoding="utf-8")
+    with escrita_atomica(OUTPUT_PATH) as tmp:
+        full.to_csv(tmp, index=False, encoding="utf-8")
+    registra_arquivo("escrita", OUTPUT_PATH, linhas=len(full))
     print(f"[OK] Consolidado salvo em {OUTPUT_PATH} ({len(full)} linhas)")
+    grava_snapshot_consolidado([full])
+    registra_consolidado(manifesto, entradas)
+
+def grava_snapshot_consolidado(blocos):
+    n_linhas = grava_snapshot(blocos, SNAPSHOT_CONSOLIDADO)
+    registra_arquivo("escrita", SNAPSHOT_CONSOLIDADO, linhas=n_linhas)
+    print(f"[OK] Snapshot binário salvo em {SNAPSHOT_CONSOLIDADO} ({n_linhas} linhas)")
+
+def registra_consolidado(manifesto, entradas):
+    manifesto.registra("07:infraestrutura_final", entradas, [OUTPUT_PATH, SNAPSHOT_CONSOLIDADO])
+    manifesto.salva()
+
+def consolidate_em_blocos(csv_files, chunksize):
+    """Mesma saída de consolidate(), lendo e gravando blocos de `chunksize` linhas"""
+    with EscritorCSV(OUTPUT_PATH, encoding="utf-8") as escritor:
+        for p in csv_files:
+            ponto = escritor.ponto()
+            try:
+                for bloco in le_em_blocos(p, chunksize, dtype=tipos_leitura_texto()):
+                    escritor.grava(junta_consolidados([consolida_arquivo(bloco, p.with_suffix(".csv").name)]))
+            except Exception as e:
+                # descarta as linhas já gravadas do arquivo, como se ele não tivesse sido lido
+                escritor.volta(ponto)
+                print(f"[WARN] erro ao ler {p.name}: {e} — pulando")
+
+    if not escritor.iniciado:
+        print("[WARN] Nenhum DataFrame válido para concatenar.")
+        return False
+
+    print(f"[OK] Consolidado salvo em {OUTPUT_PATH} ({escritor.n_linhas} linhas, em blocos)")
+    return True
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Consolida os CSVs de data/final num único arquivo.")
+    parser.add_argument(
+        "--chunksize", type=int, default=None,
+        help="processa cada arquivo em blocos de N linhas (memória limitada; mesma saída)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="não refaz o consolidado se os arquivos de data/final não mudaram",
+    )
+    adiciona_opcoes(parser)
+    adiciona_opcoes_escrita(parser)
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    consolidate()
+    args = parse_args()
+    inicia("07_consolida_final_to_csv", args.perfil)
+    configura_escrita(args.geracoes, args.trava)
+    consolidate(args.chunksize, args.incremental)
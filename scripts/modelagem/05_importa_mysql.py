@@ -1,12 +1,32 @@
 '''O que esse script faz:
 -> Conecta ao MySQL (infraestrutura_nordeste).
 -> Cria as tabelas estados, metropolis e nordeste somente se não existirem.
--> Importa os CSVs finais de cada pasta para a tabela correspondente.'''
+-> Importa os CSVs finais de cada pasta para a tabela correspondente (ou os .parquet
+   de mesmo nome, se gravados com --formato parquet; --anos lê só esses anos).
+-> Com --incremental, sincroniza (upsert por ano/inadequação/região) em vez de anexar.
+-> Atualiza as tabelas de resumo por série (comum/agregados_mysql.py) dos indicadores gravados.
+-> Aplica as migrações de esquema pendentes (índices compostos; particionamento com --particionar).
 
-import pandas as pd
+Uso:
+    python scripts/modelagem/05_importa_mysql.py [--modo load_data|executemany|linha] [--commit-size N]
+    python scripts/modelagem/05_importa_mysql.py --incremental [--anos 2018 2019]'''
+
+import argparse
+import sys
 import mysql.connector
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.agregados_mysql import atualiza_agregados
+from comum.armazenamento import existe, le_tabela
+from comum.caminhos import FINAL_DIR
+from comum.carga_mysql import COMMIT_SIZE_PADRAO, MODOS_CARGA, carrega_dataframe, prepara_dataframe
+from comum.instrumentacao import adiciona_opcoes, cronometro, inicia
+from comum.migracoes_mysql import aplica_migracoes
+from comum.sincronizacao_mysql import prepara_carga_completa, sincroniza_dataframe
+from comum.validacao import DadosInvalidos, valida_tabela
+from comum.versao_tabelas import registra_versao_tabela
+
 # Configurações de conexão
 DB_CONFIG = {
     'host': 'localhost',
@@ -17,9 +37,9 @@ DB_CONFIG = {
 
 # Pastas com os CSVs finais
 CSV_DIRS = {
-    'estados': Path("data/final/estados_final.csv"),
-    'metropolis': Path("data/final/metropolis_final.csv"),
-    'nordeste': Path("data/final/nordeste_final.csv")
+    'estados': FINAL_DIR / "estados_final.csv",
+    'metropolis': FINAL_DIR / "metropolis_final.csv",
+    'nordeste': FINAL_DIR / "nordeste_final.csv"
 }
 
 # Estrutura das tabelas
@@ -56,18 +76,8 @@ TABLE_SCHEMAS = {
     """
 }
 
-# Conexão com o banco
-conn = mysql.connector.connect(**DB_CONFIG)
-cursor = conn.cursor()
-
-# Criação das tabelas
-for table_name, schema in TABLE_SCHEMAS.items():
-    cursor.execute(schema)
-    print(f"[INFO] Tabela '{table_name}' criada ou já existente.")
-
-# Função para importar CSV
-def importa_csv_para_mysql(csv_path, table_name):
-    df = pd.read_csv(csv_path)
+# Importação linha a linha (fallback: --modo linha)
+def importa_linha_a_linha(df, table_name, conn, cursor):
     df['valor_percentual'] = df['valor_percentual'].astype(str).str.replace(',', '.').astype(float)
 
     for _, row in df.iterrows():
@@ -77,16 +87,121 @@ def importa_csv_para_mysql(csv_path, table_name):
         """, (row['ano'], row['inadequação'], row['região'], row['contagem'], row['valor_percentual']))
     
     conn.commit()
-    print(f"[INFO] CSV '{csv_path.name}' importado para tabela '{table_name}'.")
-
-# Importa todos os CSVs
-for table_name, csv_path in CSV_DIRS.items():
-    if csv_path.exists():
-        importa_csv_para_mysql(csv_path, table_name)
-    else:
-        print(f"[WARN] CSV não encontrado: {csv_path}")
-
-# Fecha conexão
-cursor.close()
-conn.close()
-print("[INFO] Processo concluído!")
\ No newline at end of file
+
+# Importação em lote (LOAD DATA LOCAL INFILE ou executemany)
+def importa_em_lote(df, table_name, conn, modo, commit_size):
+    carrega_dataframe(conn, prepara_dataframe(df), table_name, modo=modo, commit_size=commit_size)
+
+# Sincronização incremental (INSERT ... ON DUPLICATE KEY UPDATE só nas partições alteradas)
+def sincroniza(df, table_name, conn, commit_size, anos=None):
+    """Partições (ano, inadequacao) gravadas ou apagadas"""
+    return sincroniza_dataframe(conn, prepara_dataframe(df), table_name, commit_size=commit_size, anos=anos)
+
+def valida_tabelas(tabelas):
+    """Valida todas as tabelas antes da primeira escrita no banco; devolve [(tabela, origem, linhas válidas)]
+
+    As linhas inválidas vão para data/quarentena/<origem>. Se alguma tabela é recusada
+    inteira (falta coluna obrigatória), nenhuma é carregada.
+    """
+    validas, recusadas = [], []
+    for table_name, origem, df in tabelas:
+        try:
+            validas.append((table_name, origem, valida_tabela(df, origem)))
+        except DadosInvalidos as e:
+            print(f"[ERROR] {e} — tabela '{table_name}' recusada")
+            recusadas.append(table_name)
+    if recusadas:
+        raise DadosInvalidos(f"tabela(s) recusada(s) na validação: {', '.join(recusadas)}; nada foi importado")
+    return validas
+
+def importa(tabelas, modo="load_data", commit_size=COMMIT_SIZE_PADRAO, incremental=False, particionar=False,
+            anos=None):
+    """Carrega no MySQL cada (tabela, nome de origem, DataFrame final) de `tabelas`
+
+    Os DataFrames vêm de data/final (main) ou direto da etapa 04 (scripts/domicilios).
+    `anos`: os DataFrames foram filtrados por esses anos (as partições de outros anos ficam).
+    Todas são validadas antes da conexão; uma tabela recusada levanta DadosInvalidos.
+    """
+    tabelas = valida_tabelas(tabelas)
+
+    # Conexão com o banco
+    conn = mysql.connector.connect(**DB_CONFIG, allow_local_infile=(modo == "load_data"))
+    cursor = conn.cursor()
+
+    # Criação das tabelas
+    for table_name, schema in TABLE_SCHEMAS.items():
+        cursor.execute(schema)
+        print(f"[INFO] Tabela '{table_name}' criada ou já existente.")
+
+    for table_name, origem, df in tabelas:
+        # None = tabela inteira regravada (carga que anexa tudo)
+        particoes = None
+        with cronometro("carga", tabela=table_name):
+            if incremental:
+                particoes = sincroniza(df, table_name, conn, commit_size, anos)
+            else:
+                # se uma carga incremental já criou o índice único, as partições do CSV são apagadas antes
+                prepara_carga_completa(conn, table_name, prepara_dataframe(df))
+                if modo == "linha":
+                    importa_linha_a_linha(df, table_name, conn, cursor)
+                else:
+                    importa_em_lote(df, table_name, conn, modo, commit_size)
+
+        # resumos antes do novo carimbo de versão: o cache de 06 nunca guarda resumo velho com versão nova
+        with cronometro("agregados", tabela=table_name):
+            atualiza_agregados(conn, table_name, particoes)
+        if particoes is None or particoes:
+            registra_versao_tabela(conn, table_name)
+
+        if incremental:
+            print(f"[INFO] CSV '{origem}' sincronizado com a tabela '{table_name}'.")
+        else:
+            print(f"[INFO] CSV '{origem}' importado para tabela '{table_name}'.")
+
+    # Migrações de esquema (índices/partições), com EXPLAIN antes e depois em data/diagnostico/
+    with cronometro("migracoes"):
+        aplica_migracoes(conn, incluir_opcionais=("002_particiona_por_ano",) if particionar else ())
+
+    # Fecha conexão
+    cursor.close()
+    conn.close()
+
+def le_finais(filtros=None):
+    """(tabela, nome do CSV, DataFrame) de cada arquivo de data/final"""
+    for table_name, csv_path in CSV_DIRS.items():
+        if not existe(csv_path):
+            print(f"[WARN] CSV não encontrado: {csv_path}")
+            continue
+        yield table_name, csv_path.name, le_tabela(csv_path, filtros)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Importa os CSVs finais para o MySQL.")
+    parser.add_argument("--modo", choices=MODOS_CARGA + ("linha",), default="load_data",
+                        help="Estratégia de carga (padrão: load_data, com fallback para executemany)")
+    parser.add_argument("--commit-size", type=int, default=COMMIT_SIZE_PADRAO,
+                        help=f"Linhas por lote/commit (padrão: {COMMIT_SIZE_PADRAO})")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Upsert idempotente por (ano, inadequacao, regiao); só grava partições alteradas")
+    parser.add_argument("--particionar", action="store_true",
+                        help="Aplica também a migração de particionamento RANGE por ano")
+    parser.add_argument("--anos", type=int, nargs="+", default=None,
+                        help="Importa só estes anos (com Parquet, lê só os row groups desses anos)")
+    adiciona_opcoes(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    inicia("05_importa_mysql", args.perfil)
+
+    # Importa todos os CSVs (com --incremental e --anos, as partições de outros anos ficam como estão)
+    filtros = [("ano", "in", args.anos)] if args.anos else None
+    try:
+        importa(le_finais(filtros), modo=args.modo, commit_size=args.commit_size,
+                incremental=args.incremental, particionar=args.particionar, anos=args.anos)
+    except DadosInvalidos as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    print("[INFO] Processo concluído!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Pipeline de tratamento em uma passada: raw -> final -> exports, sem CSVs intermediários.
+
+Encadeia em memória as mesmas etapas de 02_limpeza_padronizacao.py,
+03_filtragem_regioes.py, 04_padronizacao_csvs.py e 07_consolida_final_to_csv.py;
+equivale a `python scripts/domicilios run --from 02 --to 07 --pula 05 06`
+(scripts/domicilios/orquestracao.py). Cada arquivo de data/raw é lido uma única vez;
+as etapas são geradores que passam os DataFrames adiante. Só são gravados os produtos
+usados pelas etapas seguintes (data/final/*_final.csv para o MySQL/DuckDB e
+data/exports/infraestrutura_final.csv); data/processed e data/filtered só com --debug.
+Com --formato parquet esses arquivos (exceto o export para o BI) saem em Parquet
+(comum.armazenamento).
+
+Os arquivos gerados são idênticos aos dos scripts rodados em sequência: entre uma
+etapa e outra os tipos são reinferidos como o pd.read_csv faria ao reler o CSV
+(ver comum.etapas.como_relido_de_csv). tests/test_executa_pipeline.py confere com os
+arquivos versionados.
+
+Uso (a partir da raiz do projeto):
+    python scripts/pipeline/executa_pipeline.py [--debug] [--formato csv|parquet]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.armazenamento import FORMATOS
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita
+from comum.instrumentacao import adiciona_opcoes, inicia
+from domicilios.orquestracao import executa as executa_etapas
+
+
+def executa(debug=False, formato="csv"):
+    executa_etapas(["02", "03", "04", "07"], formato=formato, debug=debug)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Executa o tratamento raw -> final -> exports em memória.")
+    parser.add_argument(
+        "--debug", action="store_true",
+        help="grava também os intermediários em data/processed e data/filtered",
+    )
+    parser.add_argument(
+        "--formato", choices=FORMATOS, default="csv",
+        help="formato de data/final (e dos intermediários com --debug); o export é sempre CSV",
+    )
+    adiciona_opcoes(parser)
+    adiciona_opcoes_escrita(parser)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    inicia("executa_pipeline", args.perfil)
+    configura_escrita(args.geracoes, args.trava)
+    executa(debug=args.debug, formato=args.formato)
@@ -1,41 +1,103 @@
+import argparse
 import os
+import sys
 import pandas as pd
 
-# Descobre o diretório da raiz do projeto (2 níveis acima do script atual)
-ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from comum.armazenamento import FORMATOS, grava_tabela
+from comum.caminhos import PROCESSED_DIR, RAW_DIR
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita
+from comum.etapas import ARQUIVOS_INDICADORES, padroniza_colunas
+from comum.execucao_paralela import executa_em_paralelo, resume_falhas
+from comum.instrumentacao import adiciona_opcoes, inicia, registra_arquivo
+from comum.leitura_em_blocos import EscritorCSV, le_em_blocos
+from comum.manifesto import Manifesto
+from comum.validacao import Validador
 
-# Define pastas de entrada e saída
-RAW_DIR = os.path.join(ROOT_DIR, "data", "raw")
-PROCESSED_DIR = os.path.join(ROOT_DIR, "data", "processed")
+# Pastas de entrada e saída: comum/caminhos.py (relativas à raiz do projeto)
 
 # Cria pasta processed caso não exista
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
-def tratar_csv(nome_arquivo):
-    """Carrega, trata e salva um CSV específico"""
+def tratar_csv(nome_arquivo, chunksize=None, formato="csv"):
+    """Carrega, trata e salva um CSV específico (em blocos de `chunksize` linhas, se informado)"""
     caminho_entrada = os.path.join(RAW_DIR, nome_arquivo)
     caminho_saida = os.path.join(PROCESSED_DIR, f"tratado_{nome_arquivo}")
 
     print(f"\n[INFO] Lendo {caminho_entrada}...")
+    # linhas inválidas vão para data/quarentena/<arquivo> (comum/validacao.py)
+    if chunksize:
+        with Validador(nome_arquivo) as validador, EscritorCSV(caminho_saida, encoding="utf-8") as escritor:
+            for bloco in le_em_blocos(caminho_entrada, chunksize):
+                escritor.grava(validador.valida(padroniza_colunas(bloco)))
+        print(f"[INFO] Arquivo tratado salvo em {caminho_saida} ({escritor.n_linhas} linhas, em blocos)")
+        return
+
     df = pd.read_csv(caminho_entrada)
+    registra_arquivo("leitura", caminho_entrada, linhas=len(df))
 
     # Exemplo de padronização 
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    df = padroniza_colunas(df)
+    with Validador(nome_arquivo) as validador:
+        df = validador.valida(df)
 
-    # Salva o arquivo tratado
-    df.to_csv(caminho_saida, index=False, encoding="utf-8")
+    # Salva o arquivo tratado (CSV ou Parquet)
+    caminho_saida = grava_tabela(df, caminho_saida, formato, encoding="utf-8")
     print(f"[INFO] Arquivo tratado salvo em {caminho_saida}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Padroniza os nomes de coluna dos CSVs de data/raw.")
+    parser.add_argument(
+        "--chunksize", type=int, default=None,
+        help="processa cada arquivo em blocos de N linhas (memória limitada; mesma saída)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="arquivos tratados em paralelo (padrão: número de CPUs; 1 = sequencial)",
+    )
+    parser.add_argument(
+        "--formato", choices=FORMATOS, default="csv",
+        help="formato dos arquivos de data/processed (padrão: csv)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="pula os arquivos cujo CSV de data/raw e saída não mudaram desde a última execução",
+    )
+    adiciona_opcoes(parser)
+    adiciona_opcoes_escrita(parser)
+    args = parser.parse_args()
+    if args.chunksize and args.formato != "csv":
+        parser.error("--chunksize só grava CSV")
+    return args
+
+def entradas(nome_arquivo):
+    return [os.path.join(RAW_DIR, nome_arquivo), __file__]
+
+def saida(nome_arquivo, formato):
+    return os.path.join(PROCESSED_DIR, f"tratado_{os.path.splitext(nome_arquivo)[0]}.{formato}")
+
 if __name__ == "__main__":
-    arquivos = arquivos = [
-    "abastecimento_agua.csv",
-    "ausencia_banheiro.csv",
-    "coleta_lixo.csv",
-    "esgotamento_sanitario.csv",
-    "inadequacao_fundiaria.csv",
-    "piso_inadequado.csv",
-    "total_inadequados.csv",
-]
-
-    for arquivo in arquivos:
-        tratar_csv(arquivo)
\ No newline at end of file
+    args = parse_args()
+    inicia("02_limpeza_padronizacao", args.perfil)
+    configura_escrita(args.geracoes, args.trava)
+    arquivos = ARQUIVOS_INDICADORES
+    manifesto = Manifesto()
+    parametros = {"formato": args.formato}
+
+    if args.incremental:
+        em_dia = [a for a in arquivos if manifesto.atualizado(f"02:{a}", entradas(a), parametros)]
+        for nome_arquivo in em_dia:
+            print(f"[INFO] {nome_arquivo} sem mudanças, pulando")
+        arquivos = [a for a in arquivos if a not in em_dia]
+
+    # Um processo por arquivo; erro num arquivo não interrompe os demais
+    resultados = executa_em_paralelo(
+        tratar_csv, arquivos, args.jobs, chunksize=args.chunksize, formato=args.formato
+    )
+    for nome_arquivo, _, erro in resultados:
+        if erro is None:
+            manifesto.registra(
+                f"02:{nome_arquivo}", entradas(nome_arquivo), [saida(nome_arquivo, args.formato)], parametros
+            )
+    manifesto.salva()
+    sys.exit(resume_falhas(resultados))
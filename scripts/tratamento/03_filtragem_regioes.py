@@ -1,69 +1,128 @@
-import pandas as pd
+import argparse
+import contextlib
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.armazenamento import FORMATOS, grava_tabela, le_tabela, lista_tabelas
+from comum.caminhos import FILTERED_DIR, PROCESSED_DIR
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita
+from comum.etapas import filtra_regioes, padroniza_percentual
+from comum.execucao_paralela import executa_em_paralelo, resume_falhas
+from comum.instrumentacao import adiciona_opcoes, inicia
+from comum.leitura_em_blocos import EscritorCSV, le_em_blocos
+from comum.manifesto import Manifesto
+
 # Diretórios
-processed_dir = Path("data/processed")
-filtered_dir = Path("data/filtered")
+processed_dir = PROCESSED_DIR
+filtered_dir = FILTERED_DIR
 filtered_nordeste = filtered_dir / "nordeste"
 filtered_estados = filtered_dir / "estados"
 filtered_metropolis = filtered_dir / "metropolis"
 
-# Cria pastas se não existirem
-for d in [filtered_nordeste, filtered_estados, filtered_metropolis]:
-    d.mkdir(parents=True, exist_ok=True)
+pastas = {"nordeste": filtered_nordeste, "estados": filtered_estados, "metropolis": filtered_metropolis}
+rotulos = {"nordeste": "Nordeste", "estados": "Estados", "metropolis": "Metropolis (Nordeste)"}
+
+def filtra_arquivo_em_blocos(csv_file, chunksize):
+    """Modo em blocos: cada recorte é anexado ao seu arquivo (CSV) bloco a bloco"""
+    with contextlib.ExitStack() as pilha:
+        escritores = {cat: pilha.enter_context(EscritorCSV(pastas[cat] / f"{cat}_{csv_file.stem}.csv"))
+                      for cat in pastas}
+        for bloco in le_em_blocos(csv_file, chunksize, sep=","):
+            for cat, df_cat in filtra_regioes(padroniza_percentual(bloco)).items():
+                if not df_cat.empty:
+                    escritores[cat].grava(df_cat)
+    for cat, escritor in escritores.items():
+        if escritor.n_linhas:
+            print(f"[INFO] {rotulos[cat]} salvo: {cat}_{csv_file.stem}.csv ({escritor.n_linhas} linhas, em blocos)")
 
-# CSVs na pasta processed
-csv_files = processed_dir.glob("*.csv")
+def filtra_arquivo(csv_file, chunksize=None, formato="csv"):
+    """Grava os recortes do Nordeste de um arquivo (CSV ou Parquet) de data/processed"""
+    if chunksize:
+        filtra_arquivo_em_blocos(csv_file, chunksize)
+        return
 
-# Lista de estados do Nordeste
-estados_nordeste = [
-    "Maranhão", "Piauí", "Ceará", "Rio Grande do Norte", "Paraíba",
-    "Pernambuco", "Alagoas", "Sergipe", "Bahia"
-]
+    df = le_tabela(csv_file, sep=",")
 
-# Loop para processar cada CSV
-for csv_file in csv_files:
-    df = pd.read_csv(csv_file, sep=",")
-    
     # Padroniza a coluna de percentual
-    if "porcentagem_em_relação_ao_total_de_domicílios_particulares_permanentes_duráveis_urbanos" in df.columns:
-        df = df.rename(columns={
-            "porcentagem_em_relação_ao_total_de_domicílios_particulares_permanentes_duráveis_urbanos": "valor_percentual"
-        })
-        df['valor_percentual'] = df['valor_percentual'].str.replace(',', '.', regex=False)\
-                                                     .str.replace('%', '', regex=False)\
-                                                     .astype(float)
-    
+    df = padroniza_percentual(df)
+    recortes = filtra_regioes(df)
+
     # Filtra Nordeste
-    df_nordeste = df[df["região"] == "Nordeste"]
+    df_nordeste = recortes["nordeste"]
     if not df_nordeste.empty:
-        df_nordeste.to_csv(filtered_nordeste / f"nordeste_{csv_file.name}", index=False)
-        print(f"[INFO] Nordeste salvo: nordeste_{csv_file.name}")
-    
+        destino = grava_tabela(df_nordeste, filtered_nordeste / f"nordeste_{csv_file.stem}.csv", formato)
+        print(f"[INFO] Nordeste salvo: {destino.name}")
+
     # Filtra Estados do Nordeste
-    df_estados = df[df["região"].isin(estados_nordeste)]
+    df_estados = recortes["estados"]
     if not df_estados.empty:
-        df_estados.to_csv(filtered_estados / f"estados_{csv_file.name}", index=False)
-        print(f"[INFO] Estados salvo: estados_{csv_file.name}")
-    
+        destino = grava_tabela(df_estados, filtered_estados / f"estados_{csv_file.stem}.csv", formato)
+        print(f"[INFO] Estados salvo: {destino.name}")
+
     # Filtra Regiões Metropolitanas do Nordeste
-    df_metropolis = df[
-        df["região"].str.contains("Região Metropolitana", na=False) &
-        df["região"].str.contains(
-            "|".join([
-                "Maranhão", "São Luís",  
-                "Piauí", "Teresina",     
-                "Ceará", "Fortaleza",
-                "Rio Grande do Norte", "Natal",
-                "Paraíba", "João Pessoa",
-                "Pernambuco", "Recife",
-                "Alagoas", "Maceió",
-                "Sergipe", "Aracaju",
-                "Bahia", "Salvador"
-            ]),
-            na=False
-        )
-    ]
+    df_metropolis = recortes["metropolis"]
     if not df_metropolis.empty:
-        df_metropolis.to_csv(filtered_metropolis / f"metropolis_{csv_file.name}", index=False)
-        print(f"[INFO] Metropolis salvo (Nordeste): metropolis_{csv_file.name}")
+        destino = grava_tabela(df_metropolis, filtered_metropolis / f"metropolis_{csv_file.stem}.csv", formato)
+        print(f"[INFO] Metropolis salvo (Nordeste): {destino.name}")
+
+def saidas(csv_file, formato):
+    """Recortes que `filtra_arquivo` pode gravar para `csv_file`"""
+    return [pastas[cat] / f"{cat}_{csv_file.stem}.{formato}" for cat in pastas]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Filtra os CSVs de data/processed para o Nordeste.")
+    parser.add_argument(
+        "--chunksize", type=int, default=None,
+        help="processa cada arquivo em blocos de N linhas (memória limitada; mesma saída)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="arquivos filtrados em paralelo (padrão: número de CPUs; 1 = sequencial)",
+    )
+    parser.add_argument(
+        "--formato", choices=FORMATOS, default="csv",
+        help="formato dos arquivos de data/filtered (padrão: csv)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="pula os arquivos de data/processed que não mudaram desde a última execução",
+    )
+    adiciona_opcoes(parser)
+    adiciona_opcoes_escrita(parser)
+    args = parser.parse_args()
+    if args.chunksize and args.formato != "csv":
+        parser.error("--chunksize só grava CSV")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    inicia("03_filtragem_regioes", args.perfil)
+    configura_escrita(args.geracoes, args.trava)
+
+    # Cria pastas se não existirem
+    for d in [filtered_nordeste, filtered_estados, filtered_metropolis]:
+        d.mkdir(parents=True, exist_ok=True)
+
+    # CSVs (ou Parquet) na pasta processed
+    csv_files = lista_tabelas(processed_dir)
+
+    manifesto = Manifesto()
+    parametros = {"formato": args.formato}
+    if args.incremental:
+        em_dia = [f for f in csv_files if manifesto.atualizado(f"03:{f.stem}", [f, __file__], parametros)]
+        for csv_file in em_dia:
+            print(f"[INFO] {csv_file.name} sem mudanças, pulando")
+        csv_files = [f for f in csv_files if f not in em_dia]
+
+    # Um processo por arquivo; erro num arquivo não interrompe os demais
+    resultados = executa_em_paralelo(
+        filtra_arquivo, csv_files, args.jobs, chunksize=args.chunksize, formato=args.formato
+    )
+    for csv_file, _, erro in resultados:
+        if erro is None:
+            manifesto.registra(
+                f"03:{csv_file.stem}", [csv_file, __file__], saidas(csv_file, args.formato), parametros
+            )
+    manifesto.salva()
+    sys.exit(resume_falhas(resultados))
@@ -1,42 +1,89 @@
+import argparse
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from comum.armazenamento import FORMATOS, colunas_tabela, grava_tabela, le_tabela, lista_tabelas
+from comum.caminhos import FILTERED_DIR, FINAL_DIR
+from comum.escrita_atomica import adiciona_opcoes_escrita, configura_escrita
+from comum.etapas import CATEGORIAS, concatena_categoria, padroniza_percentual
+from comum.instrumentacao import adiciona_opcoes, inicia
+from comum.leitura_em_blocos import EscritorCSV, le_em_blocos
+from comum.manifesto import Manifesto
+
+parser = argparse.ArgumentParser(description="Junta os CSVs filtrados de cada categoria em data/final.")
+parser.add_argument(
+    "--chunksize", type=int, default=None,
+    help="processa cada arquivo em blocos de N linhas (memória limitada; mesma saída)",
+)
+parser.add_argument(
+    "--formato", choices=FORMATOS, default="csv",
+    help="formato dos arquivos de data/final (padrão: csv)",
+)
+parser.add_argument(
+    "--incremental", action="store_true",
+    help="pula as categorias cujos arquivos filtrados não mudaram desde a última execução",
+)
+adiciona_opcoes(parser)
+adiciona_opcoes_escrita(parser)
+args = parser.parse_args()
+inicia("04_padronizacao_csvs", args.perfil)
+configura_escrita(args.geracoes, args.trava)
+if args.chunksize and args.formato != "csv":
+    parser.error("--chunksize só grava CSV")
+
 # Diretórios
-filtered_dir = Path("data/filtered")
-final_dir = Path("data/final")
+filtered_dir = FILTERED_DIR
+final_dir = FINAL_DIR
 
 # Pastas finais
 final_dir.mkdir(parents=True, exist_ok=True)
 
 # Categorias
-categorias = ["nordeste", "estados", "metropolis"]
+categorias = CATEGORIAS
+
+manifesto = Manifesto()
+parametros = {"formato": args.formato}
 
 for cat in categorias:
-    # Lista de arquivos CSV filtrados
-    csv_files = list((filtered_dir / cat).glob(f"{cat}_*.csv"))
+    # Lista de arquivos filtrados (CSV ou Parquet)
+    csv_files = lista_tabelas(filtered_dir / cat, f"{cat}_*")
     
     if not csv_files:
         print(f"[INFO] Nenhum arquivo encontrado para {cat}, pulando...")
         continue
+
+    entradas = csv_files + [__file__]
+    saida = final_dir / f"{cat}_final.{args.formato}"
+    if args.incremental and manifesto.atualizado(f"04:{cat}", entradas, parametros):
+        print(f"[INFO] {cat}_final.csv sem mudanças, pulando")
+        continue
     
-    dfs = []
-    for csv_file in csv_files:
-        df = pd.read_csv(csv_file, sep=",")
-        
-        # Padroniza coluna de percentual se existir
-        if "porcentagem_em_relação_ao_total_de_domicílios_particulares_permanentes_duráveis_urbanos" in df.columns:
-            df = df.rename(columns={
-                "porcentagem_em_relação_ao_total_de_domicílios_particulares_permanentes_duráveis_urbanos": "valor_percentual"
-            })
-            df['valor_percentual'] = df['valor_percentual'].str.replace(',', '.', regex=False)\
-                                                         .str.replace('%', '', regex=False)\
-                                                         .astype(float)
-        
-        dfs.append(df)
+    if args.chunksize:
+        # Colunas do arquivo final = união das colunas dos filtrados, como no pd.concat
+        colunas = []
+        for csv_file in csv_files:
+            for c in padroniza_percentual(pd.DataFrame(columns=colunas_tabela(csv_file))).columns:
+                if c not in colunas:
+                    colunas.append(c)
+
+        with EscritorCSV(final_dir / f"{cat}_final.csv") as escritor:
+            for csv_file in csv_files:
+                for bloco in le_em_blocos(csv_file, args.chunksize, sep=","):
+                    escritor.grava(padroniza_percentual(bloco).reindex(columns=colunas))
+        print(f"[INFO] CSV final salvo: {cat}_final.csv ({escritor.n_linhas} linhas, em blocos)")
+        manifesto.registra(f"04:{cat}", entradas, [saida], parametros)
+        continue
     
-    # Concatena todos os arquivos de cada categoria
-    df_final = pd.concat(dfs, ignore_index=True)
+    dfs = [le_tabela(csv_file, sep=",") for csv_file in csv_files]
     
-    # Salva CSV final
-    df_final.to_csv(final_dir / f"{cat}_final.csv", index=False)
-    print(f"[INFO] CSV final salvo: {cat}_final.csv")
\ No newline at end of file
+    # Padroniza a coluna de percentual (se existir) e concatena os arquivos da categoria
+    df_final = concatena_categoria(dfs)
+    
+    # Salva CSV (ou Parquet) final
+    destino = grava_tabela(df_final, final_dir / f"{cat}_final.csv", args.formato)
+    print(f"[INFO] CSV final salvo: {destino.name}")
+    manifesto.registra(f"04:{cat}", entradas, [saida], parametros)
+
+manifesto.salva()
@@ -0,0 +1,65 @@
+"""Os testes importam os módulos de scripts/ como os próprios scripts (from comum..., e
+from benchmark_backends... nos de scripts/benchmark).
+
+Os que rodam etapas inteiras usam `projeto`: uma cópia de scripts/ e dos dados
+versionados num diretório temporário. Como as pastas de comum.caminhos são relativas
+à raiz do projeto, os scripts da cópia leem e gravam só nela.
+"""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[1]
+SCRIPTS = RAIZ / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+sys.path.insert(0, str(SCRIPTS / "benchmark"))
+
+# pastas de data/ versionadas (entradas e as saídas de referência)
+PASTAS_DADOS = ("raw", "processed", "filtered", "final", "exports")
+_IGNORA = shutil.ignore_patterns("__pycache__", ".*", "*.part", "*.parquet", "*.snap", "varreduras",
+                                 "analitica_series.csv")
+
+
+@pytest.fixture
+def projeto(tmp_path):
+    shutil.copytree(SCRIPTS, tmp_path / "scripts", ignore=_IGNORA)
+    for pasta in PASTAS_DADOS:
+        shutil.copytree(RAIZ / "data" / pasta, tmp_path / "data" / pasta, ignore=_IGNORA)
+    return tmp_path
+
+
+@pytest.fixture
+def roda(projeto):
+    """roda("scripts/...", argumentos...): roda o script na cópia e confere o código de saída"""
+    def roda(*argumentos, codigo=0):
+        resultado = subprocess.run(
+            [sys.executable, *map(str, argumentos)], cwd=projeto, capture_output=True, text=True,
+        )
+        assert resultado.returncode == codigo, resultado.stdout + resultado.stderr
+        return resultado
+    return roda
+
+
+@pytest.fixture
+def referencia():
+    """Pasta data/ do repositório (as saídas versionadas)"""
+    return RAIZ / "data"
+
+
+@pytest.fixture
+def confere_saidas(projeto, referencia):
+    """confere_saidas("final", "exports/infraestrutura_final.csv"): CSVs da cópia iguais, byte a byte, aos versionados"""
+    def confere(*caminhos):
+        for caminho in caminhos:
+            origem = referencia / caminho
+            arquivos = sorted(origem.rglob("*.csv")) if origem.is_dir() else [origem]
+            assert arquivos, origem
+            for arquivo in arquivos:
+                gerado = projeto / "data" / arquivo.relative_to(referencia)
+                assert gerado.exists(), f"{gerado} não foi gravado"
+                assert gerado.read_bytes() == arquivo.read_bytes(), f"{gerado} difere de {arquivo}"
+    return confere
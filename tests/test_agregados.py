@@ -0,0 +1,53 @@
+"""Atualização incremental dos resumos por partição = resumos refeitos da tabela inteira."""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from comum.agregados_mysql import sql_atualizacao, sql_atualizacao_particoes, tabela_resumo, tabela_variacao
+from comum.motor_embutido import MotorEmbutido, traduz_sql
+
+TABELA = "estados"
+
+
+def _executa(motor, comandos):
+    for sql, params in comandos:
+        motor.conn.execute(traduz_sql(sql), list(params))
+
+
+def _resumos(motor):
+    return {
+        tabela: motor.le(f"SELECT * FROM {tabela}").sort_values(["inadequacao", "regiao"] + (
+            ["ano"] if tabela == tabela_variacao(TABELA) else [])).reset_index(drop=True)
+        for tabela in (tabela_resumo(TABELA), tabela_variacao(TABELA))
+    }
+
+
+@pytest.fixture
+def motor():
+    motor = MotorEmbutido(agregados=True)
+    yield motor
+    motor.fecha()
+
+
+def test_particoes_alteradas_igual_a_refazer_tudo(motor):
+    inad = "Abastecimento de água"
+    _executa(motor, [
+        # valor alterado no meio da série, região que saiu de uma partição, partição apagada
+        (f"UPDATE {TABELA} SET valor_percentual = valor_percentual + 1.5 WHERE ano = 2017 AND inadequacao = %s", (inad,)),
+        (f"DELETE FROM {TABELA} WHERE ano = 2018 AND inadequacao = %s AND regiao = 'Bahia'", (inad,)),
+        (f"DELETE FROM {TABELA} WHERE ano = 2016 AND inadequacao = 'Coleta de lixo'", ()),
+        # ano novo no fim de uma série
+        (f"""INSERT INTO {TABELA} SELECT id + 100000, 2020, inadequacao, regiao, contagem, valor_percentual * 0.9
+             FROM {TABELA} WHERE ano = 2019 AND inadequacao = 'Ausência de banheiro'""", ()),
+    ])
+    particoes = [(2017, inad), (2018, inad), (2016, "Coleta de lixo"), (2020, "Ausência de banheiro")]
+
+    _executa(motor, sql_atualizacao_particoes(TABELA, particoes))
+    incremental = _resumos(motor)
+    _executa(motor, sql_atualizacao(TABELA))
+    completo = _resumos(motor)
+
+    for tabela in completo:
+        pd.testing.assert_frame_equal(incremental[tabela], completo[tabela])
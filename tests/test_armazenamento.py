@@ -0,0 +1,41 @@
+"""CSV e Parquet (--formato parquet) entregam os mesmos dados às etapas seguintes."""
+
+import shutil
+
+import pandas as pd
+import pytest
+
+from comum.armazenamento import grava_tabela, le_tabela
+
+pytest.importorskip("pyarrow")
+
+FINAIS = ["estados_final.csv", "metropolis_final.csv", "nordeste_final.csv"]
+
+
+@pytest.mark.parametrize("nome", FINAIS)
+def test_parquet_ida_e_volta(tmp_path, referencia, nome):
+    df = le_tabela(referencia / "final" / nome)
+
+    gravado = grava_tabela(df, tmp_path / nome, "parquet")
+
+    assert gravado.suffix == ".parquet"
+    pd.testing.assert_frame_equal(le_tabela(tmp_path / nome), df)
+    pd.testing.assert_frame_equal(le_tabela(tmp_path / nome, dtype=str), le_tabela(referencia / "final" / nome, dtype=str))
+
+
+def test_pipeline_em_parquet_igual_ao_csv(projeto, roda, referencia, confere_saidas):
+    for pasta in ("processed", "filtered", "final"):
+        shutil.rmtree(projeto / "data" / pasta)
+    (projeto / "data" / "exports" / "infraestrutura_final.csv").unlink()
+
+    for etapa in ("tratamento/02_limpeza_padronizacao.py", "tratamento/03_filtragem_regioes.py",
+                  "tratamento/04_padronizacao_csvs.py"):
+        roda(f"scripts/{etapa}", "--formato", "parquet")
+    roda("scripts/integracao/07_consolida_final_to_csv.py")
+
+    for nome in FINAIS:
+        assert (projeto / "data" / "final" / nome).with_suffix(".parquet").exists()
+        assert not (projeto / "data" / "final" / nome).exists()
+        pd.testing.assert_frame_equal(le_tabela(projeto / "data" / "final" / nome), le_tabela(referencia / "final" / nome))
+    # 07 lê os .parquet e grava o mesmo consolidado
+    confere_saidas("exports/infraestrutura_final.csv")
@@ -0,0 +1,25 @@
+"""02, 03, 04 e 07 com --chunksize gravam os mesmos arquivos que o modo completo (os versionados)."""
+
+import shutil
+
+import pytest
+
+ETAPAS = [
+    "scripts/tratamento/02_limpeza_padronizacao.py",
+    "scripts/tratamento/03_filtragem_regioes.py",
+    "scripts/tratamento/04_padronizacao_csvs.py",
+    "scripts/integracao/07_consolida_final_to_csv.py",
+]
+
+
+# 7: menor que qualquer arquivo, então todos passam por vários blocos
+@pytest.mark.parametrize("chunksize", [7, 1000])
+def test_blocos_iguais_ao_modo_completo(projeto, roda, confere_saidas, chunksize):
+    for pasta in ("processed", "filtered", "final"):
+        shutil.rmtree(projeto / "data" / pasta)
+    (projeto / "data" / "exports" / "infraestrutura_final.csv").unlink()
+
+    for etapa in ETAPAS:
+        roda(etapa, "--chunksize", chunksize)
+
+    confere_saidas("processed", "filtered", "final", "exports/infraestrutura_final.csv")
@@ -0,0 +1,114 @@
+"""Coleta contra um servidor HTTP local: 304 com ETag, retomada do .part com Range e 503 repetido."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from comum.coleta import baixa_indicadores
+
+SHEET_ID = "planilha"
+CONTEUDO = "".join(f"regiao,ano,valor\nPernambuco,{ano},{ano * 7}\n" for ano in range(2000, 2400)).encode()
+ETAG = '"v1"'
+
+
+class Servidor(BaseHTTPRequestHandler):
+    """GET /<sheet_id>/<gid>; o comportamento de cada gid está em `servidor.roteiro`"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        _, _sheet_id, gid = self.path.split("/")
+        self.server.requisicoes.append((gid, dict(self.headers)))
+        roteiro = self.server.roteiro.setdefault(gid, [])
+        acao = roteiro.pop(0) if roteiro else "normal"
+
+        if acao == "503":
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+
+        inicio = 0
+        faixa = self.headers.get("Range")
+        if faixa and self.headers.get("If-Range") == ETAG:
+            inicio = int(faixa.removeprefix("bytes=").rstrip("-"))
+        corpo = CONTEUDO[inicio:]
+        self.send_response(206 if inicio else 200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(corpo)))
+        if inicio:
+            self.send_header("Content-Range", f"bytes {inicio}-{len(CONTEUDO) - 1}/{len(CONTEUDO)}")
+        self.end_headers()
+        if acao == "corta":
+            # conexão cai no meio do corpo
+            self.wfile.write(corpo[: len(corpo) // 3])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(corpo)
+
+
+@pytest.fixture
+def servidor():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Servidor)
+    httpd.requisicoes = []
+    httpd.roteiro = {}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _baixa(servidor, tmp_path, gid):
+    url = f"http://127.0.0.1:{servidor.server_port}/{{sheet_id}}/{{gid}}"
+    return baixa_indicadores(
+        {gid: gid}, tmp_path / "raw", SHEET_ID, url=url, espera_base=0, timeout=5,
+        caminho_estado=tmp_path / "estado.json",
+    )[gid]
+
+
+def test_304_nao_baixa_de_novo(servidor, tmp_path):
+    assert _baixa(servidor, tmp_path, "agua") == "baixado"
+    assert _baixa(servidor, tmp_path, "agua") == "sem mudanças"
+
+    (_, primeira), (_, segunda) = servidor.requisicoes
+    assert "If-None-Match" not in primeira
+    assert segunda["If-None-Match"] == ETAG
+    assert (tmp_path / "raw" / "agua.csv").read_bytes() == CONTEUDO
+
+
+def test_retoma_o_part_com_range(servidor, tmp_path):
+    servidor.roteiro["lixo"] = ["corta"]
+    assert _baixa(servidor, tmp_path, "lixo") == "baixado"
+
+    (_, primeira), (_, segunda) = servidor.requisicoes
+    assert "Range" not in primeira
+    recebidos = len(CONTEUDO) // 3
+    assert segunda["Range"] == f"bytes={recebidos}-"
+    assert segunda["If-Range"] == ETAG
+    assert (tmp_path / "raw" / "lixo.csv").read_bytes() == CONTEUDO
+    assert not (tmp_path / "raw" / "lixo.csv.part").exists()
+
+
+def test_repete_depois_de_503(servidor, tmp_path):
+    servidor.roteiro["esgoto"] = ["503", "503"]
+    assert _baixa(servidor, tmp_path, "esgoto") == "baixado"
+
+    assert len(servidor.requisicoes) == 3
+    assert (tmp_path / "raw" / "esgoto.csv").read_bytes() == CONTEUDO
+
+
+def test_503_em_todas_as_tentativas(servidor, tmp_path):
+    servidor.roteiro["piso"] = ["503"] * 10
+    resultado = _baixa(servidor, tmp_path, "piso")
+
+    assert isinstance(resultado, Exception)
+    assert not (tmp_path / "raw" / "piso.csv").exists()
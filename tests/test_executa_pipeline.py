@@ -0,0 +1,28 @@
+"""executa_pipeline.py (02 -> 07 em memória) grava os mesmos arquivos que os scripts em sequência."""
+
+import shutil
+
+
+def _limpa_saidas(projeto):
+    for pasta in ("processed", "filtered", "final"):
+        shutil.rmtree(projeto / "data" / pasta)
+    (projeto / "data" / "exports" / "infraestrutura_final.csv").unlink()
+
+
+def test_executa_igual_aos_scripts(projeto, roda, confere_saidas):
+    _limpa_saidas(projeto)
+
+    roda("scripts/pipeline/executa_pipeline.py")
+
+    confere_saidas("final", "exports/infraestrutura_final.csv")
+    # sem --debug, os intermediários não são gravados
+    assert not (projeto / "data" / "processed").exists()
+    assert not (projeto / "data" / "filtered").exists()
+
+
+def test_executa_debug_grava_intermediarios(projeto, roda, confere_saidas):
+    _limpa_saidas(projeto)
+
+    roda("scripts/pipeline/executa_pipeline.py", "--debug")
+
+    confere_saidas("processed", "filtered", "final", "exports/infraestrutura_final.csv")
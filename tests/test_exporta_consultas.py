@@ -0,0 +1,17 @@
+"""06 no DuckDB embutido grava os mesmos CSVs que o MySQL gravou em data/exports (os versionados)."""
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+
+@pytest.mark.parametrize("agregados", [False, True])
+def test_duckdb_igual_ao_mysql(projeto, roda, referencia, confere_saidas, agregados):
+    consultas = sorted(p.relative_to(referencia).as_posix() for p in (referencia / "exports").glob("0*.csv"))
+    for consulta in consultas:
+        (projeto / "data" / consulta).unlink()
+
+    roda("scripts/analise/06_exporta_consultas.py", "--backend", "duckdb", "--force",
+         *(["--agregados"] if agregados else []))
+
+    confere_saidas(*consultas)
@@ -0,0 +1,41 @@
+"""05 valida todas as tabelas antes de abrir a conexão: uma tabela recusada não deixa as outras carregadas."""
+
+import functools
+
+import pytest
+
+from comum.armazenamento import le_tabela
+from comum.validacao import DadosInvalidos, valida_tabela
+from domicilios import carrega_script
+
+
+@pytest.fixture
+def importa_mysql(monkeypatch, tmp_path):
+    script = carrega_script("modelagem/05_importa_mysql.py", "importa_mysql")
+
+    def sem_banco(**_kwargs):
+        raise AssertionError("conectou ao MySQL antes de validar todas as tabelas")
+
+    monkeypatch.setattr(script.mysql.connector, "connect", sem_banco)
+    monkeypatch.setattr(script, "valida_tabela", functools.partial(valida_tabela, destino_dir=tmp_path))
+    return script
+
+
+def test_tabela_recusada_nao_importa_nenhuma(importa_mysql, referencia):
+    estados = le_tabela(referencia / "final" / "estados_final.csv")
+    nordeste = le_tabela(referencia / "final" / "nordeste_final.csv").drop(columns=["ano"])
+    tabelas = [("estados", "estados_final.csv", estados), ("nordeste", "nordeste_final.csv", nordeste)]
+
+    with pytest.raises(DadosInvalidos, match="nordeste"):
+        importa_mysql.importa(tabelas)
+
+
+def test_valida_tabelas_devolve_todas(importa_mysql, referencia):
+    tabelas = [(t, f"{t}_final.csv", le_tabela(referencia / "final" / f"{t}_final.csv"))
+               for t in ("estados", "metropolis", "nordeste")]
+
+    validas = importa_mysql.valida_tabelas(tabelas)
+
+    assert [(t, o) for t, o, _df in validas] == [(t, o) for t, o, _df in tabelas]
+    for (_t, _o, df), (_t2, _o2, original) in zip(validas, tabelas):
+        assert len(df) == len(original)
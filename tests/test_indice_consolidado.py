@@ -0,0 +1,42 @@
+"""O índice em memória responde q1/q1b, q2, q3, q5 e q7 de 06 com as mesmas linhas do SQL (DuckDB)."""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from benchmark_backends import carrega_script_consultas
+from benchmark_indice import casos
+from comum.indice_consolidado import IndiceConsolidado
+
+EXPORTA = carrega_script_consultas()
+CASOS = dict(casos(EXPORTA, IndiceConsolidado.carrega()))
+
+
+@pytest.fixture(scope="module")
+def sql():
+    motor = EXPORTA.abre_backend("duckdb")
+    consultas = {filename: (query, params) for filename, query, params, _divisor in EXPORTA.monta_consultas()}
+    yield lambda filename: motor.le(*consultas[filename])
+    motor.fecha()
+
+
+def _arredonda(df):
+    df = df.copy()
+    for c in df.columns:
+        if pd.api.types.is_float_dtype(df[c]):
+            df[c] = df[c].astype("float64").round(6)
+    return df.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("filename", sorted(CASOS))
+def test_indice_igual_ao_sql(sql, filename):
+    df_sql = sql(filename)
+    # a contagem fica de fora: o consolidado tem o número inteiro ("575.009" -> 575009),
+    # o SQL tem a conversão do MySQL (575)
+    colunas = [c for c in df_sql.columns if c != "contagem"]
+    df_indice = CASOS[filename]()
+
+    assert list(df_indice.columns) == colunas
+    # mesma ordem, inclusive nos empates (desempatados por região/indicador dos dois lados)
+    pd.testing.assert_frame_equal(_arredonda(df_indice), _arredonda(df_sql[colunas]), check_dtype=False)
@@ -0,0 +1,85 @@
+"""parse_count_series / parse_percent_series são exatamente o parse escalar aplicado célula a célula."""
+
+import math
+
+import pandas as pd
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from comum.numeros_br import parse_count, parse_count_series, parse_percent, parse_percent_series
+
+
+def _milhar(n):
+    """1234567 -> "1.234.567" """
+    return f"{n:,}".replace(",", ".")
+
+
+contagens = st.integers(min_value=-10**18, max_value=10**18).map(_milhar)
+percentuais = st.builds(
+    lambda v, sufixo: f"{v:.2f}".replace(".", ",") + sufixo,
+    st.floats(min_value=-1000, max_value=1000, allow_nan=False),
+    st.sampled_from(["", "%", " %"]),
+)
+# planilha que perdeu os zeros do separador de milhar, ou percentual com ponto
+ambiguos = st.from_regex(r"[0-9]{1,4}[.,][0-9]{1,3}", fullmatch=True)
+lixo = st.text(alphabet="0123456789.,%+-e \"'\xa0abcNA", max_size=12)
+nulos = st.sampled_from([None, float("nan"), pd.NA])
+numeros = st.one_of(
+    st.integers(min_value=-10**18, max_value=10**18),
+    st.floats(allow_nan=True, allow_infinity=True),
+)
+
+celulas = st.one_of(contagens, percentuais, ambiguos, lixo, nulos, numeros)
+
+
+def _esperado(serie, funcao):
+    """A definição do docstring de comum.numeros_br"""
+    return pd.to_numeric(serie.apply(funcao), errors="coerce")
+
+
+def _confere(obtido, esperado):
+    assert len(obtido) == len(esperado)
+    for a, b in zip(obtido.tolist(), esperado.tolist()):
+        if isinstance(b, float) and math.isnan(b):
+            assert isinstance(a, float) and math.isnan(a)
+        else:
+            assert a == b and type(a) is type(b)
+
+
+@settings(max_examples=500)
+@given(st.lists(celulas, max_size=30))
+def test_contagem_igual_ao_escalar(valores):
+    serie = pd.Series(valores, dtype=object)
+    _confere(parse_count_series(serie), _esperado(serie, parse_count))
+
+
+@settings(max_examples=500)
+@given(st.lists(celulas, max_size=30))
+def test_percentual_igual_ao_escalar(valores):
+    serie = pd.Series(valores, dtype=object)
+    _confere(parse_percent_series(serie), _esperado(serie, parse_percent))
+
+
+@given(st.lists(st.one_of(contagens, ambiguos), min_size=1, max_size=30))
+def test_contagem_coluna_de_texto(valores):
+    # coluna como o pd.read_csv entrega: texto sem nulos, convertida pelo caminho rápido
+    serie = pd.Series(valores, dtype=str)
+    esperado = _esperado(serie, parse_count)
+    obtido = parse_count_series(serie)
+    assert obtido.dtype == esperado.dtype
+    _confere(obtido, esperado)
+
+
+@given(st.lists(st.floats(allow_nan=True, allow_infinity=False), max_size=30))
+def test_percentual_coluna_float(valores):
+    serie = pd.Series(valores, dtype="float64")
+    esperado = _esperado(serie, parse_percent)
+    obtido = parse_percent_series(serie)
+    assert obtido.dtype == esperado.dtype
+    _confere(obtido, esperado)
+
+
+def test_exemplos():
+    serie = pd.Series(["2.728.518", "414.0", "74,29%", None, "abc", "1.09"], dtype=object)
+    assert parse_count_series(serie).tolist()[:3] == [2728518, 4140, 7429]
+    assert parse_percent_series(pd.Series(["74,29%", "1.09", "0,5"])).tolist() == [74.29, 1.09, 0.5]
@@ -0,0 +1,18 @@
+"""Linha de comando `scripts/domicilios run`: seleção das etapas e etapas geradoras puladas."""
+
+import shutil
+
+
+def test_pula_03_grava_02_e_le_filtrados_de_disco(projeto, roda, confere_saidas):
+    shutil.rmtree(projeto / "data" / "processed")
+    shutil.rmtree(projeto / "data" / "final")
+
+    roda("scripts/domicilios", "run", "--from", "02", "--to", "04", "--pula", "03")
+
+    # 02 não tem quem o consuma: grava data/processed, e 04 lê data/filtered de disco
+    confere_saidas("processed", "final")
+
+
+def test_run_all_com_from_e_recusado(roda):
+    resultado = roda("scripts/domicilios", "run", "all", "--from", "03", codigo=1)
+    assert "não combina" in resultado.stderr
@@ -0,0 +1,38 @@
+"""Snapshot binário do consolidado: mesmos valores do CSV e checksum conferido."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from comum.snapshot import Snapshot, grava_snapshot
+
+
+def test_snapshot_devolve_os_valores_do_csv(referencia, tmp_path):
+    csv = pd.read_csv(referencia / "exports" / "infraestrutura_final.csv")
+    caminho = tmp_path / "infraestrutura_final.snap"
+    assert grava_snapshot([csv], caminho) == len(csv)
+
+    lido = Snapshot(caminho, verifica=True).para_dataframe()
+
+    assert list(lido.columns) == list(csv.columns)
+    for nome in ("inadequacao", "regiao", "source_file"):
+        assert lido[nome].astype(object).tolist() == csv[nome].tolist(), nome
+    for nome in ("ano", "contagem"):
+        assert (lido[nome].to_numpy(dtype=np.int64) == csv[nome].to_numpy(dtype=np.int64)).all(), nome
+    # valor_percentual sem perda: igual, bit a bit, ao float64 lido do CSV
+    assert lido["valor_percentual"].dtype == np.float64
+    np.testing.assert_array_equal(lido["valor_percentual"].to_numpy(), csv["valor_percentual"].to_numpy())
+
+
+def test_verifica_recusa_snapshot_alterado(referencia, tmp_path):
+    csv = pd.read_csv(referencia / "exports" / "infraestrutura_final.csv")
+    caminho = tmp_path / "infraestrutura_final.snap"
+    grava_snapshot([csv], caminho)
+
+    dados = bytearray(caminho.read_bytes())
+    dados[-1] ^= 0xFF
+    caminho.write_bytes(bytes(dados))
+
+    Snapshot(caminho).para_dataframe()  # sem verifica, abre normalmente
+    with pytest.raises(ValueError, match="sha256"):
+        Snapshot(caminho, verifica=True)